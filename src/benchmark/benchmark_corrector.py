@@ -0,0 +1,56 @@
+import copy
+import time
+from dotenv import load_dotenv
+from src.benchmark.benchmark_ner_input import load_documents, text_json_folder, layout_json_folder
+from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepCorrector import (StepCorrector,
+                                                                                               VALID_WORD_PATTERN)
+
+load_dotenv()
+
+# SymSpell correction: lookup of every word (as before) vs. dictionary pre-filter + word cache shared by all
+# documents, on the cached pipeline results (TEXT_JSON_PATH + LAYOUT_JSON_PATH, written in dev mode).
+# run from project root: python -m src.benchmark.benchmark_corrector
+
+
+def correct_without_cache(step, text_json):
+    for entry in text_json:
+        if "[" in entry["text"] and "]" in entry["text"]:
+            continue
+        entry["text"] = " ".join(step.lookup(word) if VALID_WORD_PATTERN.fullmatch(word) else word
+                                 for word in entry["text"].split())
+    return text_json
+
+
+def main():
+    documents = load_documents()
+    if not documents:
+        print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+        return
+    text_jsons = [text_json for text_json, _ in documents.values()]
+
+    step = StepCorrector(image=None, text_json=None, layout_json=None)
+    step.load_symspell()
+    start = time.perf_counter()
+    reference = [correct_without_cache(step, copy.deepcopy(text_json)) for text_json in text_jsons]
+    uncached_time = time.perf_counter() - start
+
+    stats = {}
+    results = []
+    start = time.perf_counter()
+    for text_json in text_jsons:
+        step = StepCorrector(image=None, text_json=copy.deepcopy(text_json), layout_json=None)
+        results.append(step.apply())
+        for key, value in step.stats.items():
+            stats[key] = stats.get(key, 0) + value
+    cached_time = time.perf_counter() - start
+
+    same = sum([e["text"] for e in a] == [e["text"] for e in b] for a, b in zip(reference, results))
+    print(f"{len(text_jsons)} documents, {stats['words']} words")
+    print(f"lookup per word: {uncached_time / len(text_jsons):.4f} s/doc")
+    print(f"pre-filter + cache: {cached_time / len(text_jsons):.4f} s/doc ({uncached_time / cached_time:.2f}x)")
+    print(f"lookups: {stats['lookups']}, avoided: {stats['in_dictionary']} in dictionary, {stats['cached']} cached")
+    print(f"identical results: {same}/{len(text_jsons)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import os
+import time
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+from src.pipeline.pdfBackend.PdfRenderer import render_page
+from src.pipeline.stepLayout.layoutStrategy.StrategyDETR import StrategyDETR
+
+load_dotenv()
+
+# Throughput of DETR layout detection: single-image loop vs. batched inference
+# on the first page of all files in INPUT_PATH.
+# run from project root: python -m src.benchmark.benchmark_detr_batch
+input_folder = os.getenv('INPUT_PATH')
+BATCH_SIZES = [1, 2, 4, 8]
+RENDER_DPI = 150  # DETR resizes pages to 800 px anyway
+
+
+def load_pages():
+    pages = []
+    for file in sorted(os.listdir(input_folder)):
+        path = os.path.join(input_folder, file)
+        if file.endswith(".pdf"):
+            pages.append(Image.fromarray(render_page(path, dpi=RENDER_DPI)).convert("RGB"))
+        elif file.endswith(".png"):
+            pages.append(Image.open(path).convert("RGB"))
+    return pages
+
+
+def max_box_difference(reference, results):
+    # largest coordinate difference between matching detections (same order), None if the number differs
+    if len(reference) != len(results):
+        return None
+    differences = [np.abs(np.array(a["box"]) - np.array(b["box"])).max() for a, b in zip(reference, results)]
+    return max(differences, default=0.0)
+
+
+def main():
+    pages = load_pages()
+    if not pages:
+        print(f"[WARNING] No input files found in {input_folder}")
+        return
+    strategy = StrategyDETR(image=None)
+    strategy.predict(pages[0])  # warm up
+
+    start = time.perf_counter()
+    reference = [strategy.predict(page) for page in pages]
+    loop_time = time.perf_counter() - start
+    print(f"{'mode':<16}{'s':>8}{'pages/s':>10}{'same count':>12}{'max box diff':>14}")
+    print(f"{'loop':<16}{loop_time:>8.2f}{len(pages) / loop_time:>10.2f}")
+
+    for batch_size in BATCH_SIZES:
+        start = time.perf_counter()
+        results = strategy.predict_batch(pages, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        differences = [max_box_difference(a, b) for a, b in zip(reference, results)]
+        same_count = sum(difference is not None for difference in differences)
+        max_difference = max((d for d in differences if d is not None), default=0.0)
+        print(f"{f'batch {batch_size}':<16}{elapsed:>8.2f}{len(pages) / elapsed:>10.2f}"
+              f"{f'{same_count}/{len(pages)}':>12}{max_difference:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
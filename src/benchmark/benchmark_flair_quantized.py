@@ -0,0 +1,72 @@
+import os
+import time
+from collections import Counter
+from dotenv import load_dotenv
+from src.pipeline.pdfBackend.PdfSession import PdfSession
+from src.pipeline.stepContent.NerInput import build_ner_blocks
+from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepFlairNER import (load_tagger,
+                                                                                              predict_entities)
+
+load_dotenv()
+
+# Flair NER: dynamically quantized (int8) tagger vs. fp32 tagger on the text of all text PDFs in INPUT_PATH
+# (same text entries as StrategyPdf, NER sequences as configured by NER_INPUT). Entity F1 of the int8 tagger with the fp32 entities as reference.
+# run from project root: python -m src.benchmark.benchmark_flair_quantized
+input_folder = os.getenv('INPUT_PATH')
+
+
+def load_text_json(pdf_path):
+    with PdfSession(pdf_path) as pdf_session:
+        return [{"text": word["text"], "bbox": [word["x0"], word["top"], word["x1"], word["bottom"]]}
+                for word in pdf_session.words(0, keep_blank_chars=True, use_text_flow=True)]
+
+
+def entity_counts(entities):
+    return Counter((entity["entity"], entity["label"]) for entity in entities)
+
+
+def main():
+    pdf_files = sorted(f for f in os.listdir(input_folder) if f.startswith("pdf_text") and f.endswith(".pdf"))
+    if not pdf_files:
+        print(f"[WARNING] No text PDFs found in {input_folder}")
+        return
+    text_jsons = {file: load_text_json(os.path.join(input_folder, file)) for file in pdf_files}
+    pages = {file: build_ner_blocks(text_json) for file, text_json in text_jsons.items()}
+
+    entities = {}
+    latencies = {}
+    for quantized in (False, True):
+        name = "int8" if quantized else "fp32"
+        start = time.perf_counter()
+        tagger = load_tagger(quantized=quantized)
+        print(f"{name}: tagger loaded in {time.perf_counter() - start:.2f} s")
+        predict_entities(tagger, pages[pdf_files[0]][:5], text_jsons[pdf_files[0]])  # warm up
+        entities[name] = {}
+        latencies[name] = {}
+        for file, blocks in pages.items():
+            start = time.perf_counter()
+            entities[name][file] = predict_entities(tagger, blocks, text_jsons[file])
+            latencies[name][file] = time.perf_counter() - start
+
+    print(f"\n{'file':<20}{'fp32 s':>8}{'int8 s':>8}{'entities':>10}{'F1':>7}")
+    total_matches = total_reference = total_quantized = 0
+    for file in pdf_files:
+        reference = entity_counts(entities["fp32"][file])
+        quantized = entity_counts(entities["int8"][file])
+        matches = sum((reference & quantized).values())
+        total_matches += matches
+        total_reference += sum(reference.values())
+        total_quantized += sum(quantized.values())
+        f1 = 2 * matches / (sum(reference.values()) + sum(quantized.values())) if reference or quantized else 1.0
+        print(f"{file:<20}{latencies['fp32'][file]:>8.2f}{latencies['int8'][file]:>8.2f}"
+              f"{sum(reference.values()):>10}{f1:>7.3f}")
+
+    f1 = 2 * total_matches / (total_reference + total_quantized) if total_reference + total_quantized else 1.0
+    fp32_mean = sum(latencies["fp32"].values()) / len(pdf_files)
+    int8_mean = sum(latencies["int8"].values()) / len(pdf_files)
+    print(f"\nMean latency per page: fp32 {fp32_mean:.2f} s, int8 {int8_mean:.2f} s ({fp32_mean / int8_mean:.2f}x)")
+    print(f"Entity F1 (int8 vs. fp32): {f1:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import cv2 as cv
+from dotenv import load_dotenv
+from src.pipeline.pdfBackend.PdfRenderer import render_page
+from src.pipeline.stepFiletype.FiletypeDeterminer import TARGET_IMAGE_SIZE
+from src.pipeline.stepLayout.layoutStrategy.StrategyFRCNN import StrategyFRCNN
+
+load_dotenv()
+
+# Accuracy vs. latency of the Faster R-CNN CPU inference mode on the first page of all files in INPUT_PATH.
+# Reference: layout ground truth from LAYOUT_GROUND_TRUTH (JSON: {file name: [{"box": [...], "label_name": ...}]}),
+# without ground truth the default fp32 model is the reference.
+# run from project root: python -m src.benchmark.benchmark_frcnn_cpu
+input_folder = os.getenv('INPUT_PATH')
+IOU_THRESHOLD = 0.5
+CONFIGURATIONS = {
+    "default fp32": dict(cpu_mode=False, precision="fp32"),
+    "cpu fp32": dict(cpu_mode=True, precision="fp32"),
+    "cpu int8": dict(cpu_mode=True, precision="int8"),
+    "cpu bf16": dict(cpu_mode=True, precision="bf16"),
+}
+
+
+def load_pages():
+    # pages with the size of the pipeline input (typed_file)
+    pages = {}
+    for file in sorted(os.listdir(input_folder)):
+        path = os.path.join(input_folder, file)
+        if file.endswith(".pdf"):
+            image = render_page(path, dpi=300)
+        elif file.endswith(".png"):
+            image = cv.cvtColor(cv.imread(path), cv.COLOR_BGR2RGB)
+        else:
+            continue
+        pages[file] = cv.resize(image, TARGET_IMAGE_SIZE, interpolation=cv.INTER_AREA)
+    return pages
+
+
+def iou(box_a, box_b):
+    inter_width = max(0.0, min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]))
+    inter_height = max(0.0, min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]))
+    inter_area = inter_width * inter_height
+    union = ((box_a[2] - box_a[0]) * (box_a[3] - box_a[1]) + (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+             - inter_area)
+    return inter_area / union if union > 0 else 0.0
+
+
+def count_matches(reference, detections):
+    # greedy one-to-one matching of boxes with the same label
+    unmatched = list(reference)
+    matches = 0
+    for detection in sorted(detections, key=lambda d: d.get("score", 1.0), reverse=True):
+        candidates = [r for r in unmatched if r["label_name"] == detection["label_name"]
+                      and iou(r["box"], detection["box"]) >= IOU_THRESHOLD]
+        if candidates:
+            unmatched.remove(max(candidates, key=lambda r: iou(r["box"], detection["box"])))
+            matches += 1
+    return matches
+
+
+def main():
+    pages = load_pages()
+    if not pages:
+        print(f"[WARNING] No input files found in {input_folder}")
+        return
+
+    ground_truth = None
+    if os.getenv("LAYOUT_GROUND_TRUTH"):
+        with open(os.getenv("LAYOUT_GROUND_TRUTH"), "r", encoding="utf-8") as f:
+            ground_truth = json.load(f)
+        pages = {file: page for file, page in pages.items() if file in ground_truth}
+        if not pages:
+            print(f"[WARNING] No input file in {input_folder} has ground truth in {os.getenv('LAYOUT_GROUND_TRUTH')}")
+            return
+    else:
+        print("[WARNING] LAYOUT_GROUND_TRUTH is not set: the default fp32 model is the reference, "
+              "the results show the deviation from fp32, not the accuracy")
+
+    results = {}
+    latencies = {}
+    for name, configuration in CONFIGURATIONS.items():
+        strategy = StrategyFRCNN(image=None, **configuration)
+        results[name] = {}
+        elapsed = 0.0
+        for file, page in pages.items():
+            strategy.image = page
+            start = time.perf_counter()
+            _, results[name][file] = strategy.execute()
+            elapsed += time.perf_counter() - start
+        latencies[name] = elapsed / len(pages)
+
+    reference = ground_truth or results["default fp32"]
+    print(f"Reference: {'ground truth' if ground_truth else 'default fp32'}, IoU >= {IOU_THRESHOLD}, {len(pages)} pages")
+    print(f"{'configuration':<16}{'s/page':>8}{'precision':>11}{'recall':>8}{'F1':>7}")
+    for name in CONFIGURATIONS:
+        matches = sum(count_matches(reference[file], results[name][file]) for file in pages)
+        detected = sum(len(results[name][file]) for file in pages)
+        expected = sum(len(reference[file]) for file in pages)
+        precision = matches / detected if detected else 1.0
+        recall = matches / expected if expected else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        print(f"{name:<16}{latencies[name]:>8.2f}{precision:>11.3f}{recall:>8.3f}{f1:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import cv2 as cv
+import numpy as np
+from dotenv import load_dotenv
+from src.benchmark.benchmark_ner_input import load_documents, text_json_folder, layout_json_folder
+from src.pipeline.Intermediates import read_array, write_array, read_tokens, write_tokens, read_layout, write_layout
+from src.pipeline.TokenStore import TokenStore
+from src.util import convert_numpy
+
+load_dotenv()
+
+# Intermediate results as PNG / indented JSON (INTERMEDIATE_FORMAT=json) vs. .npy / columnar folders (binary):
+# (old vs. new) write and read time and size of a page image (300 dpi, or the images in PREPROCESSED_PATH) and of the
+# OCR tokens and layout on the cached pipeline results (TEXT_JSON_PATH + LAYOUT_JSON_PATH, written in dev mode).
+# Reading includes the conversion to the objects of the pipeline (TokenStore, layout dict).
+# run from project root: python -m src.benchmark.benchmark_intermediates
+PAGE_SIZE = (3508, 2480)  # A4 at 300 dpi
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def size_of(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, file)) for file in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def write_json(value, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(value, f, indent=2, ensure_ascii=False, default=convert_numpy)
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(name, value, folder, json_io, binary_io, extensions):
+    (write_a, read_a), (write_b, read_b) = json_io, binary_io
+    path_a, path_b = os.path.join(folder, f"{name}{extensions[0]}"), os.path.join(folder, f"{name}{extensions[1]}")
+    _, write_time_a = timed(lambda: write_a(value, path_a))
+    _, write_time_b = timed(lambda: write_b(value, path_b))
+    _, read_time_a = timed(lambda: read_a(path_a))
+    _, read_time_b = timed(lambda: read_b(path_b))
+    return [size_of(path_a), size_of(path_b), write_time_a, write_time_b, read_time_a, read_time_b]
+
+
+def print_row(name, row):
+    size_a, size_b, write_a, write_b, read_a, read_b = row
+    print(f"{name:<24}{size_a / 1024:>10.0f}{size_b / 1024:>10.0f}{write_a:>11.3f}{write_b:>11.3f}"
+          f"{read_a:>10.3f}{read_b:>10.3f}")
+
+
+def page_images():
+    folder = os.getenv("PREPROCESSED_PATH")
+    files = sorted(file for file in os.listdir(folder) if file.endswith(".png")) if folder and os.path.isdir(folder) else []
+    if files:
+        return {file: cv.imread(os.path.join(folder, file)) for file in files[:5]}
+    # synthetic binarized page: white background, black text lines
+    rng = np.random.default_rng(0)
+    page = np.full(PAGE_SIZE, 255, dtype=np.uint8)
+    for y in range(200, PAGE_SIZE[0] - 200, 60):
+        for x in range(200, PAGE_SIZE[1] - 300, 150):
+            page[y:y + 30, x:x + rng.integers(40, 140)] = 0
+    return {"synthetic_page.png": page}
+
+
+def main():
+    folder = tempfile.mkdtemp()
+    header = f"{'':<24}{'KiB old':>10}{'KiB new':>10}{'write old':>11}{'write new':>11}{'read old':>10}{'read new':>10}"
+    try:
+        print("images: PNG (cv.imwrite/imread) vs .npy (np.save/memory-mapped np.load, read includes a full pass)")
+        print(header)
+        for file, image in page_images().items():
+            row = compare("image", image, folder,
+                          (lambda v, p: cv.imwrite(p, v), cv.imread),
+                          (write_array, lambda p: int(read_array(p).sum()) and None), (".png", ".npy"))
+            print_row(file, row)
+
+        documents = load_documents()
+        if not documents:
+            print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+            return
+        print("\nOCR tokens: JSON (TokenStore.from_entries after json.load) vs .tokens")
+        print(header)
+        totals = np.zeros(6)
+        for file, (text_json, _) in documents.items():
+            row = compare("tokens", TokenStore.from_entries(text_json), folder,
+                          (write_json, lambda p: TokenStore.from_entries(read_json(p))),
+                          (write_tokens, read_tokens), (".json", ".tokens"))
+            totals += row
+            print_row(file, row)
+        print_row("total", totals)
+
+        print("\nlayout: JSON vs .layout")
+        print(header)
+        totals = np.zeros(6)
+        for file, (_, layout_json) in documents.items():
+            row = compare("layout", layout_json, folder, (write_json, read_json), (write_layout, read_layout),
+                          (".json", ".layout"))
+            totals += row
+            print_row(file, row)
+        print_row("total", totals)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cold start of the layout models: every run is a fresh process without network access
+# (imports + building the model + loading the checkpoint).
+# run from project root: python -m src.benchmark.benchmark_layout_cold_start [--convert]
+# --convert: write <checkpoint>.safetensors next to the .pth files first (used automatically afterwards)
+REPEATS = 3
+
+
+def cold_start(model_name, queue):
+    # runs in a new process
+    os.environ["HF_HUB_OFFLINE"] = "1"  # fail instead of downloading
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    start = time.perf_counter()
+    if model_name == "FRCNN":
+        from src.pipeline.stepLayout.layoutStrategy.StrategyFRCNN import StrategyFRCNN as Strategy
+    else:
+        from src.pipeline.stepLayout.layoutStrategy.StrategyDETR import StrategyDETR as Strategy
+    imported = time.perf_counter()
+    Strategy(image=None, device="cpu")
+    loaded = time.perf_counter()
+    queue.put((imported - start, loaded - imported))
+
+
+def convert_checkpoints():
+    from src.pipeline.stepLayout.layoutStrategy.ModelCheckpoint import convert_to_safetensors
+    for model_path in (os.path.join(os.getenv('FASTERCRNN_LAYOUT'), "model_epoch_7.pth"),
+                       os.path.join(os.getenv('DETR_LAYOUT'), "detr_epoch_32.pth")):
+        print(f"Converted: {convert_to_safetensors(model_path)}")
+
+
+def main():
+    if "--convert" in sys.argv:
+        convert_checkpoints()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'model':<8}{'import s':>10}{'load s':>10}{'total s':>10}")
+    for model_name in ("FRCNN", "DETR"):
+        for _ in range(REPEATS):
+            queue = context.Queue()
+            process = context.Process(target=cold_start, args=(model_name, queue))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{model_name:<8} failed (exit code {process.exitcode})")
+                break
+            import_time, load_time = queue.get()
+            print(f"{model_name:<8}{import_time:>10.2f}{load_time:>10.2f}{import_time + load_time:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
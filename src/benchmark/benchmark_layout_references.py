@@ -0,0 +1,48 @@
+import json
+import time
+from dotenv import load_dotenv
+from src.benchmark.benchmark_ner_input import load_documents, text_json_folder, layout_json_folder
+from src.pipeline.TokenStore import TokenStore
+from src.pipeline.stepLayout.postprocessor.LayoutPostprocessor import LayoutPostprocessor, materialize_layout
+from src.util import convert_numpy
+
+load_dotenv()
+
+# Layout JSON with token references vs. copied OCR cells: JSON size and time of the layout postprocessing
+# on the cached OCR tokens in TEXT_JSON_PATH (dev mode). Layout: upper half of the page as table,
+# lower half as text (dense elements, independent of the layout model).
+# run from project root: python -m src.benchmark.benchmark_layout_references
+
+
+def page_layout(text_json):
+    x_max = max(entry["bbox"][2] for entry in text_json)
+    y_max = max(entry["bbox"][3] for entry in text_json)
+    return [
+        {"box": [0, 0, x_max, y_max / 2], "label_name": "Table", "score": 1.0},
+        {"box": [0, y_max / 2, x_max, y_max], "label_name": "Text", "score": 1.0},
+    ]
+
+
+def main():
+    documents = load_documents()
+    if not documents:
+        print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+        return
+
+    print(f"{'document':<24}{'tokens':>8}{'refs KiB':>10}{'cells KiB':>11}{'s':>8}")
+    for file, (text_json, _) in documents.items():
+        text_json = [entry for entry in text_json if "bbox" in entry]
+        if not text_json:
+            continue
+        store = TokenStore.from_entries(text_json)
+        start = time.perf_counter()
+        layout_json = LayoutPostprocessor(text_json=store).run(page_layout(text_json))
+        elapsed = time.perf_counter() - start
+        references = len(json.dumps(layout_json, ensure_ascii=False, default=convert_numpy).encode("utf-8"))
+        cells = len(json.dumps(materialize_layout(layout_json, store), ensure_ascii=False,
+                               default=convert_numpy).encode("utf-8"))
+        print(f"{file:<24}{len(store):>8}{references / 1024:>10.1f}{cells / 1024:>11.1f}{elapsed:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import copy
+import time
+import random
+from collections import defaultdict
+from dotenv import load_dotenv
+from src.benchmark.benchmark_ner_input import load_documents, text_json_folder, layout_json_folder
+from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepDemasking import StepDemasking
+from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepMasking import StepMasking
+
+load_dotenv()
+
+# Masking: substring search of every entity in every OCR entry (as before) vs. Aho-Corasick automaton,
+# on the cached pipeline results (TEXT_JSON_PATH + LAYOUT_JSON_PATH, written in dev mode).
+# Entities: random capitalized words and word pairs of each document (without NER model).
+# run from project root: python -m src.benchmark.benchmark_masking
+ENTITIES_PER_DOCUMENT = [10, 100, 500]
+
+
+def sample_entities(text_json, count, seed=0):
+    words = [word for entry in text_json for word in entry["text"].split() if word[:1].isupper() and len(word) > 2]
+    pairs = [" ".join(pair) for pair in zip(words, words[1:])]
+    candidates = sorted(set(words + pairs))
+    random.Random(seed).shuffle(candidates)
+    return [{"entity": text, "label": "PER"} for text in candidates[:count]]
+
+
+def mask_by_substring(text_json, ner_results):
+    counters = defaultdict(int)
+    mask_map = {}
+    for entry in text_json:
+        text = entry["text"]
+        for ner in ner_results:
+            original, label = ner["entity"], ner["label"].upper()
+            if original in text:
+                counters[label] += 1
+                placeholder = f"[{label}_{counters[label]}]"
+                text = text.replace(original, placeholder)
+                mask_map[placeholder] = original
+        entry["text"] = text
+    return text_json, mask_map
+
+
+def main():
+    documents = load_documents()
+    if not documents:
+        print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+        return
+    text_jsons = [text_json for text_json, _ in documents.values()]
+
+    print(f"{len(text_jsons)} documents")
+    print(f"{'entities':>9}{'substring s':>13}{'automaton s':>13}{'round trip':>12}")
+    for count in ENTITIES_PER_DOCUMENT:
+        entities = [sample_entities(text_json, count) for text_json in text_jsons]
+        inputs = [copy.deepcopy(text_json) for text_json in text_jsons]
+        start = time.perf_counter()
+        for text_json, ner_results in zip(inputs, entities):
+            mask_by_substring(text_json, ner_results)
+        substring_time = time.perf_counter() - start
+
+        inputs = [copy.deepcopy(text_json) for text_json in text_jsons]
+        masked = []
+        start = time.perf_counter()
+        for text_json, ner_results in zip(inputs, entities):
+            step = StepMasking(image=None, text_json=text_json, layout_json=None, ner_results=ner_results)
+            masked.append(step.apply())
+        automaton_time = time.perf_counter() - start
+
+        round_trip = sum(
+            [e["text"] for e in StepDemasking(text_json_corrected=masked_json, mask_map=mask_map).apply()]
+            == [e["text"] for e in original]
+            for (masked_json, mask_map), original in zip(masked, text_jsons))
+        print(f"{count:>9}{substring_time:>13.3f}{automaton_time:>13.3f}{f'{round_trip}/{len(text_jsons)}':>12}")
+
+
+if __name__ == '__main__':
+    main()
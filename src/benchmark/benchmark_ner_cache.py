@@ -0,0 +1,47 @@
+import time
+from dotenv import load_dotenv
+from src.benchmark.benchmark_ner_input import load_documents, text_json_folder, layout_json_folder
+from src.pipeline.stepContent.NerCache import NerCache
+from src.pipeline.stepContent.NerInput import build_ner_blocks
+from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepFlairNER import (load_tagger,
+                                                                                              predict_entities,
+                                                                                              tagger_fingerprint)
+
+load_dotenv()
+
+# Flair NER with and without the cross-document result cache on the cached pipeline results
+# (TEXT_JSON_PATH + LAYOUT_JSON_PATH, written in dev mode), documents in file order, empty cache at the start.
+# run from project root: python -m src.benchmark.benchmark_ner_cache
+
+
+def run(tagger, documents, cache=None):
+    results = {}
+    start = time.perf_counter()
+    for file, (text_json, layout_json) in documents.items():
+        blocks = build_ner_blocks(text_json, layout_json)
+        results[file] = predict_entities(tagger, blocks, text_json, cache=cache, fingerprint=tagger_fingerprint())
+    return results, time.perf_counter() - start
+
+
+def main():
+    documents = load_documents()
+    if not documents:
+        print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+        return
+    tagger = load_tagger()
+    first_text_json, first_layout_json = next(iter(documents.values()))
+    predict_entities(tagger, build_ner_blocks(first_text_json, first_layout_json)[:5], first_text_json)  # warm up
+
+    reference, uncached_time = run(tagger, documents)
+    cache = NerCache(max_size=10000)
+    results, cached_time = run(tagger, documents, cache)
+    same = sum(reference[file] == results[file] for file in documents)
+
+    print(f"{len(documents)} documents")
+    print(f"without cache: {uncached_time / len(documents):.3f} s/doc")
+    print(f"with cache:    {cached_time / len(documents):.3f} s/doc ({uncached_time / cached_time:.2f}x)")
+    print(f"cache: {cache.stats()}, identical results: {same}/{len(documents)}")
+
+
+if __name__ == '__main__':
+    main()
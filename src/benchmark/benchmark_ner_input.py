@@ -0,0 +1,61 @@
+import os
+import time
+from dotenv import load_dotenv
+from src.pipeline.Intermediates import load_tokens_result, load_layout_result
+from src.pipeline.TokenStore import TokenStore
+from src.pipeline.stepContent.NerInput import NER_INPUT_LEVELS, build_ner_blocks
+from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepFlairNER import (load_tagger,
+                                                                                              predict_entities)
+
+load_dotenv()
+
+# Flair NER input levels (entry: one sequence per OCR entry, line, block) on the cached pipeline results
+# (TEXT_JSON_PATH + LAYOUT_JSON_PATH, written in dev mode): number of sequences, latency, entities.
+# run from project root: python -m src.benchmark.benchmark_ner_input
+text_json_folder = os.getenv('TEXT_JSON_PATH')
+layout_json_folder = os.getenv('LAYOUT_JSON_PATH')
+
+
+def load_documents():
+    # OCR tokens as list of dicts, from .json or .tokens (INTERMEDIATE_FORMAT)
+    documents = {}
+    names = {os.path.splitext(file)[0] for file in os.listdir(text_json_folder)
+             if file.endswith((".json", ".tokens"))}
+    for name in sorted(names):
+        text_json = load_tokens_result("TEXT_JSON_PATH", name)
+        layout_json = load_layout_result("LAYOUT_JSON_PATH", name)
+        if text_json is None or layout_json is None:
+            continue
+        if isinstance(text_json, TokenStore):
+            text_json = text_json.to_entries()
+        documents[f"{name}.json"] = (text_json, layout_json)
+    return documents
+
+
+def main():
+    documents = load_documents()
+    if not documents:
+        print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+        return
+    tagger = load_tagger()
+    first_text_json, first_layout_json = next(iter(documents.values()))
+    predict_entities(tagger, build_ner_blocks(first_text_json, first_layout_json)[:5], first_text_json)  # warm up
+
+    print(f"{len(documents)} documents, {sum(len(t) for t, _ in documents.values())} OCR entries")
+    print(f"{'level':<8}{'sequences':>11}{'s/doc':>8}{'entities':>10}{'multi-entry':>13}")
+    for level in NER_INPUT_LEVELS:
+        sequences = entities = multi_entry = 0
+        elapsed = 0.0
+        for text_json, layout_json in documents.values():
+            start = time.perf_counter()
+            blocks = build_ner_blocks(text_json, layout_json, level=level)
+            results = predict_entities(tagger, blocks, text_json)
+            elapsed += time.perf_counter() - start
+            sequences += len(blocks)
+            entities += len(results)
+            multi_entry += sum(len(result["parts"]) > 1 for result in results)
+        print(f"{level:<8}{sequences:>11}{elapsed / len(documents):>8.2f}{entities:>10}{multi_entry:>13}")
+
+
+if __name__ == '__main__':
+    main()
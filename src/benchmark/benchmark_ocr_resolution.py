@@ -0,0 +1,94 @@
+import os
+import time
+import cv2 as cv
+from dotenv import load_dotenv
+from paddleocr import PaddleOCR
+from rapidfuzz.distance import Levenshtein
+from src.util import get_ocr_data
+from src.pipeline.pdfBackend.PdfSession import PdfSession
+from src.pipeline.stepFiletype.FiletypeDeterminer import TARGET_IMAGE_SIZE
+from src.pipeline.stepTextExtraction.OcrResolution import (get_ocr_scale, rescale_image, TESSERACT_TEXT_HEIGHT,
+                                                           PADDLE_TEXT_HEIGHT, PADDLE_DET_LIMIT_SIDE_LEN)
+from src.pipeline.stepTextExtraction.textExtractionStrategy.StrategyTesseract import parse_tesseract_data
+from src.pipeline.stepTextExtraction.textExtractionStrategy.StrategyPaddle import parse_paddle_result
+
+load_dotenv()
+
+# Benchmark of the OCR resolution policy: time and character accuracy per engine,
+# full resolution page vs. page rescaled to the preferred text height.
+# Ground truth is the text layer of the text PDFs in INPUT_PATH (rendered like scans in the pipeline).
+# run from project root: python -m src.benchmark.benchmark_ocr_resolution
+input_folder = os.getenv('INPUT_PATH')
+os.environ["OCR_ADAPTIVE_RESOLUTION"] = "true"  # compare both policies regardless of .env
+
+
+def load_page(pdf_path):
+    # page image with the size of the pipeline input + text of the PDF text layer
+    with PdfSession(pdf_path) as pdf_session:
+        image = pdf_session.render(0, dpi=300, grayscale=True)
+        words = pdf_session.words(0)
+    image = cv.resize(image, TARGET_IMAGE_SIZE, interpolation=cv.INTER_AREA)
+    image = cv.threshold(image, 0, 255, cv.THRESH_BINARY + cv.THRESH_OTSU)[1]
+    return image, [word["text"] for word in words]
+
+
+def char_accuracy(reference_words, ocr_words):
+    # 1 - character error rate, words sorted so that reading order differences are not counted
+    reference = " ".join(sorted(reference_words))
+    hypothesis = " ".join(sorted(ocr_words))
+    if not reference:
+        return 1.0
+    return max(0.0, 1.0 - Levenshtein.distance(reference, hypothesis) / len(reference))
+
+
+def run_tesseract(image, scale):
+    data = get_ocr_data(rescale_image(image, scale))
+    return [entry["text"] for entry in parse_tesseract_data(data)]
+
+
+def run_paddle(engine, image, scale):
+    results = engine.ocr(rescale_image(image, scale), det=True, cls=True)
+    if not results or not results[0]:
+        return []
+    ocr_result, _ = parse_paddle_result(results[0])
+    return [word for entry in ocr_result for word in entry["text"].split()]
+
+
+def main():
+    pdf_files = sorted(f for f in os.listdir(input_folder) if f.startswith("pdf_text") and f.endswith(".pdf"))
+    if not pdf_files:
+        print(f"[WARNING] No text PDFs found in {input_folder}")
+        return
+
+    paddle_default = PaddleOCR(use_angle_cls=True, lang='de', show_log=False)
+    paddle_adaptive = PaddleOCR(use_angle_cls=True, lang='de', det_limit_side_len=PADDLE_DET_LIMIT_SIDE_LEN,
+                                det_limit_type='max', show_log=False)
+    runs = {
+        "tesseract full": lambda image: run_tesseract(image, 1.0),
+        "tesseract adaptive": lambda image: run_tesseract(image, get_ocr_scale(image, TESSERACT_TEXT_HEIGHT)),
+        "paddle full": lambda image: run_paddle(paddle_default, image, 1.0),
+        "paddle adaptive": lambda image: run_paddle(paddle_adaptive, image, get_ocr_scale(image, PADDLE_TEXT_HEIGHT)),
+    }
+    totals = {name: [0.0, 0.0] for name in runs}
+
+    print(f"{'file':<20}{'run':<20}{'scale':>7}{'s':>8}{'char acc.':>11}")
+    for file in pdf_files:
+        image, reference_words = load_page(os.path.join(input_folder, file))
+        for name, run in runs.items():
+            target = PADDLE_TEXT_HEIGHT if name.startswith("paddle") else TESSERACT_TEXT_HEIGHT
+            scale = get_ocr_scale(image, target) if name.endswith("adaptive") else 1.0
+            start = time.perf_counter()
+            ocr_words = run(image)
+            elapsed = time.perf_counter() - start
+            accuracy = char_accuracy(reference_words, ocr_words)
+            totals[name][0] += elapsed
+            totals[name][1] += accuracy
+            print(f"{file:<20}{name:<20}{scale:>7.2f}{elapsed:>8.2f}{accuracy:>11.3f}")
+
+    print()
+    for name, (elapsed, accuracy) in totals.items():
+        print(f"{name:<20} mean {elapsed / len(pdf_files):.2f} s/page, char accuracy {accuracy / len(pdf_files):.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import os
+import time
+from collections import Counter
+from dotenv import load_dotenv
+from src.pipeline.pdfBackend.PdfWordBackend import get_word_backend, WORD_BACKENDS
+
+load_dotenv()
+
+# Benchmark of the PDF word backends on all text PDFs in INPUT_PATH.
+# Agreement with pdfplumber compares the text (stripped, blank entries ignored) and the font names of the
+# words and phrases, not their positions.
+# run from project root: python -m src.benchmark.benchmark_pdf_words
+input_folder = os.getenv('INPUT_PATH')
+REPEATS = 5
+
+
+def run_backend(backend, pdf_path):
+    # same calls as the pipeline: text check (FiletypeDeterminer), phrases (StrategyPdf), words (StrategyPDF)
+    pdf = backend.open(pdf_path)
+    try:
+        backend.has_text(pdf)
+        phrases = backend.extract_words(pdf, 0, keep_blank_chars=True, use_text_flow=True)
+        words = backend.extract_words(pdf, 0)
+    finally:
+        backend.close(pdf)
+    return phrases, words
+
+
+def word_agreement(reference, candidate, key=lambda w: w["text"].strip()):
+    # share of reference words that are found with the same key (text, text and font) in the candidate
+    ref_counts = Counter(key(w) for w in reference if w["text"].strip())
+    cand_counts = Counter(key(w) for w in candidate if w["text"].strip())
+    total = sum(ref_counts.values())
+    if total == 0:
+        return 1.0
+    return sum((ref_counts & cand_counts).values()) / total
+
+
+def with_font(word):
+    return word["text"].strip(), word["fontname"]
+
+
+def non_blank(words):
+    return sum(1 for w in words if w["text"].strip())
+
+
+def main():
+    pdf_files = sorted(f for f in os.listdir(input_folder) if f.startswith("pdf_text") and f.endswith(".pdf"))
+    if not pdf_files:
+        print(f"[WARNING] No text PDFs found in {input_folder}")
+        return
+
+    totals = {name: 0.0 for name in WORD_BACKENDS}
+    print(f"{'file':<20}{'backend':<12}{'ms':>10}{'phrases':>9}{'words':>7}{'phrase agr.':>13}{'word agr.':>11}"
+          f"{'font agr.':>11}")
+    for file in pdf_files:
+        pdf_path = os.path.join(input_folder, file)
+        results = {}
+        for name in WORD_BACKENDS:
+            backend = get_word_backend(name)
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                results[name] = run_backend(backend, pdf_path)
+            elapsed = (time.perf_counter() - start) / REPEATS * 1000
+            totals[name] += elapsed
+
+            ref_phrases, ref_words = results["pdfplumber"] if "pdfplumber" in results else results[name]
+            phrases, words = results[name]
+            print(f"{file:<20}{name:<12}{elapsed:>10.1f}{non_blank(phrases):>9}{non_blank(words):>7}"
+                  f"{word_agreement(ref_phrases, phrases):>13.3f}{word_agreement(ref_words, words):>11.3f}"
+                  f"{word_agreement(ref_words, words, key=with_font):>11.3f}")
+
+    print("\nTotal per backend:")
+    for name, total in totals.items():
+        print(f"  {name:<12}{total:>10.1f} ms ({total / len(pdf_files):.1f} ms per file)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import re
+import time
+from dotenv import load_dotenv
+from src.benchmark.benchmark_ner_input import load_documents, text_json_folder, layout_json_folder
+from src.pipeline.stepContent.RegexExtractors import match_counts
+from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepRegex import StepRegex
+
+load_dotenv()
+
+# Regex extraction: anchored patterns per OCR entry (as before, IBAN/Email/Datum only) vs. the combined
+# single-pass scanner over line-joined text, on the cached pipeline results
+# (TEXT_JSON_PATH + LAYOUT_JSON_PATH, written in dev mode).
+# run from project root: python -m src.benchmark.benchmark_regex
+ENTRY_PATTERNS = {
+    "IBAN": re.compile(r'^[A-Z]{2}[0-9]{2}(?:[ ]?[0-9]{4}){4}(?!(?:[ ]?[0-9]){3})(?:[ ]?[0-9]{1,2})?$'),
+    "Email": re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'),
+    "Datum": re.compile(r'^(?:\d{1,2}[./-]){2}\d{2,4}$'),
+}
+
+
+def extract_per_entry(text_json):
+    result = {key: [] for key in ENTRY_PATTERNS}
+    for entry in text_json:
+        for key, pattern in ENTRY_PATTERNS.items():
+            match = pattern.search(entry.get("text", ""))
+            if match:
+                result[key].append({"text": match.group().replace(" ", ""), "bbox": entry.get("bbox", [])})
+    return result
+
+
+def main():
+    documents = load_documents()
+    if not documents:
+        print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+        return
+
+    start = time.perf_counter()
+    reference = [extract_per_entry(text_json) for text_json, _ in documents.values()]
+    entry_time = time.perf_counter() - start
+
+    match_counts.clear()
+    start = time.perf_counter()
+    results = [StepRegex(image=None, text_json=text_json, layout_json=layout_json).apply()
+               for text_json, layout_json in documents.values()]
+    scanner_time = time.perf_counter() - start
+
+    print(f"{len(documents)} documents")
+    print(f"per entry: {entry_time / len(documents):.4f} s/doc, single pass: {scanner_time / len(documents):.4f} s/doc")
+    print(f"{'type':<18}{'per entry':>10}{'single pass':>13}{'found before':>14}")
+    for name, count in match_counts.most_common():
+        before = sum(len(r.get(name, [])) for r in reference) if name in ENTRY_PATTERNS else "-"
+        found_before = "-"
+        if name in ENTRY_PATTERNS:
+            values = [{m["text"] for m in r[name]} for r in results]
+            found_before = sum(len({m["text"] for m in ref[name]} & v) for ref, v in zip(reference, values))
+        print(f"{name:<18}{before:>10}{count:>13}{found_before:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+from dotenv import load_dotenv
+from src.pipeline.ResultSink import SqliteResultStore
+from src.util import save_json
+
+load_dotenv()
+
+# Corpus queries on the final results: scanning one JSON file per document vs. SqliteResultStore (entity index,
+# FTS5 over the block text). Synthetic documents in the PostProcessor schema, each with an own IBAN and
+# random German text blocks; queries: all documents with a given IBAN, all blocks with a phrase.
+# run from project root: python -m src.benchmark.benchmark_result_store
+DOCUMENTS = 5000
+BLOCKS = 100
+WORDS = ["Rechnung", "Betrag", "zahlbar", "innerhalb", "Tagen", "Lieferung", "Kunde", "Auftrag", "Menge", "Preis",
+         "Steuer", "Summe", "Datum", "Konto", "Bank", "Anschrift", "Straße", "Telefon", "Vertrag", "Leistung"]
+PHRASE = "zahlbar innerhalb von 14 Tagen ohne Abzug"
+
+
+def synthetic_result(rng, index):
+    blocks = [{"type": "text", "text": " ".join(rng.choice(WORDS, 8)), "bbox": rng.integers(0, 3000, 4).tolist(),
+               "confidence": int(rng.integers(0, 100))} for _ in range(BLOCKS)]
+    if index % 100 == 0:
+        blocks[0]["text"] = PHRASE
+    return {
+        "document_id": f"document_{index}",
+        "entities": [{"type": "IBAN", "text": f"DE{index:020d}", "confidence": 1.0, "source": "regex"},
+                     {"type": "ORG", "text": f"Firma {index % 50}", "confidence": 0.9, "source": "flair_ner"}],
+        "blocks": blocks,
+        "metadata": {"created_at": "2025-06-01T00:00:00Z", "pipeline_version": "v1.0"},
+    }
+
+
+def scan_entities(folder, entity_type, text):
+    documents = []
+    for file in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, file), "r", encoding="utf-8") as f:
+            result = json.load(f)
+        if any(e["type"] == entity_type and e["text"] == text for e in result["entities"]):
+            documents.append(result["document_id"])
+    return documents
+
+
+def scan_blocks(folder, phrase):
+    matches = []
+    for file in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, file), "r", encoding="utf-8") as f:
+            result = json.load(f)
+        matches += [(result["document_id"], b["type"], b["text"]) for b in result["blocks"]
+                    if phrase.lower() in (b.get("text") or "").lower()]
+    return matches
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    results = [synthetic_result(rng, i) for i in range(DOCUMENTS)]
+    folder = tempfile.mkdtemp()
+    files = os.path.join(folder, "files")
+    os.environ["BENCHMARK_OUTPUT"] = files
+    os.environ.pop("JSON_INDENT", None)
+    try:
+        _, files_time = timed(lambda: [save_json(r, save_dir="BENCHMARK_OUTPUT", filename=r["document_id"])
+                                       for r in results])
+        store = SqliteResultStore(os.path.join(folder, "results.sqlite"), batch_size=100)
+        _, store_time = timed(lambda: [store.write(r["document_id"], r) for r in results] and store.commit())
+        print(f"{DOCUMENTS} documents, {DOCUMENTS * BLOCKS} blocks")
+        print(f"write: JSON files {files_time:.2f} s, SQLite {store_time:.2f} s")
+
+        iban = f"DE{DOCUMENTS // 2:020d}"
+        reference, scan_time = timed(lambda: scan_entities(files, "IBAN", iban))
+        found, query_time = timed(lambda: store.find_entities("IBAN", iban))
+        print(f"documents with IBAN {iban}: scan {scan_time * 1000:.1f} ms, index {query_time * 1000:.2f} ms, "
+              f"same result: {reference == found}")
+
+        reference, scan_time = timed(lambda: scan_blocks(files, "zahlbar innerhalb von 14 Tagen"))
+        found, query_time = timed(lambda: store.search_blocks('"zahlbar innerhalb von 14 Tagen"', limit=DOCUMENTS))
+        print(f"blocks with phrase: scan {scan_time * 1000:.1f} ms, FTS5 {query_time * 1000:.2f} ms, "
+              f"same result: {sorted(reference) == sorted(found)} ({len(found)} blocks)")
+        store.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
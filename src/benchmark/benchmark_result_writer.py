@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+from dotenv import load_dotenv
+from src.pipeline.ResultSink import JsonlSink, read_jsonl
+from src.util import convert_numpy, save_json
+
+load_dotenv()
+
+# Final results: one indented JSON file per document with convert_numpy per NumPy value (as before) vs. compact
+# save_json vs. JsonlSink (one line per document, rotating files, fsync every 100 documents). Writing and reading
+# all results of synthetic documents in the PostProcessor schema (NumPy boxes and scores, as produced by the steps).
+# run from project root: python -m src.benchmark.benchmark_result_writer
+DOCUMENTS = 2000
+BLOCKS = 150
+ENTITIES = 40
+
+
+def synthetic_result(rng, index):
+    return {
+        "document_id": f"document_{index}",
+        "entities": [{"type": "PER", "text": f"Name {i}", "confidence": np.float32(rng.random()), "source": "flair_ner"}
+                     for i in range(ENTITIES)],
+        "blocks": [{"type": "text", "text": f"Rechnung Position {i} über {i * 3} Euro",
+                    "bbox": rng.integers(0, 3000, 4), "confidence": np.int64(rng.integers(0, 100))}
+                   for i in range(BLOCKS)],
+        "metadata": {"created_at": "2025-06-01T00:00:00Z", "pipeline_version": "v1.0"},
+    }
+
+
+def save_json_indented(result, folder, filename):
+    with open(os.path.join(folder, f"{filename}.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False, default=convert_numpy)
+
+
+def read_files(folder):
+    count = 0
+    for file in os.listdir(folder):
+        with open(os.path.join(folder, file), "r", encoding="utf-8") as f:
+            json.load(f)
+        count += 1
+    return count
+
+
+def size_of(folder):
+    return sum(os.path.getsize(os.path.join(folder, file)) for file in os.listdir(folder))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    results = [synthetic_result(rng, i) for i in range(DOCUMENTS)]
+    folder = tempfile.mkdtemp()
+    os.environ.pop("JSON_INDENT", None)
+    print(f"{DOCUMENTS} documents, {BLOCKS} blocks and {ENTITIES} entities each")
+    print(f"{'writer':<18}{'write s':>9}{'read s':>9}{'MiB':>8}{'files':>7}")
+    try:
+        writers = {
+            "indented files": lambda path: [save_json_indented(r, path, r["document_id"]) for r in results],
+            "compact files": lambda path: [save_json(r, save_dir="BENCHMARK_OUTPUT", filename=r["document_id"])
+                                           for r in results],
+        }
+        for name, write in writers.items():
+            path = os.path.join(folder, name.replace(" ", "_"))
+            os.makedirs(path)
+            os.environ["BENCHMARK_OUTPUT"] = path
+            start = time.perf_counter()
+            write(path)
+            write_time = time.perf_counter() - start
+            start = time.perf_counter()
+            read_files(path)
+            read_time = time.perf_counter() - start
+            print(f"{name:<18}{write_time:>9.2f}{read_time:>9.2f}{size_of(path) / 1024 ** 2:>8.1f}{len(os.listdir(path)):>7}")
+
+        path = os.path.join(folder, "jsonl")
+        start = time.perf_counter()
+        with JsonlSink(path, max_bytes=64 * 1024 * 1024, fsync_every=100) as sink:
+            for result in results:
+                sink.write(result["document_id"], result)
+        write_time = time.perf_counter() - start
+        start = time.perf_counter()
+        count = sum(1 for _ in read_jsonl(path))
+        read_time = time.perf_counter() - start
+        print(f"{'jsonl sink':<18}{write_time:>9.2f}{read_time:>9.2f}{size_of(path) / 1024 ** 2:>8.1f}"
+              f"{len(os.listdir(path)):>7}")
+        if count != DOCUMENTS:
+            print(f"[WARNING] {count} of {DOCUMENTS} results read from the JSONL files")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
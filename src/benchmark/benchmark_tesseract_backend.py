@@ -0,0 +1,77 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2 as cv
+from dotenv import load_dotenv
+from src.util import TESSERACT_LANG, TESSERACT_OEM, TESSERACT_PSM
+from src.pipeline.ocrBackend.TesseractBackend import get_tesseract_backend, TESSERACT_BACKENDS
+from src.pipeline.pdfBackend.PdfRenderer import render_page
+
+load_dotenv()
+
+# Throughput of the Tesseract backends (pytesseract subprocess per call vs. persistent workers)
+# on all text PDFs in INPUT_PATH, sequential and with as many threads as workers.
+# Each page is read with image_to_string (like the binarization score) and image_to_data (like StrategyTesseract).
+# run from project root: python -m src.benchmark.benchmark_tesseract_backend
+input_folder = os.getenv('INPUT_PATH')
+RENDER_DPI = 300
+
+
+def load_pages():
+    pdf_files = sorted(f for f in os.listdir(input_folder) if f.startswith("pdf_text") and f.endswith(".pdf"))
+    pages = []
+    for file in pdf_files:
+        image = render_page(os.path.join(input_folder, file), dpi=RENDER_DPI, grayscale=True)
+        pages.append(cv.threshold(image, 0, 255, cv.THRESH_BINARY + cv.THRESH_OTSU)[1])
+    return pages
+
+
+def read_page(backend, image):
+    backend.image_to_string(image, lang=TESSERACT_LANG, oem=TESSERACT_OEM, psm=TESSERACT_PSM)
+    return backend.image_to_data(image, lang=TESSERACT_LANG, oem=TESSERACT_OEM, psm=TESSERACT_PSM)
+
+
+def words(data):
+    # text, box and confidence of every word (confidence rounded to the precision of the TSV output)
+    return [(text.strip(), data["left"][i], data["top"][i], data["width"][i], data["height"][i],
+             round(float(data["conf"][i]), 2))
+            for i, text in enumerate(data["text"]) if text.strip()]
+
+
+def main():
+    pages = load_pages()
+    if not pages:
+        print(f"[WARNING] No text PDFs found in {input_folder}")
+        return
+    threads = int(os.getenv("TESSERACT_WORKERS", os.cpu_count() or 1))
+
+    results = {}
+    print(f"{'backend':<14}{'mode':<12}{'s':>8}{'pages/s':>10}")
+    for name in TESSERACT_BACKENDS:
+        backend = get_tesseract_backend(name)
+        read_page(backend, pages[0])  # warm up (worker start, model loading)
+
+        start = time.perf_counter()
+        results[name] = [read_page(backend, image) for image in pages]
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14}{'sequential':<12}{elapsed:>8.2f}{len(pages) / elapsed:>10.2f}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda image: read_page(backend, image), pages))
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14}{f'{threads} threads':<12}{elapsed:>8.2f}{len(pages) / elapsed:>10.2f}")
+
+    # both backends run the same engine -> words, boxes and confidences should be identical
+    identical = 0
+    for index, (a, b) in enumerate(zip(results["pytesseract"], results["worker"])):
+        if words(a) == words(b):
+            identical += 1
+        else:
+            differences = sum(x != y for x, y in zip(words(a), words(b))) + abs(len(words(a)) - len(words(b)))
+            print(f"[WARNING] Page {index}: {differences} of {len(words(a))} words differ")
+    print(f"\nIdentical words, boxes and confidences on {identical}/{len(pages)} pages")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import json
+import time
+import tracemalloc
+import numpy as np
+from dotenv import load_dotenv
+from src.benchmark.benchmark_ner_input import load_documents, text_json_folder, layout_json_folder
+from src.pipeline.TokenStore import TokenStore
+
+load_dotenv()
+
+# OCR tokens as list of dicts (text_json) vs. TokenStore: memory per 10k tokens (tracemalloc) and
+# matching of OCR tokens to layout boxes (Python loop vs. vectorized query), on the cached pipeline results
+# (TEXT_JSON_PATH + LAYOUT_JSON_PATH, written in dev mode).
+# run from project root: python -m src.benchmark.benchmark_token_store
+TOKENS = 10000
+LAYOUT_BOXES = 30
+
+
+def allocated(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def match_loop(text_json, box):
+    x1_l, y1_l, x2_l, y2_l = box
+    matched = []
+    for ocr in text_json:
+        x1_o, y1_o, x2_o, y2_o = ocr["bbox"]
+        inter_area = max(0, min(x2_l, x2_o) - max(x1_l, x1_o)) * max(0, min(y2_l, y2_o) - max(y1_l, y1_o))
+        ocr_area = (x2_o - x1_o) * (y2_o - y1_o)
+        if ocr_area > 0 and inter_area / ocr_area > 0.5:
+            matched.append(ocr)
+    return matched
+
+
+def main():
+    documents = load_documents()
+    entries = [entry for text_json, _ in documents.values() for entry in text_json]
+    if not entries:
+        print(f"[WARNING] No cached text and layout JSON found in {text_json_folder} / {layout_json_folder}")
+        return
+    entries = (entries * (TOKENS // len(entries) + 1))[:TOKENS]
+
+    # both built from the serialized tokens, as loaded from the cache
+    serialized = json.dumps(entries)
+    text_json, dict_size = allocated(lambda: json.loads(serialized))
+    store, store_size = allocated(lambda: TokenStore.from_entries(json.loads(serialized)))
+    print(f"{TOKENS} tokens, {len(store.strings)} distinct texts")
+    print(f"list of dicts: {dict_size / 1024:.0f} KiB, TokenStore: {store_size / 1024:.0f} KiB "
+          f"({dict_size / store_size:.1f}x smaller, estimate nbytes(): {store.nbytes() / 1024:.0f} KiB)")
+
+    rng = np.random.default_rng(0)
+    x_max, y_max = store.bboxes[:, 2].max(), store.bboxes[:, 3].max()
+    boxes = []
+    for _ in range(LAYOUT_BOXES):
+        x1, y1 = rng.uniform(0, x_max), rng.uniform(0, y_max)
+        boxes.append([x1, y1, x1 + rng.uniform(0, x_max / 2), y1 + rng.uniform(0, y_max / 4)])
+
+    start = time.perf_counter()
+    reference = [len(match_loop(text_json, box)) for box in boxes]
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    results = [len(store.overlapping(box)) for box in boxes]
+    store_time = time.perf_counter() - start
+    print(f"matching {LAYOUT_BOXES} layout boxes: loop {loop_time:.3f} s, vectorized {store_time:.3f} s, "
+          f"same matches: {reference == results}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import os
+import time
+import cv2 as cv
+from dotenv import load_dotenv
+from src.pipeline.Intermediates import read_json, result_path, write_array, write_tokens, write_layout
+
+load_dotenv()  # load .env-File
+
+# Converts the intermediate results of earlier dev mode runs to the binary format (INTERMEDIATE_FORMAT=binary):
+# PREPROCESSED_PATH *.png -> *.npy, TEXT_JSON_PATH *.json -> *.tokens, LAYOUT_JSON_PATH *.json -> *.layout
+# run from project root: python -m src.convert_intermediates
+remove_originals = False  # True: PNG/JSON files are deleted after the conversion
+conversions = [
+    ("PREPROCESSED_PATH", ".png", ".npy", lambda source, target: write_array(cv.imread(source), target)),
+    ("TEXT_JSON_PATH", ".json", ".tokens", lambda source, target: write_tokens(read_json(source), target)),
+    ("LAYOUT_JSON_PATH", ".json", ".layout", lambda source, target: write_layout(read_json(source), target)),
+]
+
+
+def size_of(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, file)) for file in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def main():
+    start_time = time.time()
+    for save_dir, source_ext, target_ext, convert in conversions:
+        folder = os.getenv(save_dir)
+        if not folder or not os.path.isdir(folder):
+            print(f"[WARNING] {save_dir} not found: {folder}")
+            continue
+        converted = source_size = target_size = 0
+        for file in sorted(os.listdir(folder)):
+            if not file.lower().endswith(source_ext):
+                continue
+            source = os.path.join(folder, file)
+            target = result_path(save_dir, file, target_ext)
+            try:
+                convert(source, target)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"[WARNING] Cannot convert {source}: {e}")
+                continue
+            converted += 1
+            source_size += size_of(source)
+            target_size += size_of(target)
+            if remove_originals:
+                os.remove(source)
+        print(f"{save_dir}: {converted} files converted ({source_ext} -> {target_ext}), "
+              f"{source_size / 1024 ** 2:.1f} MiB -> {target_size / 1024 ** 2:.1f} MiB")
+    print(f"\nConversion completed in {time.time() - start_time:.2f} seconds.")
+
+
+if __name__ == '__main__':
+    main()
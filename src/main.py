@@ -1,6 +1,7 @@
 import os
 from tqdm import tqdm
 from pipeline.Pipeline import Pipeline
+from pipeline.ResultSink import get_result_sink
 from dotenv import load_dotenv
 import time
 import logging
@@ -52,16 +53,21 @@ def main():
         return
 
     start_time = time.time()
-    for file in tqdm(valid_files):
-        print(f"\n")
-        with Pipeline(file, log=is_logging, dev_mode=is_dev_mode) as pipeline:
-            pipeline.run(
-                run_preprocessing=run_preprocessing,
-                run_text_extraction=run_text_extraction,
-                run_layout=run_layout,
-                run_content=run_content,
-                run_postprocessor=run_postprocessor
-            )
+    result_sink = get_result_sink()  # None (RESULT_SINK=json): one file per document in OUTPUT_PATH
+    try:
+        for file in tqdm(valid_files):
+            print(f"\n")
+            with Pipeline(file, log=is_logging, dev_mode=is_dev_mode, result_sink=result_sink) as pipeline:
+                pipeline.run(
+                    run_preprocessing=run_preprocessing,
+                    run_text_extraction=run_text_extraction,
+                    run_layout=run_layout,
+                    run_content=run_content,
+                    run_postprocessor=run_postprocessor
+                )
+    finally:
+        if result_sink is not None:
+            result_sink.close()  # remaining buffered results are written and synced
 
     end_time = time.time()
     print(f"\nProcessing completed in {end_time - start_time:.2f} seconds.")
@@ -0,0 +1,232 @@
+import os
+import json
+import shutil
+import cv2 as cv
+import numpy as np
+from dotenv import load_dotenv
+from src.util import save_image, save_json, convert_numpy
+from .TokenStore import TokenStore, use_token_store
+
+load_dotenv()
+
+# Intermediate results of the dev mode (PREPROCESSED_PATH, TEXT_JSON_PATH, LAYOUT_JSON_PATH):
+# binary: images as .npy, OCR tokens and layout as folders of .npy columns + meta.json (memory-mapped when loaded)
+# json: images as PNG, OCR tokens and layout as JSON (as before)
+INTERMEDIATE_FORMATS = ("binary", "json")
+FORMAT_VERSION = 1
+
+
+def get_intermediate_format():
+    intermediate_format = os.getenv("INTERMEDIATE_FORMAT", "binary").lower()
+    if intermediate_format not in INTERMEDIATE_FORMATS:
+        raise ValueError(f"Unknown INTERMEDIATE_FORMAT '{intermediate_format}', expected one of {INTERMEDIATE_FORMATS}")
+    return intermediate_format
+
+
+###############################################
+########### Files #############################
+###############################################
+
+def write_array(array, path):
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, np.ascontiguousarray(array), allow_pickle=False)
+    os.replace(tmp_path, path)
+
+
+def read_array(path):
+    # copy-on-write mapping: nothing is read before it is accessed, changes stay in memory
+    return np.load(path, mmap_mode="c", allow_pickle=False)
+
+
+def write_folder(path, arrays, meta):
+    # columns and meta.json are written to a temporary folder, which replaces the old one:
+    # the old folder is renamed aside first and only removed after the swap, so one complete version always exists
+    tmp_path = f"{path}.tmp"
+    old_path = f"{path}.old"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(dict(meta, version=FORMAT_VERSION), f, ensure_ascii=False, separators=(",", ":"),
+                  default=convert_numpy)
+    if os.path.isdir(path):
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def read_folder(path, names):
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported intermediate format version {meta.get('version')}: {path}")
+    return {name: read_array(os.path.join(path, f"{name}.npy")) for name in names}, meta
+
+
+###############################################
+########### OCR Tokens ########################
+###############################################
+
+# <name>.tokens: text_ids, bboxes and confidences of the TokenStore as columns,
+# string table and sparse extras (region, engine, ...) in meta.json
+def write_tokens(text_json, path):
+    store = text_json if isinstance(text_json, TokenStore) else TokenStore.from_entries(text_json)
+    extras = {key: {"index": list(values.keys()), "values": list(values.values())}
+              for key, values in store.extras.items()}
+    write_folder(path, {"text_ids": store.text_ids, "bboxes": store.bboxes, "confidences": store.confidences},
+                 {"strings": store.strings, "extras": extras})
+
+
+def read_tokens(path):
+    arrays, meta = read_folder(path, ("text_ids", "bboxes", "confidences"))
+    extras = {key: dict(zip(column["index"], column["values"])) for key, column in meta["extras"].items()}
+    return TokenStore(meta["strings"], arrays["text_ids"], arrays["bboxes"], arrays["confidences"], extras)
+
+
+###############################################
+########### Layout ############################
+###############################################
+
+# <name>.layout: all cells of all rows as one int32 column (index into text_json, -1-k: k-th inline cell,
+# e.g. PDF words), number of cells per row and of rows per element; labels, element fields (bbox, score, ...)
+# and inline cells in meta.json
+def write_layout(layout_json, path):
+    cells, row_lengths, element_rows = [], [], []
+    labels, elements, inline_cells = [], [], []
+
+    def add_cell(cell):
+        if isinstance(cell, (int, np.integer)):
+            cells.append(int(cell))
+        else:
+            inline_cells.append(cell)
+            cells.append(-len(inline_cells))
+
+    for label, items in layout_json.items():
+        if all(isinstance(item, dict) and "bbox" in item for item in items):
+            labels.append({"name": label, "kind": "elements", "count": len(items)})
+            for item in items:
+                rows = item.get("rows")
+                if isinstance(rows, list):
+                    element_rows.append(len(rows))
+                    for row in rows:
+                        row_lengths.append(len(row))
+                        for cell in row:
+                            add_cell(cell)
+                    item = {key: value for key, value in item.items() if key != "rows"}
+                else:
+                    element_rows.append(-1)  # no rows: element is kept as is
+                elements.append(item)
+        else:  # list of cells (unmatched)
+            labels.append({"name": label, "kind": "cells", "count": len(items)})
+            for cell in items:
+                add_cell(cell)
+
+    write_folder(path, {"cells": np.array(cells, dtype=np.int32), "row_lengths": np.array(row_lengths, dtype=np.int32),
+                        "element_rows": np.array(element_rows, dtype=np.int32)},
+                 {"labels": labels, "elements": elements, "inline_cells": inline_cells})
+
+
+def read_layout(path):
+    arrays, meta = read_folder(path, ("cells", "row_lengths", "element_rows"))
+    inline_cells = meta["inline_cells"]
+    cells = [cell if cell >= 0 else inline_cells[-cell - 1] for cell in arrays["cells"].tolist()]
+    row_lengths = arrays["row_lengths"].tolist()
+    element_rows = arrays["element_rows"].tolist()
+    elements = iter(meta["elements"])
+    cell_pos = row_pos = element_pos = 0
+
+    layout_json = {}
+    for label in meta["labels"]:
+        if label["kind"] == "cells":
+            layout_json[label["name"]] = cells[cell_pos:cell_pos + label["count"]]
+            cell_pos += label["count"]
+            continue
+        items = []
+        for _ in range(label["count"]):
+            item = next(elements)
+            row_count = element_rows[element_pos]
+            element_pos += 1
+            if row_count >= 0:
+                rows = []
+                for length in row_lengths[row_pos:row_pos + row_count]:
+                    rows.append(cells[cell_pos:cell_pos + length])
+                    cell_pos += length
+                row_pos += row_count
+                item = {"rows": rows, **item}
+            items.append(item)
+        layout_json[label["name"]] = items
+    return layout_json
+
+
+###############################################
+########### Pipeline Results ##################
+###############################################
+
+# save_dir: name of the environment variable of the folder (as in util.save_json)
+# Loading prefers the configured INTERMEDIATE_FORMAT and falls back to the other one (older results).
+# Annotated images (TEXT_IMAGE_PATH, LAYOUT_IMAGE_PATH) stay PNG/PDF, they are only viewed.
+def result_path(save_dir, filename, extension):
+    return os.path.join(os.getenv(save_dir), f"{os.path.splitext(os.path.basename(filename))[0]}{extension}")
+
+
+def load_result(save_dir, filename, readers):
+    if get_intermediate_format() == "json":
+        readers = readers[::-1]
+    for extension, reader in readers:
+        path = result_path(save_dir, filename, extension)
+        if os.path.exists(path):
+            return reader(path)
+        if os.path.isdir(f"{path}.old"):  # interrupted write_folder: previous version
+            return reader(f"{path}.old")
+    return None
+
+
+def save_image_result(image, save_dir, filename):
+    if get_intermediate_format() == "json":
+        save_image(image, save_dir=save_dir, filename=filename)
+        return
+    if not isinstance(image, np.ndarray):
+        print(f"[WARNING] Cannot save image: expected numpy array but got {type(image)}. Skipping save.")
+        return
+    os.makedirs(os.getenv(save_dir), exist_ok=True)
+    write_array(image, result_path(save_dir, filename, ".npy"))
+
+
+def load_image_result(save_dir, filename):
+    return load_result(save_dir, filename, [(".npy", read_array), (".png", cv.imread)])
+
+
+def save_tokens_result(text_json, save_dir, filename):
+    if get_intermediate_format() == "json":
+        save_json(text_json, save_dir=save_dir, filename=filename)
+        return
+    os.makedirs(os.getenv(save_dir), exist_ok=True)
+    write_tokens(text_json, result_path(save_dir, filename, ".tokens"))
+
+
+def load_tokens_result(save_dir, filename):
+    text_json = load_result(save_dir, filename, [(".tokens", read_tokens), (".json", read_json)])
+    if text_json is None:
+        return None
+    if use_token_store():
+        return text_json if isinstance(text_json, TokenStore) else TokenStore.from_entries(text_json)
+    return text_json.to_entries() if isinstance(text_json, TokenStore) else text_json
+
+
+def save_layout_result(layout_json, save_dir, filename):
+    if get_intermediate_format() == "json":
+        save_json(layout_json, save_dir=save_dir, filename=filename)
+        return
+    os.makedirs(os.getenv(save_dir), exist_ok=True)
+    write_layout(layout_json, result_path(save_dir, filename, ".layout"))
+
+
+def load_layout_result(save_dir, filename):
+    return load_result(save_dir, filename, [(".layout", read_layout), (".json", read_json)])
+
+
+def read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
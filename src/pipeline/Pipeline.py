@@ -9,14 +9,29 @@ from .stepPreprocessing.ContextPreprocessor import ContextPreprocessor
 from .stepTextExtraction.ContextTextExtraction import ContextTextExtraction
 from .stepLayout.ContextLayout import ContextLayout
 from .stepContent.ContextContent import ContextContent
+from .TokenStore import as_token_store
+from .pdfBackend.PdfSession import PdfSession
+from .StageCache import get_stage_cache, stage_key, file_hash
+from .Intermediates import (save_image_result, load_image_result, save_tokens_result, load_tokens_result,
+                            save_layout_result, load_layout_result)
 
 load_dotenv()  # Load environment variables from .env file
 
 class Pipeline:
-    def __init__(self, upload_file, log=False, dev_mode=False):
+    def __init__(self, upload_file, log=False, dev_mode=False, annotate=None, result_sink=None):
         self.upload_file = upload_file
         self.log = log
         self.dev_mode = dev_mode
+        # Annotated images are only rendered in dev mode or if requested
+        self.annotate = dev_mode if annotate is None else annotate
+        self.annotation_scale = float(os.getenv("ANNOTATION_SCALE", 1.0))
+        # Content-addressed stage results (STAGE_CACHE_PATH): a stage is only run if its input,
+        # settings, code or a previous stage changed
+        self.stage_cache = get_stage_cache()
+        self.input_key = None  # hash of the input file
+        self.stage_keys = {}
+        # Final result: written to result_sink (JsonlSink or SqliteResultStore, RESULT_SINK) or as file to OUTPUT_PATH
+        self.result_sink = result_sink
 
         # Filetyping Results
         self.file_name = None
@@ -24,14 +39,18 @@ class Pipeline:
         self.input_path = None
         self.typed_file = None
         self.is_mostly_text = None
+        self.pdf_session = None  # parsed text PDF, shared by all steps
 
         # Preprocessing Results
         self.preprocessed_image = None
+        self.preprocessed_ocr_data = None  # Tesseract result of binarization, reused by text extraction
 
         # Text Extraction Results
         self.text_image = None
         self.text_json = None
         self.words = None
+        self.layout_boxes = None  # layout regions of layout-first OCR (OCR_MODE=layout_first)
+        self.text_stats = None  # engine statistics of cascade OCR (OCR_MODE=cascade)
 
         # Layout Analysis Results
         self.layout_image = None
@@ -45,6 +64,9 @@ class Pipeline:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.pdf_session is not None:
+            self.pdf_session.close()
+            self.pdf_session = None
         if self.log:
             print(f"[Pipeline] completed: {self.upload_file}")
 
@@ -64,34 +86,60 @@ class Pipeline:
         # Detect file type and get relevant input data
         with FiletypeDeterminer(upload_file=self.upload_file, log=self.log) as filetype_determiner:
             self.file_name, self.file_type, self.input_path, self.typed_file, self.is_mostly_text = filetype_determiner.run()
+            self.pdf_session = filetype_determiner.pdf_session
+        if self.stage_cache is not None:
+            self.input_key = file_hash(os.path.join(os.getenv("INPUT_PATH"), self.upload_file))
+
+    def load_cached_stage(self, stage, upstream_key):
+        # returns the key of the stage and the cached result (None if not cached)
+        if self.stage_cache is None or upstream_key is None:
+            return None, None
+        key = stage_key(stage, upstream_key, file_type=self.file_type, is_mostly_text=self.is_mostly_text)
+        self.stage_keys[stage] = key
+        value = self.stage_cache.get(key)
+        if value is not None and self.log:
+            print(f"## [Pipeline] [StageCache] {stage} loaded from cache: {key[:12]}")
+        return key, value
+
+    def store_stage(self, key, value):
+        if self.stage_cache is not None and key is not None:
+            self.stage_cache.put(key, value)
 
     def load_or_run_preprocessing(self, run_step: bool = False):
         if not run_step:
-            # If Step ist not executed: Try to load preprocessed image from cache
-            path = os.path.join(os.getenv("PREPROCESSED_PATH"), f"{self.file_name}.png")
-            if os.path.exists(path):
-                self.preprocessed_image = cv.imread(path)
+            # If Step ist not executed: Try to load preprocessed image from cache (.npy or .png, INTERMEDIATE_FORMAT)
+            self.preprocessed_image = load_image_result("PREPROCESSED_PATH", self.file_name)
+            if self.preprocessed_image is not None:
                 return
             else:
                 if self.log:
-                    print(f"[WARNING] Preprocessed image not found: {path}, run preprocessing step")
+                    print(f"[WARNING] Preprocessed image not found in {os.getenv('PREPROCESSED_PATH')}: "
+                          f"{self.file_name}, run preprocessing step")
 
         if run_step:
             # Check if required data exist
             if self.file_type is None or self.typed_file is None:
                 raise TypeError("Cannot run preprocessing: file_type and/or typed_file is missing")
-            # Run preprocessing
-            with ContextPreprocessor(file_type=self.file_type, typed_file=self.typed_file, log=self.log) as step:
-                preprocessed_images = step.run()
-                self.preprocessed_image = preprocessed_images[-1] if preprocessed_images else None # use only image last in array, others for debugging
-                # Save result only in dev mode
-                if self.dev_mode and self.preprocessed_image is not None:
-                    save_image(self.preprocessed_image, save_dir="PREPROCESSED_PATH", filename=self.file_name)
+            key, cached = self.load_cached_stage("preprocessing", self.input_key)
+            if cached is not None:
+                self.preprocessed_image, self.preprocessed_ocr_data = cached
+            else:
+                # Run preprocessing
+                # Tesseract is used for mostly text images (and all images in cascade mode)
+                # -> keep the OCR result of the binarization
+                keep_ocr_data = bool(self.is_mostly_text) or os.getenv("OCR_MODE") == "cascade"
+                with ContextPreprocessor(file_type=self.file_type, typed_file=self.typed_file,
+                                         keep_ocr_data=keep_ocr_data, log=self.log) as step:
+                    preprocessed_images, self.preprocessed_ocr_data = step.run()
+                    self.preprocessed_image = preprocessed_images[-1] if preprocessed_images else None # use only image last in array, others for debugging
+                self.store_stage(key, (self.preprocessed_image, self.preprocessed_ocr_data))
+            # Save result only in dev mode (also cached results, runs without this step load them)
+            if self.dev_mode and self.preprocessed_image is not None:
+                save_image_result(self.preprocessed_image, save_dir="PREPROCESSED_PATH", filename=self.file_name)
 
     def load_or_run_text_extraction(self, run_step: bool = False):
         if not run_step:
             img_path = os.path.join(os.getenv("TEXT_IMAGE_PATH"), f"{self.file_name}.png")
-            json_path = os.path.join(os.getenv("TEXT_JSON_PATH"), f"{self.file_name}.json")
             # Try to load text data from cache
             if os.path.exists(img_path):
                 self.text_image = cv.imread(img_path)
@@ -99,12 +147,12 @@ class Pipeline:
                 if self.log:
                     print(f"[WARNING] OCR image not found: {img_path}, run text extraction step")
 
-            if os.path.exists(json_path):
-                with open(json_path, "r", encoding="utf-8") as f:
-                    self.text_json = json.load(f)
-            else:
+            # OCR tokens (.tokens or .json, INTERMEDIATE_FORMAT)
+            self.text_json = load_tokens_result("TEXT_JSON_PATH", self.file_name)
+            if self.text_json is None:
                 if self.log:
-                    print(f"[WARNING] OCR JSON not found: {json_path}, run text extraction step")
+                    print(f"[WARNING] OCR tokens not found in {os.getenv('TEXT_JSON_PATH')}: {self.file_name}, "
+                          f"run text extraction step")
 
         if run_step:
             # Check if required data exist
@@ -112,24 +160,35 @@ class Pipeline:
                     or (self.file_type != "pdf" and self.preprocessed_image is None)
                     or (self.file_type == "pdf" and self.input_path is None)):
                 raise TypeError("Cannot run text extraction: required inputs are missing depending on file_type")
-            # Run text extraction
-            with ContextTextExtraction(file_type=self.file_type, image=self.preprocessed_image, is_mostly_text=self.is_mostly_text,
-                                       pdf_path=self.input_path[0], log=self.log) as step:
-                self.text_image, self.text_json, self.words = step.run()
-                # if dev_mode: Save result
-                if self.dev_mode:
-                    if self.text_image is not None:
+            key, cached = self.load_cached_stage("text_extraction", self.stage_keys.get("preprocessing"))
+            if cached is not None:
+                self.text_json, self.words, self.layout_boxes, self.text_stats = cached
+            else:
+                # Run text extraction
+                with ContextTextExtraction(file_type=self.file_type, image=self.preprocessed_image, is_mostly_text=self.is_mostly_text,
+                                           pdf_path=self.input_path[0], pdf_session=self.pdf_session,
+                                           ocr_data=self.preprocessed_ocr_data, layout_image=self.typed_file,
+                                           log=self.log) as step:
+                    text_annotation, text_json, self.words = step.run()
+                    # OCR tokens are passed to the next stages as TokenStore (TOKEN_STORE)
+                    self.text_json = as_token_store(text_json)
+                    self.layout_boxes = step.layout_boxes
+                    self.text_stats = step.stats
+                    self.text_image = self.render_annotation(text_annotation)
+                    # if dev_mode: Save annotated result (not cached)
+                    if self.dev_mode and self.text_image is not None:
                         if self.file_type == "pdf":
                             save_file(self.text_image, save_dir="TEXT_IMAGE_PATH", filename=self.file_name)
                         else:
                             save_image(self.text_image, save_dir="TEXT_IMAGE_PATH", filename=self.file_name)
-                    if self.text_json is not None:
-                        save_json(self.text_json, save_dir="TEXT_JSON_PATH", filename=self.file_name)
+                self.store_stage(key, (self.text_json, self.words, self.layout_boxes, self.text_stats))
+            # if dev_mode: Save OCR tokens (also cached results)
+            if self.dev_mode and self.text_json is not None:
+                save_tokens_result(self.text_json, save_dir="TEXT_JSON_PATH", filename=self.file_name)
 
     def load_or_run_layout(self, run_step: bool = False):
         if not run_step:
             path_image = os.path.join(os.getenv("LAYOUT_IMAGE_PATH"), f"{self.file_name}.png")
-            json_path = os.path.join(os.getenv("LAYOUT_JSON_PATH"), f"{self.file_name}.json")
 
             # Try to load layout data from cache
             if os.path.exists(path_image):
@@ -138,27 +197,49 @@ class Pipeline:
                 if self.log:
                     print(f"[WARNING] Layout image not found: {path_image}, run layout analysis step")
 
-            if os.path.exists(json_path):
-                with open(json_path, "r", encoding="utf-8") as f:
-                    self.layout_json = json.load(f)
-            else:
+            # Layout elements (.layout or .json, INTERMEDIATE_FORMAT)
+            self.layout_json = load_layout_result("LAYOUT_JSON_PATH", self.file_name)
+            if self.layout_json is None:
                 if self.log:
-                    print(f"[WARNING] Layout JSON not found: {json_path}, run layout analysis step")
+                    print(f"[WARNING] Layout not found in {os.getenv('LAYOUT_JSON_PATH')}: {self.file_name}, "
+                          f"run layout analysis step")
 
         if run_step:
             # Check if required data exist
             if self.file_type is None or self.typed_file is None or self.input_path is None or self.text_json is None:
                 raise TypeError("Cannot run layout step: file_type and/or typed_file and/or  input_path and/or text_json is missing")
-            # Run layout detection
-            with ContextLayout(file_type=self.file_type, text_json=self.text_json, words=self.words, image=self.typed_file,
-                               pdf_path=self.input_path[0], log=self.log) as step:
-                self.layout_image, self.layout_json = step.run()
-                # Save result if in dev mode
-                if self.dev_mode:
-                    if self.layout_image is not None:
+            key, cached = self.load_cached_stage("layout", self.stage_keys.get("text_extraction"))
+            if cached is not None:
+                self.layout_json = cached
+            else:
+                # Run layout detection
+                with ContextLayout(file_type=self.file_type, text_json=self.text_json, words=self.words, image=self.typed_file,
+                                   pdf_path=self.input_path[0], pdf_session=self.pdf_session,
+                                   layout_boxes=self.layout_boxes, log=self.log) as step:
+                    layout_annotation, self.layout_json = step.run()
+                    self.layout_image = self.render_annotation(layout_annotation)
+                    # Save annotated result if in dev mode (not cached)
+                    if self.dev_mode and self.layout_image is not None:
                         save_image(self.layout_image, save_dir="LAYOUT_IMAGE_PATH", filename=self.file_name)
-                    if self.layout_json is not None:
-                        save_json(self.layout_json, save_dir="LAYOUT_JSON_PATH", filename=self.file_name)
+                self.store_stage(key, self.layout_json)
+            # Save layout if in dev mode (also cached results)
+            if self.dev_mode and self.layout_json is not None:
+                save_layout_result(self.layout_json, save_dir="LAYOUT_JSON_PATH", filename=self.file_name)
+
+    def pdf_page_height(self):
+        # text_json of text PDFs (StrategyPdf) is in PDF coordinates, measured from the bottom of the first page
+        if self.file_type != "pdf":
+            return None
+        if self.pdf_session is not None:
+            return self.pdf_session.page_size(0)[1]
+        with PdfSession(self.input_path[0], log=self.log) as pdf_session:
+            return pdf_session.page_size(0)[1]
+
+    def render_annotation(self, annotation):
+        # Deferred annotation stage: draw boxes only if annotated outputs are needed
+        if not self.annotate or annotation is None:
+            return None
+        return annotation.render(scale=self.annotation_scale)
 
     def load_or_run_content(self, run_step: bool = False):
         if not run_step:
@@ -175,12 +256,17 @@ class Pipeline:
             # Check if required data exist
             if self.typed_file is None or self.text_json is None or self.layout_json is None:
                 raise TypeError("Cannot run content analysis: typed_file and/or text_json and/or layout_json is missing")
-            # Run content analysis
-            with ContextContent(image=self.typed_file, text_json=self.text_json,
-                                layout_json=self.layout_json, log=self.log) as step:
-                self.content_json = step.run()
-                if self.dev_mode and self.content_json is not None:
-                    save_json(self.content_json, save_dir="CONTENT_JSON_PATH", filename=self.file_name)
+            key, cached = self.load_cached_stage("content", self.stage_keys.get("layout"))
+            if cached is not None:
+                self.content_json = cached
+            else:
+                # Run content analysis
+                with ContextContent(image=self.typed_file, text_json=self.text_json, layout_json=self.layout_json,
+                                    pdf_page_height=self.pdf_page_height(), log=self.log) as step:
+                    self.content_json = step.run()
+                self.store_stage(key, self.content_json)
+            if self.dev_mode and self.content_json is not None:
+                save_json(self.content_json, save_dir="CONTENT_JSON_PATH", filename=self.file_name)
 
     def load_or_run_postprocessor(self, run_step: bool = False):
         if not run_step:
@@ -191,7 +277,12 @@ class Pipeline:
         # Post processing to final JSON
         with PostProcessor(file_name=self.file_name, content_json=self.content_json, log=self.log) as step:
             result_json = step.run()
+            if result_json is None:
+                return
             if self.log:
-                print(result_json)
-            if result_json is not None:
+                print(f"## [Pipeline] result: {len(result_json['entities'])} entities, "
+                      f"{len(result_json['blocks'])} blocks")
+            if self.result_sink is not None:
+                self.result_sink.write(self.file_name, result_json)
+            else:
                 save_json(result_json, save_dir="OUTPUT_PATH", filename=self.file_name)
@@ -0,0 +1,261 @@
+import os
+import glob
+import json
+import sqlite3
+from dotenv import load_dotenv
+from src.util import dumps_json, to_builtin
+
+load_dotenv()
+
+# Output of the final results (RESULT_SINK):
+# json: one file per document in OUTPUT_PATH (util.save_json)
+# jsonl: one line per document in rotating files OUTPUT_PATH/results-00001.jsonl, ...
+# sqlite: SQLite database with entity index and full-text index over the blocks (RESULT_DB_PATH)
+RESULT_SINKS = ("json", "jsonl", "sqlite")
+
+
+class JsonlSink:
+    # appends one compact JSON line per document; buffered writes, fsync every fsync_every documents,
+    # a new file is started when a file exceeds max_bytes
+    def __init__(self, path, max_bytes, fsync_every=100, prefix="results", buffer_size=1 << 20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fsync_every = max(1, fsync_every)
+        self.prefix = prefix
+        self.buffer_size = buffer_size
+        self.file = None
+        self.file_index = 0
+        self.file_size = 0
+        self.pending = 0  # documents written since the last fsync
+        os.makedirs(path, exist_ok=True)
+        self.open_last()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def file_path(self, index):
+        return os.path.join(self.path, f"{self.prefix}-{index:05d}.jsonl")
+
+    def open_last(self):
+        # continue the last file of an earlier run if it has space left and ends with a complete line
+        files = jsonl_files(self.path, self.prefix)
+        self.file_index = int(os.path.basename(files[-1])[len(self.prefix) + 1:-6]) if files else 1
+        if files and (os.path.getsize(files[-1]) >= self.max_bytes or not ends_with_newline(files[-1])):
+            self.file_index += 1
+        self.open_file()
+
+    def open_file(self):
+        path = self.file_path(self.file_index)
+        self.file = open(path, "ab", buffering=self.buffer_size)
+        self.file_size = self.file.tell()
+
+    def write(self, document_id, result):
+        # document_id is part of the result (PostProcessor schema)
+        line = (dumps_json(result) + "\n").encode("utf-8")
+        if self.file_size > 0 and self.file_size + len(line) > self.max_bytes:
+            self.rotate()
+        self.file.write(line)
+        self.file_size += len(line)
+        self.pending += 1
+        if self.pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def rotate(self):
+        self.sync()
+        self.file.close()
+        self.file_index += 1
+        self.open_file()
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+
+def ends_with_newline(path):
+    with open(path, "rb") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def jsonl_files(path, prefix="results"):
+    return sorted(glob.glob(os.path.join(path, f"{prefix}-[0-9][0-9][0-9][0-9][0-9].jsonl")))
+
+
+def read_jsonl(path, prefix="results"):
+    # streams the results of all files; an incomplete last line (interrupted write) is skipped
+    for file in jsonl_files(path, prefix):
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                yield json.loads(line)
+
+
+# documents, entities (index on type/text) and blocks (FTS5 index on text, external content),
+# fields that are not columns are kept as JSON in "data"
+RESULT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    document_id TEXT UNIQUE NOT NULL,
+    created_at TEXT,
+    pipeline_version TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS entities (
+    document INTEGER NOT NULL REFERENCES documents(id),
+    type TEXT,
+    text TEXT,
+    confidence REAL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS entities_type_text ON entities(type, text);
+CREATE INDEX IF NOT EXISTS entities_text ON entities(text);
+CREATE INDEX IF NOT EXISTS entities_document ON entities(document);
+CREATE TABLE IF NOT EXISTS blocks (
+    id INTEGER PRIMARY KEY,
+    document INTEGER NOT NULL REFERENCES documents(id),
+    position INTEGER,
+    type TEXT,
+    text TEXT,
+    bbox TEXT,
+    confidence REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS blocks_document ON blocks(document);
+"""
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS blocks_fts USING fts5(text, content='blocks', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS blocks_insert AFTER INSERT ON blocks BEGIN
+    INSERT INTO blocks_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS blocks_delete AFTER DELETE ON blocks BEGIN
+    INSERT INTO blocks_fts(blocks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+BLOCK_COLUMNS = ("type", "text", "bbox", "confidence")
+
+
+class SqliteResultStore:
+    # writes the PostProcessor schema into SQLite, batch_size documents per transaction.
+    # A document that is written again replaces its earlier result.
+    def __init__(self, path, batch_size=100):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.pending = 0  # documents in the open transaction
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(RESULT_SCHEMA)
+        try:
+            self.connection.executescript(FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError as e:  # SQLite without FTS5
+            print(f"[WARNING] No full-text index for blocks: {e}")
+            self.full_text = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, document_id, result):
+        result = to_builtin(result)
+        metadata = result.get("metadata", {})
+        cursor = self.connection.cursor()
+        self.delete(cursor, document_id)
+        cursor.execute("INSERT INTO documents (document_id, created_at, pipeline_version, metadata) VALUES (?, ?, ?, ?)",
+                       (document_id, metadata.get("created_at"), metadata.get("pipeline_version"),
+                        json.dumps(metadata, ensure_ascii=False)))
+        document = cursor.lastrowid
+        cursor.executemany("INSERT INTO entities (document, type, text, confidence, source) VALUES (?, ?, ?, ?, ?)",
+                           [(document, entity.get("type"), entity.get("text"), entity.get("confidence"),
+                             entity.get("source")) for entity in result.get("entities", [])])
+        cursor.executemany("INSERT INTO blocks (document, position, type, text, bbox, confidence, data) "
+                           "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           [block_row(document, position, block)
+                            for position, block in enumerate(result.get("blocks", []))])
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+
+    def delete(self, cursor, document_id):
+        row = cursor.execute("SELECT id FROM documents WHERE document_id = ?", (document_id,)).fetchone()
+        if row is None:
+            return
+        cursor.execute("DELETE FROM entities WHERE document = ?", row)
+        cursor.execute("DELETE FROM blocks WHERE document = ?", row)
+        cursor.execute("DELETE FROM documents WHERE id = ?", row)
+
+    def commit(self):
+        self.connection.commit()
+        self.pending = 0
+
+    def close(self):
+        if self.connection is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
+
+    def find_entities(self, entity_type=None, text=None):
+        # document_ids with an entity of the type and/or text (exact match, uses the indexes)
+        conditions, parameters = [], []
+        if entity_type is not None:
+            conditions.append("entities.type = ?")
+            parameters.append(entity_type)
+        if text is not None:
+            conditions.append("entities.text = ?")
+            parameters.append(text)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return [row[0] for row in self.connection.execute(
+            f"SELECT DISTINCT documents.document_id FROM entities JOIN documents ON documents.id = entities.document "
+            f"{where} ORDER BY documents.document_id", parameters)]
+
+    def search_blocks(self, query, limit=100):
+        # full-text search (FTS5 query syntax, e.g. '"zahlbar innerhalb"' for a phrase), best matches first
+        if not self.full_text:
+            raise RuntimeError("SQLite was built without FTS5, blocks cannot be searched")
+        return self.connection.execute(
+            "SELECT documents.document_id, blocks.type, blocks.text FROM blocks_fts "
+            "JOIN blocks ON blocks.id = blocks_fts.rowid JOIN documents ON documents.id = blocks.document "
+            "WHERE blocks_fts MATCH ? ORDER BY blocks_fts.rank LIMIT ?", (query, limit)).fetchall()
+
+
+def block_row(document, position, block):
+    text = block.get("text")
+    if text is None and block.get("type") == "table":  # table text for the full-text index: one line per row
+        rows = [block.get("header") or []] + (block.get("rows") or [])
+        text = "\n".join("\t".join(str(cell) for cell in row if cell is not None) for row in rows)
+    data = {key: value for key, value in block.items() if key not in BLOCK_COLUMNS}
+    bbox = block.get("bbox")
+    return (document, position, block.get("type"), text, json.dumps(bbox) if bbox is not None else None,
+            block.get("confidence"), json.dumps(data, ensure_ascii=False) if data else None)
+
+
+def get_result_sink():
+    # RESULT_SINK=json: no sink, the pipeline writes one file per document
+    sink = os.getenv("RESULT_SINK", "json").lower()
+    if sink not in RESULT_SINKS:
+        raise ValueError(f"Unknown RESULT_SINK '{sink}', expected one of {RESULT_SINKS}")
+    if sink == "jsonl":
+        return JsonlSink(os.getenv("OUTPUT_PATH"),
+                         max_bytes=int(float(os.getenv("RESULT_JSONL_MAX_MB", 256)) * 1024 * 1024),
+                         fsync_every=int(os.getenv("RESULT_FSYNC_EVERY", 100)))
+    if sink == "sqlite":
+        path = os.getenv("RESULT_DB_PATH") or os.path.join(os.getenv("OUTPUT_PATH"), "results.sqlite")
+        return SqliteResultStore(path, batch_size=int(os.getenv("RESULT_DB_BATCH", 100)))
+    return None
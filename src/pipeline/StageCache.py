@@ -0,0 +1,158 @@
+import os
+import glob
+import shutil
+import json
+import pickle
+import hashlib
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_VERSION = 1  # increase if the format of the cached values changes
+
+# per stage: settings (.env), model/dictionary files (settings with a path, by size and modification time)
+# and source code the result depends on (folders/files relative to src/pipeline).
+# A key also contains the key of the previous stage, so changes of earlier stages invalidate later ones.
+TESSERACT_FILES = ["TESSERACT_CMD", "TESSDATA_PREFIX", "TESSERACT_LIBRARY"]
+STAGES = {
+    "preprocessing": {
+        "settings": ["PDF_RENDER_BACKEND", "PDF_RENDER_DPI", "OCR_MODE", "OCR_ADAPTIVE_RESOLUTION", "TEXT_MODEL",
+                     "TESSERACT_BACKEND"] + TESSERACT_FILES,
+        "files": ["TEXT_MODEL"] + TESSERACT_FILES,
+        "code": ["stepFiletype", "pdfBackend", "stepPreprocessing", "ocrBackend", "../util.py"],
+    },
+    "text_extraction": {
+        "settings": ["PDF_WORD_BACKEND", "OCR_MODE", "OCR_CASCADE_CONFIDENCE", "OCR_ADAPTIVE_RESOLUTION", "TEXT_MODEL",
+                     "TESSERACT_BACKEND", "FASTERCRNN_LAYOUT", "FRCNN_CPU_MODE", "FRCNN_PRECISION",
+                     "TOKEN_STORE"] + TESSERACT_FILES,
+        "files": ["TEXT_MODEL", "FASTERCRNN_LAYOUT"] + TESSERACT_FILES,
+        "code": ["stepTextExtraction", "stepLayout/layoutStrategy", "ocrBackend", "pdfBackend", "TokenStore.py",
+                 "../util.py"],
+    },
+    "layout": {
+        "settings": ["FASTERCRNN_LAYOUT", "DETR_LAYOUT", "DETR_PROCESSOR", "FRCNN_CPU_MODE", "FRCNN_PRECISION",
+                     "LAYOUT_REFERENCES", "TOKEN_STORE"],
+        "files": ["FASTERCRNN_LAYOUT", "DETR_LAYOUT", "DETR_PROCESSOR"],
+        "code": ["stepLayout", "pdfBackend", "TokenStore.py"],
+    },
+    "content": {
+        "settings": ["FLAIR_CONTENT", "FLAIR_QUANTIZED", "NER_INPUT", "SYM_DICT_PATH", "REGEX_EXTRACTORS",
+                     "TOKEN_STORE"],
+        "files": ["FLAIR_CONTENT", "SYM_DICT_PATH"],
+        "code": ["stepContent", "TokenStore.py"],
+    },
+}
+
+_code_hashes = {}
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_hash(stage):
+    # hash of all source files of a stage, computed once per process
+    if stage not in _code_hashes:
+        digest = hashlib.sha256()
+        for entry in STAGES[stage]["code"]:
+            path = os.path.normpath(os.path.join(PIPELINE_DIR, entry))
+            files = sorted(glob.glob(os.path.join(path, "**", "*.py"), recursive=True)) if os.path.isdir(path) else [path]
+            for file in files:
+                digest.update(os.path.relpath(file, PIPELINE_DIR).encode("utf-8"))
+                digest.update(file_hash(file).encode("utf-8"))
+        _code_hashes[stage] = digest.hexdigest()
+    return _code_hashes[stage]
+
+
+def path_fingerprint(value):
+    # size and modification time of a file or of all files of a folder (replaced models, edited dictionaries)
+    if not value:
+        return None
+    path = value if os.path.exists(value) else shutil.which(value)  # e.g. TESSERACT_CMD=tesseract
+    if path is None:
+        return "missing"
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        for name in sorted(names):
+            file = os.path.join(root, name)
+            stat = os.stat(file)
+            files.append([os.path.relpath(file, path), stat.st_size, stat.st_mtime_ns])
+    return files
+
+
+def stage_key(stage, upstream_key, **config):
+    # content address of a stage result: previous key + settings + model files + code + further configuration
+    settings = {name: os.getenv(name) for name in STAGES[stage]["settings"]}
+    files = {name: path_fingerprint(os.getenv(name)) for name in STAGES[stage]["files"]}
+    description = json.dumps({"version": CACHE_VERSION, "stage": stage, "upstream": upstream_key,
+                              "settings": settings, "files": files, "config": config, "code": code_hash(stage)},
+                             sort_keys=True, default=str)
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    # results on disk (pickle) by key, least recently used files are removed above max_bytes
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def file_path(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        path = self.file_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"[WARNING] Stage cache entry not readable: {path} ({e})")
+            return None
+        os.utime(path)  # most recently used
+        return value
+
+    def put(self, key, value):
+        path = self.file_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        files = []
+        for path in glob.glob(os.path.join(self.path, "*", "*.pkl")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def get_stage_cache():
+    # STAGE_CACHE_PATH empty (default): no stage cache (results are loaded by file name if a step is not run)
+    path = os.getenv("STAGE_CACHE_PATH")
+    if not path:
+        return None
+    return StageCache(path, max_bytes=int(float(os.getenv("STAGE_CACHE_MAX_MB", 2048)) * 1024 * 1024))
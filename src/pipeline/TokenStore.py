@@ -0,0 +1,189 @@
+import os
+from collections.abc import Mapping, MutableMapping, Sequence
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+COLUMNS = ("text", "bbox", "confidence")
+
+
+class TokenStore(Sequence):
+    # OCR tokens as struct of arrays: interned texts, bboxes (n, 4) and confidences as NumPy arrays,
+    # further keys (region, engine, original_text, ...) sparse per token.
+    # Items are TokenDict views, so steps written for text_json (list of dicts) keep working.
+    def __init__(self, strings, text_ids, bboxes, confidences, extras=None):
+        self.strings = strings  # string table, text_ids index into it
+        self.string_ids = {text: i for i, text in enumerate(strings)}
+        self.text_ids = text_ids
+        self.bboxes = bboxes
+        self.confidences = confidences  # NaN: no confidence
+        self.extras = extras or {}  # key -> {token index: value}
+
+    @classmethod
+    def from_entries(cls, entries):
+        entries = list(entries)
+        strings = []
+        string_ids = {}
+        text_ids = np.empty(len(entries), dtype=np.int32)
+        extras = {}
+        for i, entry in enumerate(entries):
+            text = entry.get("text", "")
+            if text not in string_ids:
+                string_ids[text] = len(strings)
+                strings.append(text)
+            text_ids[i] = string_ids[text]
+            for key, value in entry.items():
+                if key not in COLUMNS:
+                    extras.setdefault(key, {})[i] = value
+
+        boxes = [entry.get("bbox") or [np.nan] * 4 for entry in entries]
+        integer = all(isinstance(v, (int, np.integer)) for box in boxes for v in box)
+        bboxes = np.array(boxes, dtype=np.int32 if integer else np.float64).reshape(-1, 4)
+        confidences = [entry.get("confidence") for entry in entries]
+        integer = all(isinstance(v, (int, np.integer)) for v in confidences)
+        confidences = np.array([np.nan if v is None else v for v in confidences],
+                               dtype=np.int32 if integer else np.float64)
+        return cls(strings, text_ids, bboxes, confidences, extras)
+
+    def __len__(self):
+        return len(self.text_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TokenDict(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return TokenDict(self, index)
+
+    def __iter__(self):
+        return (TokenDict(self, i) for i in range(len(self)))
+
+    def text(self, index):
+        return self.strings[self.text_ids[index]]
+
+    def set_text(self, index, text):
+        # new texts are added to the string table (interned)
+        if text not in self.string_ids:
+            self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        self.text_ids[index] = self.string_ids[text]
+
+    def texts(self, indices=None):
+        indices = range(len(self)) if indices is None else indices
+        return [self.strings[self.text_ids[i]] for i in indices]
+
+    def view(self, indices):
+        # tokens at the given indices as TokenDict views, no data is copied
+        return [TokenDict(self, int(i)) for i in indices]
+
+    def overlapping(self, box, min_fraction=0.5):
+        # indices of tokens whose box lies more than min_fraction inside box (vectorized)
+        x1, y1, x2, y2 = box
+        boxes = self.bboxes.astype(np.float64)
+        inter_width = np.clip(np.minimum(boxes[:, 2], x2) - np.maximum(boxes[:, 0], x1), 0, None)
+        inter_height = np.clip(np.minimum(boxes[:, 3], y2) - np.maximum(boxes[:, 1], y1), 0, None)
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            inside = (areas > 0) & (inter_width * inter_height / areas > min_fraction)
+        return np.flatnonzero(inside)
+
+    def to_entries(self):
+        return [dict(token) for token in self]
+
+    def nbytes(self):
+        # approximate memory of the store: arrays, string table, sparse extras
+        strings = sum(len(text.encode("utf-8")) + 49 for text in self.strings)
+        extras = sum(len(values) * 100 for values in self.extras.values())  # rough size of a dict item
+        return self.text_ids.nbytes + self.bboxes.nbytes + self.confidences.nbytes + strings + extras
+
+
+class TokenDict(MutableMapping):
+    # dict-compatible view of one token, reads and writes go to the TokenStore
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        store, i = self.store, self.index
+        if key == "text":
+            return store.strings[store.text_ids[i]]
+        if key == "bbox":
+            if store.bboxes.dtype.kind == "f" and np.isnan(store.bboxes[i]).any():
+                raise KeyError(key)
+            return store.bboxes[i].tolist()
+        if key == "confidence":
+            confidence = store.confidences[i]
+            if np.isnan(confidence):
+                raise KeyError(key)
+            return confidence.item()
+        if key in store.extras and i in store.extras[key]:
+            return store.extras[key][i]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        store, i = self.store, self.index
+        if key == "text":
+            store.set_text(i, value)
+        elif key == "bbox":
+            store.bboxes = fit_column(store.bboxes, value)
+            store.bboxes[i] = value
+        elif key == "confidence":
+            value = np.nan if value is None else value
+            store.confidences = fit_column(store.confidences, value)
+            store.confidences[i] = value
+        else:
+            store.extras.setdefault(key, {})[i] = value
+
+    def __delitem__(self, key):
+        if key in COLUMNS or key not in self.store.extras or self.index not in self.store.extras[key]:
+            raise KeyError(key)
+        del self.store.extras[key][self.index]
+
+    def __iter__(self):
+        for key in COLUMNS:
+            if key in self:
+                yield key
+        for key, values in self.store.extras.items():
+            if self.index in values:
+                yield key
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict(self) == dict(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def fit_column(column, value):
+    # integer columns become float columns before a non-integer value is written
+    if column.dtype.kind == "i" and not all(isinstance(v, (int, np.integer)) for v in np.ravel(value).tolist()):
+        return column.astype(np.float64)
+    return column
+
+
+def use_token_store():
+    # TOKEN_STORE=false: text_json stays a list of dicts
+    return os.getenv("TOKEN_STORE", "true").lower() == "true"
+
+
+def as_token_store(text_json):
+    if text_json is None or isinstance(text_json, TokenStore) or not use_token_store():
+        return text_json
+    return TokenStore.from_entries(text_json)
@@ -0,0 +1,319 @@
+import os
+import glob
+import queue
+import atexit
+import ctypes
+import ctypes.util
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+import numpy as np
+import pytesseract
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OEM_DEFAULT = 3  # Tesseract default: engine based on what is available
+PSM_AUTO = 3  # CLI default; the C API would default to --psm 6
+TSV_COLUMNS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text"]
+
+
+class PytesseractBackend:
+    # One tesseract process per call (temp image file, language model loaded every time)
+    name = "pytesseract"
+
+    def __init__(self, omp_thread_limit=None):
+        # OMP_THREAD_LIMIT of each started tesseract process (None: inherited from this process)
+        self.omp_thread_limit = omp_thread_limit
+
+    def image_to_string(self, image, lang, oem=None, psm=None):
+        if self.omp_thread_limit is not None:
+            return self.run(image, lang, oem, psm)
+        return pytesseract.image_to_string(image, lang=lang, config=build_config(oem, psm))
+
+    def image_to_data(self, image, lang, oem=None, psm=None):
+        if self.omp_thread_limit is not None:
+            return tsv_to_dict(self.run(image, lang, oem, psm, "tsv").split("\n", 1)[-1])  # without header line
+        return pytesseract.image_to_data(image, lang=lang, config=build_config(oem, psm),
+                                         output_type=pytesseract.Output.DICT)
+
+    def run(self, image, lang, oem, psm, extension=None):
+        # tesseract CLI as pytesseract calls it, but with its own environment (pytesseract has no env option)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "image.png")
+            Image.fromarray(to_array(image)).save(path)
+            args = [pytesseract.pytesseract.tesseract_cmd, path, "stdout", "-l", lang] + build_config(oem, psm).split()
+            if extension is not None:
+                args.append(extension)
+            result = subprocess.run(args, capture_output=True,
+                                    env=dict(os.environ, OMP_THREAD_LIMIT=self.omp_thread_limit))
+        if result.returncode != 0:
+            raise RuntimeError(f"Tesseract: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return result.stdout.decode("utf-8")
+
+
+class WorkerBackend:
+    # Long-lived worker processes with libtesseract and the language model already loaded.
+    # Images are sent over pipes as arrays, no temp files and no process start per call.
+    name = "worker"
+
+    def __init__(self, workers=None):
+        self.workers = workers or int(os.getenv("TESSERACT_WORKERS", os.cpu_count() or 1))
+        self._idle = queue.Queue()  # workers that are free, callers from several threads wait here
+        self._started = []
+        self._lock = threading.Lock()
+
+    def image_to_string(self, image, lang, oem=None, psm=None):
+        return self.run("string", image, lang, oem, psm)
+
+    def image_to_data(self, image, lang, oem=None, psm=None):
+        return tsv_to_dict(self.run("tsv", image, lang, oem, psm))
+
+    def run(self, kind, image, lang, oem, psm):
+        self.start()
+        worker = self._idle.get()
+        try:
+            worker.conn.send((kind, to_array(image), lang, OEM_DEFAULT if oem is None else oem,
+                              PSM_AUTO if psm is None else psm))
+            status, result = worker.conn.recv()
+        except (EOFError, OSError):
+            # worker died (e.g. crash in libtesseract) -> replace it, the request fails
+            worker = self.replace(worker)
+            raise RuntimeError("Tesseract worker process terminated")
+        finally:
+            self._idle.put(worker)
+        if status == "error":
+            raise RuntimeError(f"Tesseract worker: {result}")
+        return result
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            # one OpenMP thread per worker if several workers share the cores
+            omp_thread_limit = "1" if self.workers > 1 else os.getenv("OMP_THREAD_LIMIT")
+            for _ in range(self.workers):
+                worker = TesseractWorker(omp_thread_limit)
+                self._started.append(worker)
+                self._idle.put(worker)
+            atexit.register(self.close)
+
+    def replace(self, worker):
+        worker.close()
+        new_worker = TesseractWorker(worker.omp_thread_limit)
+        with self._lock:
+            self._started[self._started.index(worker)] = new_worker
+        return new_worker
+
+    def close(self):
+        with self._lock:
+            for worker in self._started:
+                worker.close()
+            self._started = []
+            self._idle = queue.Queue()
+
+
+class TesseractWorker:
+    def __init__(self, omp_thread_limit=None):
+        self.omp_thread_limit = omp_thread_limit
+        # spawn: no copy of the parent (torch, paddle, models) in the worker
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_loop, args=(child_conn, omp_thread_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (EOFError, OSError):
+            pass
+        self.conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+def worker_loop(conn, omp_thread_limit):
+    # Runs in the worker process: one TessBaseAPI per language/engine, reused for all images
+    if omp_thread_limit is not None:
+        os.environ["OMP_THREAD_LIMIT"] = omp_thread_limit  # must be set before libtesseract is loaded
+    library = None
+    apis = {}
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            kind, image, lang, oem, psm = request
+            try:
+                if library is None:
+                    library = load_library()
+                if (lang, oem) not in apis:
+                    apis[(lang, oem)] = TesseractApi(library, lang, oem)
+                api = apis[(lang, oem)]
+                result = api.tsv(image, psm) if kind == "tsv" else api.text(image, psm)
+                conn.send(("ok", result))
+            except Exception as e:
+                conn.send(("error", str(e)))
+    finally:
+        for api in apis.values():
+            api.close()
+        conn.close()
+
+
+class TesseractApi:
+    # Minimal ctypes binding of the Tesseract C API (capi.h)
+    def __init__(self, library, lang, oem):
+        self.library = library
+        self.handle = library.TessBaseAPICreate()
+        datapath = get_tessdata_path()
+        result = library.TessBaseAPIInit2(self.handle, datapath.encode() if datapath else None, lang.encode(), oem)
+        if result != 0:
+            library.TessBaseAPIDelete(self.handle)
+            raise RuntimeError(f"Could not initialize Tesseract with language '{lang}' (tessdata: {datapath})")
+
+    def set_image(self, image, psm):
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        self.library.TessBaseAPISetPageSegMode(self.handle, psm)
+        self.library.TessBaseAPISetImage(self.handle, image.ctypes.data_as(ctypes.c_void_p), width, height,
+                                         bytes_per_pixel, width * bytes_per_pixel)
+
+    def tsv(self, image, psm):
+        self.set_image(image, psm)
+        return self.read_text(self.library.TessBaseAPIGetTsvText(self.handle, 0))
+
+    def text(self, image, psm):
+        self.set_image(image, psm)
+        return self.read_text(self.library.TessBaseAPIGetUTF8Text(self.handle))
+
+    def read_text(self, pointer):
+        if not pointer:
+            raise RuntimeError("Tesseract recognition failed")
+        try:
+            return ctypes.string_at(pointer).decode("utf-8")
+        finally:
+            self.library.TessDeleteText(pointer)
+            self.library.TessBaseAPIClear(self.handle)
+
+    def close(self):
+        self.library.TessBaseAPIEnd(self.handle)
+        self.library.TessBaseAPIDelete(self.handle)
+
+
+def load_library():
+    path = find_library()
+    if path is None:
+        raise RuntimeError("libtesseract not found, set TESSERACT_LIBRARY in .env")
+    library = ctypes.CDLL(path)
+    library.TessBaseAPICreate.restype = ctypes.c_void_p
+    library.TessBaseAPIInit2.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    library.TessBaseAPIInit2.restype = ctypes.c_int
+    library.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    library.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                            ctypes.c_int, ctypes.c_int]
+    library.TessBaseAPIGetTsvText.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    library.TessBaseAPIGetTsvText.restype = ctypes.c_void_p  # c_void_p: pointer must be freed with TessDeleteText
+    library.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+    library.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+    library.TessDeleteText.argtypes = [ctypes.c_void_p]
+    library.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+    library.TessBaseAPIEnd.argtypes = [ctypes.c_void_p]
+    library.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+    return library
+
+
+def find_library():
+    # TESSERACT_LIBRARY, system library path, or next to TESSERACT_CMD (Windows installer)
+    path = os.getenv("TESSERACT_LIBRARY")
+    if path:
+        return path
+    path = ctypes.util.find_library("tesseract")
+    if path:
+        return path
+    tesseract_cmd = os.getenv("TESSERACT_CMD")
+    if tesseract_cmd:
+        candidates = glob.glob(os.path.join(os.path.dirname(tesseract_cmd), "libtesseract*.dll"))
+        if candidates:
+            return candidates[0]
+    return None
+
+
+def get_tessdata_path():
+    # None -> TESSDATA_PREFIX or the compiled-in default of libtesseract
+    if os.getenv("TESSDATA_PREFIX"):
+        return os.getenv("TESSDATA_PREFIX")
+    tesseract_cmd = os.getenv("TESSERACT_CMD")
+    if tesseract_cmd and os.path.isdir(os.path.join(os.path.dirname(tesseract_cmd), "tessdata")):
+        return os.path.join(os.path.dirname(tesseract_cmd), "tessdata")
+    return None
+
+
+def to_array(image):
+    # uint8 array with 1, 3 or 4 channels, as pytesseract would pass it to tesseract
+    if isinstance(image, Image.Image):
+        if image.mode not in ("L", "RGB", "RGBA"):
+            image = image.convert("RGB")
+        image = np.asarray(image)
+    if image.dtype == bool:
+        image = image.astype(np.uint8) * 255
+    elif image.dtype != np.uint8:
+        image = np.clip(image, 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(image)
+
+
+def tsv_to_dict(tsv):
+    # same structure as pytesseract.Output.DICT (the C API returns the TSV without header line):
+    # level, numbers and geometry as int, conf as float (Tesseract 4+ reports e.g. 96.532)
+    data = {column: [] for column in TSV_COLUMNS}
+    text_index = len(TSV_COLUMNS) - 1
+    for row in tsv.splitlines():
+        cells = row.split("\t")
+        if len(cells) < text_index:
+            continue
+        if len(cells) == text_index:
+            cells.append("")
+        for column, value in zip(TSV_COLUMNS[:text_index], cells):
+            data[column].append(float(value) if column == "conf" else int(value))
+        data["text"].append(cells[text_index])
+    return data
+
+
+def build_config(oem=None, psm=None):
+    config = []
+    if oem is not None:
+        config.append(f"--oem {oem}")
+    if psm is not None:
+        config.append(f"--psm {psm}")
+    return " ".join(config)
+
+
+TESSERACT_BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    WorkerBackend.name: WorkerBackend,
+}
+
+_backends = {}  # one instance per backend (the worker backend owns its processes)
+_backends_lock = threading.Lock()
+
+
+def get_tesseract_backend(name=None, parallel=False):
+    # backend is selected in .env (TESSERACT_BACKEND), pytesseract is default
+    # parallel: the caller runs several OCR calls at the same time -> one OpenMP thread per tesseract process
+    # (pytesseract: set for each started process, worker: already the case with more than one worker)
+    name = name or os.getenv("TESSERACT_BACKEND") or PytesseractBackend.name
+    if name not in TESSERACT_BACKENDS:
+        raise ValueError(f"Unknown Tesseract backend: {name}")
+    key = (name, parallel and name == PytesseractBackend.name)
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = PytesseractBackend(omp_thread_limit="1") if key[1] else TESSERACT_BACKENDS[name]()
+        return _backends[key]
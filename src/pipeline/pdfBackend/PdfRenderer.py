@@ -0,0 +1,107 @@
+import os
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pypdfium2 as pdfium
+from pdf2image import convert_from_path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_DPI = 300
+PDF_POINTS_PER_INCH = 72
+
+_pool = None  # worker pool is reused for all documents, recreated if another number of workers is requested
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def render_pages(pdf_path, pages=None, dpi=DEFAULT_DPI, grayscale=False, backend=None, workers=None):
+    # Render pages of a PDF to NumPy arrays (RGB or 2D grayscale)
+    # pages: list of page indexes (None -> all pages), dpi: int or {page_index: dpi}
+    backend = backend or os.getenv("PDF_RENDER_BACKEND") or "pdf2image"
+    if pages is None:
+        pages = list(range(get_page_count(pdf_path)))
+    jobs = [(pdf_path, page_index, get_page_dpi(dpi, page_index), grayscale) for page_index in pages]
+
+    if backend == "pdf2image":
+        return [render_page_pdf2image(*job) for job in jobs]
+    if backend != "pypdfium2":
+        raise ValueError(f"Unknown PDF render backend: {backend}")
+
+    workers = workers if workers is not None else int(os.getenv("PDF_RENDER_WORKERS", os.cpu_count() or 1))
+    # single pages are rendered in-process, starting workers would cost more than it saves
+    if len(jobs) == 1 or workers <= 1:
+        return [render_page_pdfium(*job) for job in jobs]
+    return list(get_pool(workers).map(_render_page_job, jobs))
+
+
+def render_page(pdf_path, page_index=0, dpi=DEFAULT_DPI, grayscale=False, backend=None):
+    return render_pages(pdf_path, pages=[page_index], dpi=dpi, grayscale=grayscale, backend=backend)[0]
+
+
+def get_page_dpi(dpi, page_index):
+    if isinstance(dpi, dict):
+        return dpi.get(page_index, DEFAULT_DPI)
+    return dpi
+
+
+def get_page_count(pdf_path):
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def render_page_pdfium(pdf_path, page_index, dpi, grayscale):
+    # Render in-process with PDFium directly into a NumPy array (no temp files, no subprocess)
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return render_pdfium_page(pdf[page_index], dpi, grayscale)
+    finally:
+        pdf.close()
+
+
+def render_pdfium_page(page, dpi, grayscale):
+    # Render an already opened PDFium page
+    bitmap = page.render(scale=dpi / PDF_POINTS_PER_INCH, grayscale=grayscale,
+                         rev_byteorder=True)  # rev_byteorder -> RGB instead of BGR
+    image = bitmap.to_numpy()
+    image = image[:, :, 0] if grayscale else image  # grayscale bitmap has one channel
+    return np.array(image)  # copy, bitmap buffer is freed with the document
+
+
+def render_page_pdf2image(pdf_path, page_index, dpi, grayscale):
+    # Render with poppler (pdftoppm subprocess)
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_index + 1, last_page=page_index + 1,
+                               grayscale=grayscale)
+    return np.array(images[0])
+
+
+def _render_page_job(job):
+    return render_page_pdfium(*job)
+
+
+def get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is None:
+                atexit.register(shutdown_pool)
+            else:
+                _pool.shutdown(wait=False)  # jobs already submitted by other callers still finish
+            # spawn: PDFium is not fork-safe once it has been initialised in the parent process
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
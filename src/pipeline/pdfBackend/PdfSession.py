@@ -0,0 +1,85 @@
+import os
+from PyPDF2 import PdfReader
+from dotenv import load_dotenv
+from .PdfWordBackend import get_word_backend, PdfiumWordBackend
+from .PdfRenderer import render_page, render_pdfium_page, DEFAULT_DPI
+
+load_dotenv()
+
+
+class PdfSession:
+    # One parsed PDF per document: opened once at file typing and shared by all pipeline stages.
+    # Pages, words and rendered images are created lazily and cached.
+    def __init__(self, pdf_path, word_backend=None, log: bool = False):
+        self.pdf_path = pdf_path
+        self.log = log
+        self.backend = get_word_backend(word_backend)
+        self._document = None
+        self._pdf_reader = None
+        self._has_text = None
+        self._page_sizes = {}
+        self._words = {}
+        self._images = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def document(self):
+        # parsed document of the word backend (pdfplumber.PDF or pypdfium2.PdfDocument)
+        if self._document is None:
+            if self.log:
+                print(f"## [PdfSession] Parsing PDF with {self.backend.name}: {self.pdf_path}")
+            self._document = self.backend.open(self.pdf_path)
+        return self._document
+
+    @property
+    def pdf_reader(self):
+        # PyPDF2 reader, only needed for writing annotated PDFs
+        if self._pdf_reader is None:
+            self._pdf_reader = PdfReader(self.pdf_path)
+        return self._pdf_reader
+
+    def page_count(self):
+        return self.backend.page_count(self.document)
+
+    def page_size(self, page_index=0):
+        if page_index not in self._page_sizes:
+            self._page_sizes[page_index] = self.backend.page_size(self.document, page_index)
+        return self._page_sizes[page_index]
+
+    def has_text(self):
+        if self._has_text is None:
+            self._has_text = self.backend.has_text(self.document)
+        return self._has_text
+
+    def words(self, page_index=0, keep_blank_chars=False, use_text_flow=False):
+        key = (page_index, keep_blank_chars, use_text_flow)
+        if key not in self._words:
+            self._words[key] = self.backend.extract_words(self.document, page_index,
+                                                          keep_blank_chars=keep_blank_chars,
+                                                          use_text_flow=use_text_flow)
+        return self._words[key]
+
+    def render(self, page_index=0, dpi=DEFAULT_DPI, grayscale=False):
+        key = (page_index, dpi, grayscale)
+        if key not in self._images:
+            render_backend = os.getenv("PDF_RENDER_BACKEND") or "pdf2image"
+            if render_backend == "pypdfium2" and isinstance(self.backend, PdfiumWordBackend):
+                # document is already parsed by PDFium -> render from it
+                self._images[key] = render_pdfium_page(self.document[page_index], dpi, grayscale)
+            else:
+                self._images[key] = render_page(self.pdf_path, page_index, dpi=dpi, grayscale=grayscale,
+                                                backend=render_backend)
+        return self._images[key]
+
+    def close(self):
+        if self._document is not None:
+            self.backend.close(self._document)
+            self._document = None
+        self._pdf_reader = None
+        self._words.clear()
+        self._images.clear()
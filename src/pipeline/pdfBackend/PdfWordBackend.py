@@ -0,0 +1,237 @@
+import os
+import re
+import ctypes
+import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Same default tolerances as pdfplumber.extract_words
+X_TOLERANCE = 3
+Y_TOLERANCE = 3
+# subset prefix of embedded fonts ("BCDEEE+Aptos"): PDFium strips it for some fonts only -> removed in both backends
+FONT_SUBSET_PREFIX = re.compile(r"^[A-Z]{6}\+")
+
+
+class PdfplumberWordBackend:
+    # Word extraction with pdfplumber (pure-Python pdfminer)
+    name = "pdfplumber"
+
+    def open(self, pdf_path):
+        return pdfplumber.open(pdf_path)
+
+    def close(self, document):
+        document.close()
+
+    def page_count(self, document):
+        return len(document.pages)
+
+    def page_size(self, document, page_index=0):
+        page = document.pages[page_index]
+        return page.width, page.height
+
+    def has_text(self, document):
+        # check if PDF contains real (machine-readable) text
+        for page in document.pages:
+            text = page.extract_text()
+            if text and text.strip():
+                return True
+        return False
+
+    def extract_words(self, document, page_index=0, keep_blank_chars=False, use_text_flow=False):
+        page = document.pages[page_index]
+        words = page.extract_words(keep_blank_chars=keep_blank_chars, use_text_flow=use_text_flow,
+                                   extra_attrs=["size", "fontname"])
+        return [{
+            "text": word["text"],
+            "x0": word["x0"],
+            "x1": word["x1"],
+            "top": word["top"],
+            "bottom": word["bottom"],
+            "size": word["size"],
+            "fontname": normalize_font_name(word["fontname"]),
+        } for word in words]
+
+
+class PdfiumWordBackend:
+    # Word extraction with pypdfium2 (native PDFium text layer), same word dicts as pdfplumber.
+    # PDFium drops whitespace-only runs and some trailing spaces of its text layer, so phrases
+    # (keep_blank_chars) can lack the blank entries and trailing blanks pdfplumber returns.
+    name = "pypdfium2"
+
+    def open(self, pdf_path):
+        return pdfium.PdfDocument(pdf_path)
+
+    def close(self, document):
+        document.close()
+
+    def page_count(self, document):
+        return len(document)
+
+    def page_size(self, document, page_index=0):
+        return document[page_index].get_size()
+
+    def has_text(self, document):
+        for page in document:
+            textpage = page.get_textpage()
+            text = textpage.get_text_bounded()
+            textpage.close()
+            if text and text.strip():
+                return True
+        return False
+
+    def extract_words(self, document, page_index=0, keep_blank_chars=False, use_text_flow=False):
+        chars = self.extract_chars(document[page_index])
+        if not use_text_flow:
+            chars = sort_chars_into_lines(chars)
+        return chars_to_words(chars, keep_blank_chars=keep_blank_chars)
+
+    def extract_chars(self, page):
+        page_height = page.get_height()
+        textpage = page.get_textpage()
+        chars = []
+        try:
+            count = textpage.count_chars()
+            index = 0
+            while index < count:
+                code = pdfium_c.FPDFText_GetUnicode(textpage.raw, index)
+                step = 1
+                # combine UTF-16 surrogate pairs (characters outside the BMP)
+                if 0xD800 <= code <= 0xDBFF and index + 1 < count:
+                    low = pdfium_c.FPDFText_GetUnicode(textpage.raw, index + 1)
+                    if 0xDC00 <= low <= 0xDFFF:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                        step = 2
+                if code == 0:
+                    index += step
+                    continue
+
+                generated = pdfium_c.FPDFText_IsGenerated(textpage.raw, index) == 1
+                if generated and chars:
+                    # generated separators have no real box -> place them right after the previous char
+                    prev_char = chars[-1]
+                    chars.append(dict(prev_char, text=chr(code), generated=True, x0=prev_char["x1"]))
+                    index += step
+                    continue
+
+                # loose box uses font ascent/descent like pdfplumber (not the tight glyph outline)
+                left, bottom, right, top = textpage.get_charbox(index, loose=True)
+                chars.append({
+                    "text": "-" if code == 0x02 else chr(code),  # PDFium reports soft hyphens as \x02
+                    "generated": generated,
+                    "x0": left,
+                    "x1": right,
+                    "top": page_height - top,  # PDF coordinates start at the bottom -> flip like pdfplumber
+                    "bottom": page_height - bottom,
+                    "size": pdfium_c.FPDFText_GetFontSize(textpage.raw, index),
+                    "fontname": get_font_name(textpage, index),
+                })
+                index += step
+        finally:
+            textpage.close()
+        return chars
+
+
+def get_font_name(textpage, index):
+    # first call returns the needed buffer length, second call fills the buffer
+    length = pdfium_c.FPDFText_GetFontInfo(textpage.raw, index, None, 0, None)
+    if length <= 0:
+        return ""
+    buffer = ctypes.create_string_buffer(length)
+    pdfium_c.FPDFText_GetFontInfo(textpage.raw, index, buffer, length, None)
+    return normalize_font_name(buffer.value.decode("utf-8", errors="ignore"))
+
+
+def normalize_font_name(fontname):
+    return FONT_SUBSET_PREFIX.sub("", fontname or "")
+
+
+def sort_chars_into_lines(chars, y_tolerance=Y_TOLERANCE):
+    # Without text flow: cluster chars into lines by top position, then left-to-right
+    visible = [char for char in chars if char["text"] not in ("\r", "\n")]
+    visible.sort(key=lambda c: c["top"])
+
+    lines = []
+    current_line = []
+    for char in visible:
+        if current_line and char["top"] - current_line[-1]["top"] > y_tolerance:
+            lines.append(current_line)
+            current_line = []
+        current_line.append(char)
+    if current_line:
+        lines.append(current_line)
+
+    return [char for line in lines for char in sorted(line, key=lambda c: c["x0"])]
+
+
+def begins_new_word(prev_char, char, x_tolerance=X_TOLERANCE, y_tolerance=Y_TOLERANCE):
+    # same rule as pdfplumber: char is too far away from the previous char or font attributes change
+    if char["x0"] > prev_char["x1"] + x_tolerance or char["x0"] < prev_char["x0"] - x_tolerance:
+        return True
+    if abs(char["top"] - prev_char["top"]) > y_tolerance:
+        return True
+    return char["size"] != prev_char["size"] or char["fontname"] != prev_char["fontname"]
+
+
+def chars_to_words(chars, keep_blank_chars=False):
+    words = []
+    current = []
+    pending_blank = None
+
+    def finish_word():
+        if current:
+            words.append(merge_chars(current))
+            current.clear()
+
+    for char in chars:
+        text = char["text"]
+        # line breaks always end a word
+        if text in ("\r", "\n"):
+            finish_word()
+            pending_blank = None
+            continue
+        if text.isspace():
+            if not keep_blank_chars:
+                finish_word()  # whitespace separates words
+                continue
+            if char["generated"]:
+                # no real char in the PDF -> only the distance decides (like pdfplumber)
+                pending_blank = char
+                continue
+        if current and begins_new_word(current[-1], char):
+            finish_word()
+        elif current and pending_blank is not None:
+            current.append(pending_blank)  # keep the word gap as blank inside the phrase
+        pending_blank = None
+        current.append(char)
+    finish_word()
+
+    return words
+
+
+def merge_chars(chars):
+    return {
+        "text": "".join(char["text"] for char in chars),
+        "x0": min(char["x0"] for char in chars),
+        "x1": max(char["x1"] for char in chars),
+        "top": min(char["top"] for char in chars),
+        "bottom": max(char["bottom"] for char in chars),
+        "size": chars[0]["size"],
+        "fontname": chars[0]["fontname"],
+    }
+
+
+WORD_BACKENDS = {
+    PdfplumberWordBackend.name: PdfplumberWordBackend,
+    PdfiumWordBackend.name: PdfiumWordBackend,
+}
+
+
+def get_word_backend(name=None):
+    # backend is selected in .env (PDF_WORD_BACKEND), pdfplumber is default
+    name = name or os.getenv("PDF_WORD_BACKEND") or PdfplumberWordBackend.name
+    if name not in WORD_BACKENDS:
+        raise ValueError(f"Unknown PDF word backend: {name}")
+    return WORD_BACKENDS[name]()
@@ -0,0 +1,137 @@
+import io
+import cv2 as cv
+import numpy as np
+from PIL import Image
+from PyPDF2 import PdfReader, PdfWriter
+from reportlab.pdfgen import canvas
+from reportlab.lib.colors import red
+
+
+# Annotations only keep references to the page and the results of a step.
+# Nothing is copied or drawn until render() is called (dev mode or on request).
+class AbstractAnnotation:
+    def render(self, scale: float = 1.0):
+        raise NotImplementedError("This method must be overwritten.")
+
+
+class OcrAnnotation(AbstractAnnotation):
+    # OCR boxes and recognized text on the page image (StrategyTesseract, StrategyPaddle)
+    def __init__(self, image, ocr_result, label, polygons=None):
+        self.image = image
+        self.ocr_result = ocr_result
+        self.label = label
+        self.polygons = polygons  # optional: exact polygons instead of bboxes (PaddleOCR)
+
+    def render(self, scale: float = 1.0):
+        output = prepare_image(self.image, scale)
+        thickness = scaled(4, scale)
+        font_scale = max(1.0 * scale, 0.3)
+
+        for i, entry in enumerate(self.ocr_result):
+            if self.polygons is not None:
+                polygon = (np.array(self.polygons[i]) * scale).astype(np.int32)
+                cv.polylines(output, [polygon], isClosed=True, color=(255, 0, 0), thickness=thickness)
+                text_origin = tuple(int(v) for v in polygon[0])
+            else:
+                x1, y1, x2, y2 = (int(v * scale) for v in entry["bbox"])
+                cv.rectangle(output, (x1, y1), (x2, y2), (255, 0, 0), thickness)  # Draw bounding box
+                text_origin = (x1, y1 - scaled(5, scale))
+            # draw the recognized text
+            cv.putText(output, entry["text"], text_origin, cv.FONT_HERSHEY_SIMPLEX, font_scale, (255, 0, 100), scaled(2, scale))
+        cv.putText(output, self.label, (scaled(200, scale), scaled(200, scale)), cv.FONT_HERSHEY_SIMPLEX,
+                   3.2 * scale, (0, 0, 255), scaled(5, scale), cv.LINE_AA)
+        return output
+
+
+class LayoutAnnotation(AbstractAnnotation):
+    # Layout boxes with label and score (StrategyFRCNN, StrategyDETR, StrategyHybridFRCNN_DETR)
+    def __init__(self, image, detections, color=(255, 0, 0), thickness=8, font_scale=2.0, source_colors=None):
+        self.image = image
+        self.detections = detections
+        self.color = color
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.source_colors = source_colors  # optional: color per detection source (hybrid)
+
+    def render(self, scale: float = 1.0):
+        output = prepare_image(self.image, scale)
+        thickness = scaled(self.thickness, scale)
+        font_scale = max(self.font_scale * scale, 0.3)
+
+        for det in self.detections:  # Draw each detection
+            label_name = det.get("label_name", f"Class {det['label']}")
+            text = f"{label_name}: {det['score']:.2f}"
+            color = self.color
+            if self.source_colors and "source" in det:
+                color = self.source_colors.get(det["source"], self.color)
+                text += f", Source: {det['source']}"
+
+            x1, y1, x2, y2 = (int(v * scale) for v in det["box"])  # Convert box values to integer
+            cv.rectangle(output, (x1, y1), (x2, y2), color, thickness)
+            # text above the box
+            cv.putText(output, text, (x1, y1 - scaled(10, scale)), cv.FONT_HERSHEY_SIMPLEX, font_scale, color,
+                       max(thickness // 2, 1))
+        return output
+
+
+class PdfAnnotation(AbstractAnnotation):
+    # Word boxes drawn as overlay on the first page of a text PDF (StrategyPdf), rendered as PDF in memory
+    def __init__(self, pdf_path, ocr_result, page_size, pdf_session=None):
+        self.pdf_path = pdf_path
+        self.ocr_result = ocr_result  # bbox in PDF coordinates [x0, bottom, x1, top]
+        self.page_size = page_size
+        self.pdf_session = pdf_session
+
+    def render(self, scale: float = 1.0):
+        # vector output -> scale is not needed
+        mem_file = io.BytesIO()  # Memory file for overlay drawing
+        c = canvas.Canvas(mem_file, pagesize=self.page_size)  # PDF canvas
+        c.setStrokeColor(red)
+        c.setLineWidth(0.5)
+        for entry in self.ocr_result:
+            x0, bottom, x1, top = entry["bbox"]
+            c.rect(x0, bottom, x1 - x0, top - bottom, stroke=1, fill=0)  # Draw box
+        c.save()  # Finish drawing
+        mem_file.seek(0)  # beginning of  memory file
+        overlay_pdf = PdfReader(mem_file)  # Read drawn  file as PDF
+
+        reader = self.pdf_session.pdf_reader if self.pdf_session is not None else PdfReader(self.pdf_path)
+        writer = PdfWriter()  # Create PDF writer for annotated files
+        writer.add_page(reader.pages[0])
+        writer.pages[0].merge_page(overlay_pdf.pages[0])  # Overlay drawing on the copy in the writer
+
+        memory_pdf = io.BytesIO()  # Create  inmemory file final PDF
+        writer.write(memory_pdf)  # Write annotated page into it
+        memory_pdf.seek(0)  # Reset position
+        return memory_pdf
+
+
+def prepare_image(image, scale):
+    # Single copy of the page for drawing, already reduced to the requested resolution
+    if isinstance(image, str):
+        image = Image.open(image).convert("RGB")
+    if isinstance(image, Image.Image):
+        image = np.array(image)
+
+    # If image is PyTorch tensor, convert to NumPy
+    if hasattr(image, "permute"):
+        image = image.permute(1, 2, 0).cpu().numpy()
+        image = (image * 255).astype(np.uint8)
+
+    # If the image is float convert to uint8
+    if image.dtype != np.uint8:
+        image = (image * 255).astype(np.uint8)
+
+    if scale != 1.0:
+        output = cv.resize(image, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+    else:
+        output = image.copy()
+
+    # needs to be 3-channel for drawing
+    if len(output.shape) == 2:
+        output = cv.cvtColor(output, cv.COLOR_GRAY2BGR)
+    return output
+
+
+def scaled(value, scale):
+    return max(int(round(value * scale)), 1)
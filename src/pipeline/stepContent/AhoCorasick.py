@@ -0,0 +1,78 @@
+from collections import deque
+
+
+class AhoCorasick:
+    # Multi-pattern automaton: all occurrences of all patterns in one pass over a text.
+    # patterns: iterable of (pattern, value), the first value of a repeated pattern is kept.
+    def __init__(self, patterns):
+        self.transitions = [{}]  # node -> {char: node}
+        self.fail = [0]
+        self.outputs = [[]]  # node -> lengths of the patterns ending in this node (longest first)
+        self.values = {}
+        for pattern, value in patterns:
+            if pattern and pattern not in self.values:
+                self.values[pattern] = value
+                self.add(pattern)
+        self.build()
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, pattern):
+        node = 0
+        for char in pattern:
+            if char not in self.transitions[node]:
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.transitions[node][char] = len(self.transitions) - 1
+            node = self.transitions[node][char]
+        self.outputs[node].append(len(pattern))
+
+    def build(self):
+        # breadth first: failure link = longest proper suffix that is a prefix of a pattern
+        queue = deque(self.transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.transitions[node].items():
+                fail = self.fail[node]
+                while fail and char not in self.transitions[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.transitions[fail].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text, accept=None):
+        # non-overlapping matches (start, end, pattern), leftmost first, the longest of matches with the same start.
+        # accept(pattern) -> False: pattern is ignored in this text
+        candidates = []
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.transitions[node]:
+                node = self.fail[node]
+            node = self.transitions[node].get(char, 0)
+            for length in self.outputs[node]:
+                if accept is None or accept(text[index + 1 - length:index + 1]):
+                    candidates.append((index + 1 - length, index + 1))
+
+        matches = []
+        position = 0
+        for start, end in sorted(candidates, key=lambda c: (c[0], -c[1])):
+            if start >= position:
+                matches.append((start, end, text[start:end]))
+                position = end
+        return matches
+
+    def replace(self, text, replacement, accept=None):
+        # replacement(pattern, value) -> new text of the match
+        matches = self.find(text, accept) if self.values else []
+        if not matches:
+            return text
+        parts = []
+        position = 0
+        for start, end, pattern in matches:
+            parts.append(text[position:start])
+            parts.append(replacement(pattern, self.values[pattern]))
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
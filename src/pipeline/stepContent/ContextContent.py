@@ -3,16 +3,18 @@ from src.pipeline.stepContent.contentStrategy.StrategyContentPipeline import Str
 
 
 class ContextContent(AbstractContext):
-    def __init__(self, image, text_json, layout_json, log=False):
+    def __init__(self, image, text_json, layout_json, pdf_page_height=None, log=False):
         super().__init__(log)
         self.image = image
         self.text_json = text_json
         self.layout_json = layout_json
+        self.pdf_page_height = pdf_page_height  # text PDFs: height of the first page (text_json in PDF coordinates)
 
     def _set_strategy(self):
         return StrategyContentPipeline(
             image=self.image,
             text_json=self.text_json,
             layout_json=self.layout_json,
+            pdf_page_height=self.pdf_page_height,
             log=self.log
         )
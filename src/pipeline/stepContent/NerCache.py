@@ -0,0 +1,125 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_VERSION = 1  # increase if the format of the cached spans changes
+
+
+class NerCache:
+    # LRU cache: (model fingerprint, normalized text) -> entity spans [(start, end, entity text, label, score), ...]
+    # with offsets in the normalized text. Optionally persisted as pickle file.
+    def __init__(self, max_size=10000, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.changed = False
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, fingerprint, text):
+        key = (fingerprint, text)
+        with self.lock:
+            spans = self.entries.get(key)
+            if spans is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return spans
+
+    def put(self, fingerprint, text, spans):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[(fingerprint, text)] = spans
+            self.entries.move_to_end((fingerprint, text))
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self.changed = True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"[WARNING] NER cache not loaded: {self.path} ({e})")
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = OrderedDict(list(data["entries"])[-self.max_size:] if self.max_size > 0 else [])
+
+    def save(self):
+        # written to a temporary file first, a crash never leaves a broken cache file
+        if not self.path or not self.changed:
+            return
+        with self.lock:
+            data = {"version": CACHE_VERSION, "entries": list(self.entries.items())}
+            self.changed = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def drop_other_models(self, fingerprint):
+        # entries of other model versions are never hit again
+        with self.lock:
+            for key in [key for key in self.entries if key[0] != fingerprint]:
+                del self.entries[key]
+                self.changed = True
+
+
+def model_fingerprint(model_path, quantized):
+    # changes with the model file -> cached results of an older model are not used
+    if model_path and os.path.exists(model_path):
+        stat = os.stat(model_path)
+        return model_path, stat.st_size, stat.st_mtime_ns, quantized
+    return model_path, None, None, quantized
+
+
+def normalize_text(text):
+    # collapse whitespace, positions: index in text of each character of the normalized text
+    normalized = []
+    positions = []
+    pending_space = None
+    for index, char in enumerate(text):
+        if char.isspace():
+            if normalized and pending_space is None:
+                pending_space = index
+            continue
+        if pending_space is not None:
+            normalized.append(" ")
+            positions.append(pending_space)
+            pending_space = None
+        normalized.append(char)
+        positions.append(index)
+    return "".join(normalized), positions
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ner_cache():
+    # one cache per process, NER_CACHE_SIZE=0 disables it, NER_CACHE_PATH persists it
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            max_size = int(os.getenv("NER_CACHE_SIZE", 10000))
+            _cache = NerCache(max_size=max_size, path=os.getenv("NER_CACHE_PATH") or None) if max_size > 0 else None
+        return _cache
@@ -0,0 +1,144 @@
+import os
+import numpy as np
+from dotenv import load_dotenv
+from src.pipeline.stepLayout.postprocessor.LayoutPostprocessor import group_ocr_into_rows, create_bounding_box
+from src.pipeline.TokenStore import TokenStore
+
+load_dotenv()
+
+NER_INPUT_LEVELS = ("block", "line", "entry")
+
+
+def get_ner_input_level(level=None):
+    # NER_INPUT: block (one sequence per layout element) | line (one per row) | entry (one per text_json entry)
+    level = level or os.getenv("NER_INPUT", "block")
+    if level not in NER_INPUT_LEVELS:
+        raise ValueError(f"Unknown NER input level: {level} (expected one of {', '.join(NER_INPUT_LEVELS)})")
+    return level
+
+
+def build_ner_blocks(text_json, layout_json=None, level=None, pdf_page_height=None):
+    # Rebuild longer texts for the tagger from the OCR entries:
+    # rows of the layout elements (tables always row by row), leftover entries are clustered into rows.
+    # pdf_page_height: text_json of a text PDF (StrategyPdf, boxes measured from the bottom of the page)
+    # Returns blocks {"text": str, "tokens": [(start, end, entry index), ...]} with character offsets in text.
+    level = get_ner_input_level(level)
+    if level == "entry":
+        return [make_block([index], text_json) for index, entry in enumerate(text_json) if entry["text"].strip()]
+
+    # geometry from the top of the page, like the layout cells (text_json itself is left unchanged)
+    boxes_json = top_down(text_json, pdf_page_height)
+
+    # layout cells are indices into text_json, or dicts (PDF layout phrases, older cached layouts) matched by
+    # text and box, otherwise by the tokens lying inside the cell box
+    indices_by_key = {}
+    for index, entry in enumerate(boxes_json):
+        indices_by_key.setdefault(entry_key(entry), []).append(index)
+    store = None
+
+    used = set()
+    blocks = []
+    for label, elements in (layout_json or {}).items():
+        if label == "unmatched":
+            continue
+        for element in elements:
+            rows = []
+            for row in element.get("rows", []):
+                indices = []
+                for cell in row:
+                    if isinstance(cell, (int, np.integer)):
+                        cell_indices = [int(cell)]
+                    else:
+                        cell_indices = [i for i in indices_by_key.get(entry_key(cell), []) if i not in used][:1]
+                        if not cell_indices and cell.get("bbox"):
+                            store = as_store(boxes_json) if store is None else store
+                            cell_indices = sorted(store.overlapping(cell["bbox"]).tolist(),
+                                                  key=lambda i: store.bboxes[i, 0])  # left to right
+                    for index in cell_indices:
+                        if index not in used:
+                            used.add(index)
+                            indices.append(index)
+                if indices:
+                    rows.append(indices)
+            if level == "line" or label == "Table":
+                blocks.extend(make_block(indices, text_json) for indices in rows)
+            elif rows:
+                blocks.append(make_block([index for indices in rows for index in indices], text_json))
+
+    # entries outside of all layout elements
+    leftover = [index for index, entry in enumerate(boxes_json) if index not in used and "bbox" in entry]
+    leftover_entries = [dict(boxes_json[index], index=index) for index in leftover]
+    for row in group_ocr_into_rows(leftover_entries, eps=row_eps(leftover_entries)):
+        blocks.append(make_block([cell["index"] for cell in row], text_json))
+    return [block for block in blocks if block["text"].strip()]
+
+
+def entry_key(entry):
+    return entry.get("text"), tuple(entry.get("bbox") or ())
+
+
+def top_down(text_json, pdf_page_height=None):
+    # PDF text boxes [x0, bottom, x1, top] from the bottom of the page -> [x0, top, x1, bottom] from the top
+    if pdf_page_height is None:
+        return text_json
+    entries = text_json.to_entries() if isinstance(text_json, TokenStore) else text_json
+    return [dict(entry, bbox=[entry["bbox"][0], pdf_page_height - entry["bbox"][3],
+                              entry["bbox"][2], pdf_page_height - entry["bbox"][1]])
+            if entry.get("bbox") else entry for entry in entries]
+
+
+def as_store(text_json):
+    # boxes for geometric queries (a list of dicts is converted once)
+    return text_json if isinstance(text_json, TokenStore) else TokenStore.from_entries(text_json)
+
+
+def row_eps(entries, max_eps=15):
+    # row distance for the clustering in the unit of the boxes: 15 px for OCR pages (300 dpi),
+    # half of the median text height for smaller units (PDF points, low resolution scans)
+    heights = [entry["bbox"][3] - entry["bbox"][1] for entry in entries]
+    heights = [height for height in heights if height > 0]
+    if not heights:
+        return max_eps
+    return min(max_eps, 0.5 * float(np.median(heights)))
+
+
+def make_block(indices, text_json):
+    parts = []
+    tokens = []
+    position = 0
+    for index in indices:
+        text = text_json[index]["text"].strip()
+        if not text:
+            continue
+        if parts:
+            position += 1  # separating space
+        parts.append(text)
+        tokens.append((position, position + len(text), index))
+        position += len(text)
+    return {"text": " ".join(parts), "tokens": tokens}
+
+
+def join_blocks(blocks, separator="\n"):
+    # one text of all blocks (e.g. lines), token offsets shifted accordingly
+    parts = []
+    tokens = []
+    position = 0
+    for block in blocks:
+        if parts:
+            position += len(separator)
+        parts.append(block["text"])
+        tokens.extend((start + position, end + position, index) for start, end, index in block["tokens"])
+        position += len(block["text"])
+    return {"text": separator.join(parts), "tokens": tokens}
+
+
+def map_span(block, start, end, text_json):
+    # OCR entries covered by the characters [start, end) of a block, with the covered part of each entry
+    parts = []
+    for token_start, token_end, index in block["tokens"]:
+        if token_end <= start or token_start >= end:
+            continue
+        part = block["text"][max(start, token_start):min(end, token_end)]
+        parts.append({"index": index, "text": part})
+    bboxes = [text_json[part["index"]] for part in parts if "bbox" in text_json[part["index"]]]
+    return parts, create_bounding_box(bboxes) if bboxes else None
@@ -0,0 +1,97 @@
+import os
+import re
+import threading
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# values are searched in line-joined text (lines separated by \n) -> patterns are not anchored,
+# separators inside of a value are single spaces only
+ALNUM_BEFORE = r"(?<![A-Za-z0-9ÄÖÜäöüß])"
+ALNUM_AFTER = r"(?![A-Za-z0-9ÄÖÜäöüß])"
+
+
+class RegexExtractor:
+    # pattern may contain a group (?P<value>...): only this part is the extracted value (e.g. without a keyword)
+    def __init__(self, name, pattern, normalize=None):
+        self.name = name
+        self.pattern = pattern
+        self.normalize = normalize or (lambda value: value.replace(" ", ""))  # remove spaces for standardization
+
+
+REGEX_EXTRACTORS = {}
+_scanners = {}  # compiled scanner per selection of extractors
+_scanners_lock = threading.Lock()
+match_counts = Counter()  # matches per extractor in this process (profiling)
+
+
+def register_extractor(extractor):
+    with _scanners_lock:
+        REGEX_EXTRACTORS[extractor.name] = extractor
+        _scanners.clear()
+
+
+def get_extractor_names(names=None):
+    # REGEX_EXTRACTORS: comma separated names, all registered extractors if empty
+    names = names or [name.strip() for name in os.getenv("REGEX_EXTRACTORS", "").split(",") if name.strip()]
+    if not names:
+        return list(REGEX_EXTRACTORS)
+    for name in names:
+        if name not in REGEX_EXTRACTORS:
+            raise ValueError(f"Unknown regex extractor: {name}")
+    return names
+
+
+def get_scanner(names=None):
+    # all patterns in one regex of named alternatives: one pass over the text finds matches of every extractor.
+    # Returns (compiled regex, {match group: extractor}, {value group: extractor})
+    names = tuple(get_extractor_names(names))
+    with _scanners_lock:
+        if names not in _scanners:
+            alternatives = []
+            groups = {}
+            value_groups = {}
+            for i, name in enumerate(names):
+                extractor = REGEX_EXTRACTORS[name]
+                pattern = extractor.pattern
+                if "(?P<value>" in pattern:
+                    pattern = pattern.replace("(?P<value>", f"(?P<v{i}>")
+                    value_groups[f"v{i}"] = extractor
+                alternatives.append(f"(?P<g{i}>{pattern})")
+                groups[f"g{i}"] = extractor
+            _scanners[names] = re.compile("|".join(alternatives)), groups, value_groups
+        return _scanners[names]
+
+
+def scan(text, names=None):
+    # leftmost matches, at the same position the extractor registered first wins.
+    # Returns [(extractor, start, end)] with start/end of the value
+    scanner, groups, value_groups = get_scanner(names)
+    matches = []
+    for match in scanner.finditer(text):
+        group = match.lastgroup  # outer group of the matching alternative (closed last)
+        extractor = groups[group]
+        value_group = f"v{group[1:]}"
+        start, end = match.span(value_group) if value_group in value_groups else match.span(group)
+        matches.append((extractor, start, end))
+        match_counts[extractor.name] += 1
+    return matches
+
+
+register_extractor(RegexExtractor(
+    "IBAN", ALNUM_BEFORE + r"[A-Z]{2}[0-9]{2}(?:[ ]?[0-9]{4}){4}(?!(?:[ ]?[0-9]){3})(?:[ ]?[0-9]{1,2})?" + ALNUM_AFTER))
+register_extractor(RegexExtractor(
+    "USt-ID", ALNUM_BEFORE + r"DE[ ]?[0-9]{3}[ ]?[0-9]{3}[ ]?[0-9]{3}" + ALNUM_AFTER))
+register_extractor(RegexExtractor(
+    "Email", r"(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}" + ALNUM_AFTER))
+register_extractor(RegexExtractor(
+    "Rechnungsnummer",
+    ALNUM_BEFORE + r"(?i:Rechnungs?[- ]?(?:nummer|nr\.?)|Re(?:chn)?\.?[- ]?Nr\.?)[ ]?:?[ ]?"
+    r"(?P<value>(?=[A-Za-z0-9/_-]*[0-9])[A-Za-z0-9][A-Za-z0-9/_-]{2,})" + ALNUM_AFTER))
+register_extractor(RegexExtractor(
+    "Steuernummer", r"(?<![0-9/])[0-9]{2,3}/[0-9]{3,4}/[0-9]{4,5}(?![0-9/])"))
+register_extractor(RegexExtractor(
+    "Datum", r"(?<![0-9./-])(?:[0-9]{1,2}[./-]){2}[0-9]{2,4}(?![0-9])"))
+register_extractor(RegexExtractor(
+    "Betrag", r"(?<![0-9.,])(?:(?:€|EUR)[ ]?)?[0-9]{1,3}(?:\.[0-9]{3})*,[0-9]{2}(?![0-9])(?:[ ]?(?:€|EUR))?"))
@@ -8,7 +8,7 @@ from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.StepT
 
 
 class StrategyContentPipeline:
-    def __init__(self, image, text_json, layout_json, log: bool = False):
+    def __init__(self, image, text_json, layout_json, log: bool = False, pdf_page_height=None):
         self.result_layout_elements = None
         self.result_regex = None
         self.result_flair_ner = None
@@ -20,6 +20,7 @@ class StrategyContentPipeline:
         self.image = image
         self.text_json = text_json
         self.layout_json = layout_json
+        self.pdf_page_height = pdf_page_height
         self.log = log
 
     def __enter__(self):
@@ -31,9 +32,11 @@ class StrategyContentPipeline:
             print(f"## [Pipeline] [ContextContent] [{self.__class__.__name__}] completed")
 
     def execute(self):
-        with StepFlairNER(image=self.image, text_json=self.text_json, layout_json=self.layout_json, log=self.log) as step_flair_ner:
+        with StepFlairNER(image=self.image, text_json=self.text_json, layout_json=self.layout_json, log=self.log,
+                          pdf_page_height=self.pdf_page_height) as step_flair_ner:
             self.result_flair_ner = step_flair_ner.apply()
-        with StepRegex(image=self.image, text_json=self.text_json, layout_json=self.layout_json, log=self.log) as step_regex:
+        with StepRegex(image=self.image, text_json=self.text_json, layout_json=self.layout_json, log=self.log,
+                       pdf_page_height=self.pdf_page_height) as step_regex:
             self.result_regex = step_regex.apply()
         with StepMasking(image=self.image, text_json=self.text_json, layout_json=self.layout_json, log=self.log, ner_results=self.result_flair_ner, regex_results=self.result_regex) as step_masking:
             self.masked_text_json, mask_map = step_masking.apply()
@@ -2,11 +2,12 @@ from abc import ABC, abstractmethod
 
 
 class AbstractContentPipelineStep(ABC):
-    def __init__(self, image, text_json, layout_json, log: bool = False):
+    def __init__(self, image, text_json, layout_json, log: bool = False, pdf_page_height=None):
         self.log = log
         self.image = image
         self.text_json = text_json
         self.layout_json = layout_json
+        self.pdf_page_height = pdf_page_height  # text PDFs: boxes of text_json are measured from the page bottom
 
     def __enter__(self):
         print(f"### [Pipeline] [ContextContent] [StrategyContentPipeline] [{self.__class__.__name__}] started")
@@ -1,21 +1,33 @@
 import os
 import re
+from collections import OrderedDict
+from dotenv import load_dotenv
 from symspellpy.symspellpy import SymSpell, Verbosity
 from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.AbstractContentPipelineStep import AbstractContentPipelineStep
 
+load_dotenv()
+
+# valid words only: no digits, no special characters
+VALID_WORD_PATTERN = re.compile(r"^[A-Za-zÄÖÜäöüß\-]{2,}$")
+
+# SymSpell dictionaries and corrected words are kept for the whole process, key: dictionary path
+_symspells = {}
+_corrections = {}  # dictionary path -> OrderedDict word -> corrected word (LRU, CORRECTOR_CACHE_SIZE)
+
 
 class StepCorrector(AbstractContentPipelineStep):
     def __init__(self, image, text_json, layout_json, log: bool = False):
         super().__init__(image=image, text_json=text_json, layout_json=layout_json, log=log)
         self.symspell = None
+        self.corrections = None
+        self.cache_size = int(os.getenv("CORRECTOR_CACHE_SIZE", 50000))
+        # words: checked words, in_dictionary: no lookup needed, cached: known from an earlier word
+        self.stats = {"words": 0, "in_dictionary": 0, "cached": 0, "lookups": 0, "corrected": 0}
 
     def apply(self):
         self.load_symspell()
         corrected_ocr = []
 
-        # valid words only: no digits, no special characters
-        valid_word_pattern = re.compile(r"^[A-Za-zÄÖÜäöüß\-]{2,}$")
-
         for entry in self.text_json:
             original_text = entry["text"]
 
@@ -28,20 +40,8 @@ class StepCorrector(AbstractContentPipelineStep):
             corrected_words = []
 
             for word in words:
-                if valid_word_pattern.fullmatch(word):
-                    suggestions = self.symspell.lookup(word, Verbosity.CLOSEST, max_edit_distance=2)
-                    suggestion = self.get_suggestion(word, suggestions)
-                    if suggestion is None:
-                        corrected_words.append(word)
-                        continue
-
-                    #  original upper or lower
-                    if word.isupper():
-                        suggestion = suggestion.upper()
-                    elif word[0].isupper():
-                        suggestion = suggestion[0].upper() + suggestion[1:]
-
-                    corrected_words.append(suggestion)
+                if VALID_WORD_PATTERN.fullmatch(word):
+                    corrected_words.append(self.correct_word(word))
                 else:
                     corrected_words.append(word)
 
@@ -54,8 +54,52 @@ class StepCorrector(AbstractContentPipelineStep):
 
             corrected_ocr.append(entry)
 
+        if self.log:
+            avoided = self.stats["in_dictionary"] + self.stats["cached"]
+            print(f"### SymSpell: {self.stats['lookups']} lookups for {self.stats['words']} words "
+                  f"({avoided} avoided: {self.stats['in_dictionary']} in dictionary, {self.stats['cached']} cached), "
+                  f"{self.stats['corrected']} corrected, cache: {len(self.corrections)} words")
         return corrected_ocr
 
+    def correct_word(self, word):
+        self.stats["words"] += 1
+        # words of the dictionary are never corrected (see should_correct) -> no lookup
+        if self.is_in_dictionary(word):
+            self.stats["in_dictionary"] += 1
+            return word
+
+        corrected = self.corrections.get(word)
+        if corrected is not None:
+            self.corrections.move_to_end(word)
+            self.stats["cached"] += 1
+        else:
+            corrected = self.lookup(word)
+            if self.cache_size > 0:
+                self.corrections[word] = corrected
+                while len(self.corrections) > self.cache_size:
+                    self.corrections.popitem(last=False)
+        if corrected != word:
+            self.stats["corrected"] += 1
+        return corrected
+
+    def lookup(self, word):
+        self.stats["lookups"] += 1
+        suggestions = self.symspell.lookup(word, Verbosity.CLOSEST, max_edit_distance=2)
+        suggestion = self.get_suggestion(word, suggestions)
+        if suggestion is None:
+            return word
+
+        #  original upper or lower
+        if word.isupper():
+            suggestion = suggestion.upper()
+        elif word[0].isupper():
+            suggestion = suggestion[0].upper() + suggestion[1:]
+        return suggestion
+
+    def is_in_dictionary(self, word):
+        words = self.symspell._words
+        return word in words or word.lower() in words or word.lower().capitalize() in words
+
     def get_suggestion(self, word, suggestions):
         # Filter suggestions and keep only  terms which showld be corrected
         valid = [s.term for s in suggestions if self.should_correct(word, s.term)]
@@ -63,7 +107,7 @@ class StepCorrector(AbstractContentPipelineStep):
         return first_valid
 
     def should_correct(self, word: str, suggestion: str) -> bool:
-        if word in self.symspell._words or word.lower() in self.symspell._words or word.lower().capitalize() in self.symspell._words:
+        if self.is_in_dictionary(word):
             return False
         if suggestion not in self.symspell._words:
             return False
@@ -75,16 +119,22 @@ class StepCorrector(AbstractContentPipelineStep):
             return False
         return True
 
-    def load_symspell(self):  # load symspell dictionary
+    def load_symspell(self):  # load symspell dictionary (once per process)
         dictionary_path = os.getenv("SYM_DICT_PATH")
 
-        # initialize SymSpell
-        self.symspell = SymSpell(2, 7)
-
-        # load dictionary file with UTF-8 encoding
-        try:
-            with open(dictionary_path, encoding="utf-8") as f:
-                if not self.symspell.load_dictionary(f, term_index=0, count_index=1):
-                    raise FileNotFoundError(f"Could not load SymSpell dictionary at {dictionary_path}")
-        except Exception as e:
-            raise RuntimeError(f"Failed to load SymSpell dictionary: {e}")
+        if dictionary_path not in _symspells:
+            # initialize SymSpell
+            symspell = SymSpell(2, 7)
+
+            # load dictionary file with UTF-8 encoding
+            try:
+                with open(dictionary_path, encoding="utf-8") as f:
+                    if not symspell.load_dictionary(f, term_index=0, count_index=1):
+                        raise FileNotFoundError(f"Could not load SymSpell dictionary at {dictionary_path}")
+            except Exception as e:
+                raise RuntimeError(f"Failed to load SymSpell dictionary: {e}")
+            _symspells[dictionary_path] = symspell
+            _corrections[dictionary_path] = OrderedDict()
+
+        self.symspell = _symspells[dictionary_path]
+        self.corrections = _corrections[dictionary_path]
@@ -1,4 +1,4 @@
-import re
+from src.pipeline.stepContent.AhoCorasick import AhoCorasick
 from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.AbstractContentPipelineStep import AbstractContentPipelineStep
 
 
@@ -11,19 +11,13 @@ class StepDemasking(AbstractContentPipelineStep):
     def apply(self):
         demasked_json = []
 
-        # Regex for Placeholder set in StepMasking [...]
-        pattern = re.compile(r"\[[A-Z]+_\d+\]")
+        # Placeholders set in StepMasking [...] -> original text, all placeholders of an entry in one pass
+        automaton = AhoCorasick(self.mask_map.items())
 
         for entry in self.text_json_corrected:
             text = entry["text"]
-
-            # Replace all masks in text with original text
-            def replace_match(match):
-                token = match.group(0)
-                return self.mask_map.get(token, token)  # replace if in map
-
-            new_text = pattern.sub(replace_match, text)
-            entry["text"] = new_text
+            if "[" in text:
+                entry["text"] = automaton.replace(text, lambda placeholder, original: original)
             demasked_json.append(entry)
 
         if self.log:
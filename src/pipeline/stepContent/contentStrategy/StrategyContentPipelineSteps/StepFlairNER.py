@@ -1,37 +1,95 @@
 import os
+import torch
 from dotenv import load_dotenv
 from flair.data import Sentence
 from flair.models import SequenceTagger
+from src.pipeline.stepContent.NerCache import get_ner_cache, model_fingerprint, normalize_text
+from src.pipeline.stepContent.NerInput import build_ner_blocks, map_span
 from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.AbstractContentPipelineStep import AbstractContentPipelineStep
 
 load_dotenv()
 
+_taggers = {}  # loaded taggers are kept for the whole process, key: model fingerprint (path, size, mtime, quantized)
+
 
 class StepFlairNER(AbstractContentPipelineStep):
     def apply(self):
-        model_path = os.getenv('FLAIR_CONTENT')
-        tagger = SequenceTagger.load(model_path)
+        tagger, fingerprint = load_tagger(log=self.log), tagger_fingerprint()
+        cache = get_ner_cache()
         ocr_data = self.text_json
 
-        ner_results = []
-
-        for entry in ocr_data:
-            text = entry["text"]
-
-            if not text.strip():
-                continue
-
-            sentence = Sentence(text)
-            tagger.predict(sentence)
-
-            for entity in sentence.get_spans("ner"):
-                ner_results.append({
-                    "entity": entity.text,
-                    "label": entity.get_label("ner").value,
-                    "score": round(entity.score, 3),
-                })
+        # fewer, longer sequences: texts of layout blocks / rows instead of single OCR words
+        blocks = build_ner_blocks(ocr_data, self.layout_json, pdf_page_height=self.pdf_page_height)
+        ner_results = predict_entities(tagger, blocks, ocr_data, cache=cache, fingerprint=fingerprint)
+        if cache is not None:
+            cache.save()
 
         if self.log:
+            print(f"### {len(blocks)} NER sequences from {len(ocr_data)} OCR entries")
+            if cache is not None:
+                print(f"### NER cache: {cache.stats()}")
             for result in ner_results:
                 print(result)
         return ner_results
+
+
+def is_quantized(quantized=None):
+    # FLAIR_QUANTIZED=true: dynamic int8 quantization of LSTM and linear layers (CPU)
+    if quantized is None:
+        quantized = os.getenv("FLAIR_QUANTIZED", "false").lower() == "true"
+    return quantized
+
+
+def tagger_fingerprint(quantized=None):
+    return model_fingerprint(os.getenv('FLAIR_CONTENT'), is_quantized(quantized))
+
+
+def load_tagger(quantized=None, log=False):
+    # a changed model file is loaded again (new fingerprint)
+    model_path = os.getenv('FLAIR_CONTENT')
+    quantized = is_quantized(quantized)
+    key = model_fingerprint(model_path, quantized)
+    if key not in _taggers:
+        tagger = SequenceTagger.load(model_path)
+        tagger.eval()
+        if quantized:
+            torch.ao.quantization.quantize_dynamic(tagger, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8,
+                                                   inplace=True)
+        if log:
+            print(f"#### Flair tagger loaded from: {model_path} ({'int8' if quantized else 'fp32'})")
+        _taggers[key] = tagger
+        cache = get_ner_cache()
+        if cache is not None:
+            cache.drop_other_models(key)
+    return _taggers[key]
+
+
+def predict_entities(tagger, blocks, text_json, batch_size=None, cache=None, fingerprint=None):
+    # blocks from build_ner_blocks, entity spans are mapped back to the OCR entries and their boxes.
+    # Texts are tagged whitespace-normalized, with a cache only the texts not seen before.
+    batch_size = batch_size or int(os.getenv("NER_BATCH_SIZE", 32))
+    normalized = [normalize_text(block["text"]) for block in blocks]
+    block_spans = [cache.get(fingerprint, text) if cache is not None else None for text, _ in normalized]
+
+    missing = [i for i, spans in enumerate(block_spans) if spans is None]
+    sentences = [Sentence(normalized[i][0]) for i in missing]
+    if sentences:
+        tagger.predict(sentences, mini_batch_size=batch_size)
+    for i, sentence in zip(missing, sentences):
+        block_spans[i] = [(entity.start_position, entity.end_position, entity.text, entity.get_label("ner").value,
+                           round(entity.score, 3)) for entity in sentence.get_spans("ner")]
+        if cache is not None:
+            cache.put(fingerprint, normalized[i][0], block_spans[i])
+
+    ner_results = []
+    for block, (_, positions), spans in zip(blocks, normalized, block_spans):
+        for start, end, entity, label, score in spans:
+            parts, bbox = map_span(block, positions[start], positions[end - 1] + 1, text_json)
+            ner_results.append({
+                "entity": entity,
+                "label": label,
+                "score": score,
+                "bbox": bbox,
+                "parts": parts,  # covered part of each OCR entry: {"index": text_json index, "text": ...}
+            })
+    return ner_results
@@ -1,3 +1,4 @@
+from src.pipeline.stepLayout.postprocessor.LayoutPostprocessor import materialize_rows
 from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.AbstractContentPipelineStep import AbstractContentPipelineStep
 
 
@@ -20,7 +21,7 @@ class StepLayoutElements(AbstractContentPipelineStep):
                 confidences = []
 
                 # Collect text, bounding boxes, and confidence values from all cells
-                for row in block.get("rows", []):
+                for row in materialize_rows(block.get("rows", []), self.text_json):
                     for cell in row:
                         text_parts.append(cell.get("text", "").strip())
                         bboxes.append(cell.get("bbox", []))
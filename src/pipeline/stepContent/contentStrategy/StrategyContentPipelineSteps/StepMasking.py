@@ -1,6 +1,10 @@
+import re
 from collections import defaultdict
+from src.pipeline.stepContent.AhoCorasick import AhoCorasick
 from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.AbstractContentPipelineStep import AbstractContentPipelineStep
 
+PLACEHOLDER_LABEL = re.compile(r"[^A-Z]")  # placeholders: [LABEL_N] with LABEL in A-Z (see StepDemasking)
+
 
 class StepMasking(AbstractContentPipelineStep):
     def __init__(self, image, text_json, layout_json, log: bool = False, ner_results=None, regex_results=None):
@@ -14,26 +18,49 @@ class StepMasking(AbstractContentPipelineStep):
         mask_map = {}
         masked_json = []
 
-        # Combine NER and RegEx
-        to_mask = []
+        # Combine NER and RegEx: text -> label, text -> entries it is masked in (None: everywhere)
+        labels = {}
+        scopes = {}
+
+        def add(text, label, index=None):
+            labels.setdefault(text, label)
+            if index is None or scopes.get(text, set()) is None:
+                scopes[text] = None
+            else:
+                scopes.setdefault(text, set()).add(index)
+
+        def add_match(text, label, parts):
+            # a value split into several OCR entries (block-level NER, line-level regex) is masked
+            # part by part, a fragment only in its own entry; whole values everywhere (as before)
+            if parts and len(parts) > 1:
+                for part in parts:
+                    add(part["text"], label, part["index"])
+            else:
+                add(parts[0]["text"] if parts else text, label)
 
         for ner in self.ner_results:
-            to_mask.append((ner["entity"], ner["label"].upper()))
+            add_match(ner["entity"], ner["label"].upper(), ner.get("parts"))
 
         for category, entries in self.regex_results.items():
             for match in entries:
-                to_mask.append((match["text"], category.upper()))
-
-        # Iterate all OCR
-        for entry in self.text_json:
-            text = entry["text"]
-            for original, label in to_mask:
-                if original in text:
-                    counters[label] += 1
-                    placeholder = f"[{label}_{counters[label]}]"
-                    text = text.replace(original, placeholder)
-                    mask_map[placeholder] = original
-            entry["text"] = text
+                add_match(match["text"], category.upper(), match.get("parts"))
+
+        # One automaton for all entities: every entry is scanned once, the longest match wins,
+        # each original gets one placeholder for the whole document (numbered in order of appearance)
+        automaton = AhoCorasick(labels.items())
+        placeholders = {}
+
+        def placeholder_for(original, label):
+            if original not in placeholders:
+                label = PLACEHOLDER_LABEL.sub("", label)
+                counters[label] += 1
+                placeholders[original] = f"[{label}_{counters[label]}]"
+                mask_map[placeholders[original]] = original
+            return placeholders[original]
+
+        for index, entry in enumerate(self.text_json):
+            entry["text"] = automaton.replace(entry["text"], placeholder_for,
+                                              accept=lambda text: scopes[text] is None or index in scopes[text])
             masked_json.append(entry)
 
         if self.log:
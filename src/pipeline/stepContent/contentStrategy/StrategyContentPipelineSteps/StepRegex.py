@@ -1,4 +1,6 @@
-import re
+import time
+from src.pipeline.stepContent.NerInput import build_ner_blocks, join_blocks, map_span
+from src.pipeline.stepContent.RegexExtractors import get_extractor_names, scan
 from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.AbstractContentPipelineStep import AbstractContentPipelineStep
 
 
@@ -8,32 +10,26 @@ class StepRegex(AbstractContentPipelineStep):
         return result
 
     def extract(self):
-        # regex patterns for different data types
-        patterns = {
-            "IBAN": re.compile(r'^[A-Z]{2}[0-9]{2}(?:[ ]?[0-9]{4}){4}(?!(?:[ ]?[0-9]){3})(?:[ ]?[0-9]{1,2})?$'),
-            "Email": re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'),
-            "Datum": re.compile(r'^(?:\d{1,2}[./-]){2}\d{2,4}$'),
-        }
+        # extractors registered in RegexExtractors (selection: REGEX_EXTRACTORS)
+        names = get_extractor_names()
+        result = {name: [] for name in names}
+
+        # lines of the page in one text: values split into several OCR entries are found as well
+        start = time.perf_counter()
+        document = join_blocks(build_ner_blocks(self.text_json, self.layout_json, level="line",
+                                                    pdf_page_height=self.pdf_page_height))
+        for extractor, match_start, match_end in scan(document["text"], names):
+            parts, bbox = map_span(document, match_start, match_end, self.text_json)
+
+            # save result with text and bounding box
+            result[extractor.name].append({
+                "text": extractor.normalize(document["text"][match_start:match_end]),
+                "bbox": bbox or [],
+                "parts": parts,  # covered part of each OCR entry: {"index": text_json index, "text": ...}
+            })
 
-        result = {key: [] for key in patterns}
-
-        for entry in self.text_json:
-            text = entry.get("text", "")
-            bbox = entry.get("bbox", [])
-
-            for key, pattern in patterns.items():
-                match = pattern.search(text)
-                if not match:
-                    continue
-
-                # remove spaces for standardization
-                value = match.group().replace(" ", "")
-
-                # save result with text and bounding box
-                result[key].append({
-                    "text": value,
-                    "bbox": bbox
-                })
         if self.log:
+            counts = ", ".join(f"{name}: {len(matches)}" for name, matches in result.items())
+            print(f"### Regex: {counts} ({time.perf_counter() - start:.3f} s)")
             print(result)
         return result
@@ -1,4 +1,5 @@
 import re
+from src.pipeline.stepLayout.postprocessor.LayoutPostprocessor import materialize_rows
 from src.pipeline.stepContent.contentStrategy.StrategyContentPipelineSteps.AbstractContentPipelineStep import AbstractContentPipelineStep
 
 
@@ -6,9 +7,11 @@ class StepTable(AbstractContentPipelineStep):
     def apply(self):
         layout_tables = self.layout_json["Table"]
         for layout_table in layout_tables:
-            header_exists = has_a_header(layout_table)
+            # cells may be references to text_json, the tables keep them (materialized by the PostProcessor)
+            table = dict(layout_table, rows=materialize_rows(layout_table["rows"], self.text_json))
+            header_exists = has_a_header(table)
             layout_table["has_header"] = header_exists
-            table_json = self.convert_table_to_json(layout_table, has_header=header_exists)
+            table_json = self.convert_table_to_json(table, has_header=header_exists)
             if self.log:
                 print(f"### {header_exists}: Table JSON:\n", table_json)
         return layout_tables
@@ -1,14 +1,14 @@
 import os
 import numpy as np
-import pdfplumber
-from pdf2image import convert_from_path
 from dotenv import load_dotenv
 from PIL import Image
 import cv2 as cv
 import joblib
+from ..pdfBackend.PdfSession import PdfSession
 
 load_dotenv()
 input_folder = os.getenv('INPUT_PATH')
+render_dpi = int(os.getenv('PDF_RENDER_DPI', 300))
 TARGET_IMAGE_SIZE = (2480*2, 3508*2)  # A3 with 300 DPI
 
 
@@ -16,6 +16,7 @@ class FiletypeDeterminer:
     def __init__(self, upload_file, log: bool = False):
         self.upload_file = upload_file
         self.log = log
+        self.pdf_session = None  # parsed PDF, shared with the following pipeline steps (text PDFs only)
 
     def __enter__(self):
         print(f"# [Pipeline] [{self.__class__.__name__}] started: {self.upload_file}")
@@ -40,25 +41,25 @@ class FiletypeDeterminer:
 
     def process_pdf(self, name, file_path):
         # check if PDF contains real (machine-readable) text
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text and text.strip():
-                    print(f"## [Pipeline] [{self.__class__.__name__}] File is real (text-based) PDF")
-                    images = convert_from_path(file_path, dpi=300)
-                    image = np.array(images[0])  # Erste Seite als Bild
-                    return name, "pdf", [file_path], image, None
+        pdf_session = PdfSession(file_path, log=self.log)
+        if pdf_session.has_text():
+            print(f"## [Pipeline] [{self.__class__.__name__}] File is real (text-based) PDF")
+            self.pdf_session = pdf_session
+            # first page only, text PDFs only need a grayscale page image (text and layout come from the PDF)
+            image = pdf_session.render(0, dpi=render_dpi, grayscale=True)
+            return name, "pdf", [file_path], image, None
 
         # otherwise: scanned PDF → convert to PNG images
         print(f"## [Pipeline] [{self.__class__.__name__}] File is scanned PDF -> converting to PNG and process as image")
 
-        images = convert_from_path(file_path, dpi=300)
-        if not images:
+        with pdf_session:
+            image = pdf_session.render(0, dpi=render_dpi)
+        if image is None or image.size == 0:
             raise RuntimeError("No images extracted from PDF.")
 
         # Save the first page as PNG to same input folder
         out_path = os.path.join(input_folder, f"{name}.png")
-        images[0].save(out_path, "PNG")
+        Image.fromarray(image).save(out_path, "PNG")
 
         result = self.process_image(name, out_path)
 
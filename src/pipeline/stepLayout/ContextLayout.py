@@ -1,5 +1,6 @@
 from ..AbstractContext import AbstractContext
 from src.pipeline.stepLayout.postprocessor.LayoutPostprocessor import LayoutPostprocessor
+from src.pipeline.stepAnnotation.Annotation import LayoutAnnotation
 from .layoutStrategy.StrategyFRCNN import StrategyFRCNN
 from .layoutStrategy.StrategyDETR import StrategyDETR
 from .layoutStrategy.StrategyHybridFRCNN_DETR import StrategyHybridFRCNN_DETR
@@ -7,28 +8,38 @@ from .layoutStrategy.StrategyPDF import StrategyPDF
 
 
 class ContextLayout(AbstractContext):
-    def __init__(self, file_type, text_json, words=None, image=None, pdf_path=None, log=False):
+    def __init__(self, file_type, text_json, words=None, image=None, pdf_path=None, pdf_session=None,
+                 layout_boxes=None, log=False):
         super().__init__(log)
+        self.layout_boxes = layout_boxes  # regions of layout-first OCR, detection is not repeated
         self.words = words
+        self.pdf_session = pdf_session
         self.file_type = file_type
         self.image = image
         self.pdf_path = pdf_path
         self.text_json = text_json
 
     def run(self):
+        if self.file_type != "pdf" and self.layout_boxes is not None:
+            # OCR tokens already know their region -> no detection and no overlap matching
+            annotation = LayoutAnnotation(self.image, self.layout_boxes, color=(255, 0, 0), thickness=8, font_scale=2.0)
+            post_processor = LayoutPostprocessor(text_json=self.text_json, use_regions=True, log=self.log)
+            layout = post_processor.run(self.layout_boxes)
+            return annotation, layout
+
         self._strategy = self._set_strategy()
         if self.file_type == "pdf":
-            image_with_boxes, box_results = self._execute_strategy()
-            return image_with_boxes, box_results
+            annotation, box_results = self._execute_strategy()
+            return annotation, box_results
         else:
-            image_with_boxes, box_results = self._execute_strategy()
+            annotation, box_results = self._execute_strategy()
             post_processor = LayoutPostprocessor(text_json=self.text_json, log=self.log)
             layout = post_processor.run(box_results)
-            return image_with_boxes, layout
+            return annotation, layout
 
     def _set_strategy(self):
         if self.file_type == "pdf":
-            return StrategyPDF(pdf_path=self.pdf_path, words=self.words, log=self.log)
+            return StrategyPDF(pdf_path=self.pdf_path, words=self.words, pdf_session=self.pdf_session, log=self.log)
         return StrategyFRCNN(image=self.image, log=self.log)
         # return StrategyDETR(image=self.image, log=self.log)  # not used
         # return StrategyHybridFRCNN_DETR(image=self.image, log=self.log) # not used
@@ -0,0 +1,21 @@
+import os
+import torch
+from safetensors.torch import load_file
+
+
+def load_checkpoint(model_path, device):
+    # State dict of a local checkpoint without copying it into memory first:
+    # <name>.safetensors next to the .pth file is preferred, otherwise the .pth file is memory-mapped
+    safetensors_path = os.path.splitext(model_path)[0] + ".safetensors"
+    if os.path.exists(safetensors_path):
+        return load_file(safetensors_path, device=str(device))
+    return torch.load(model_path, map_location=device, mmap=True, weights_only=True)
+
+
+def convert_to_safetensors(model_path):
+    # one-time conversion of a .pth checkpoint, afterwards load_checkpoint uses the .safetensors file
+    from safetensors.torch import save_file
+    state_dict = torch.load(model_path, map_location="cpu", weights_only=True)
+    safetensors_path = os.path.splitext(model_path)[0] + ".safetensors"
+    save_file({key: tensor.contiguous() for key, tensor in state_dict.items()}, safetensors_path)
+    return safetensors_path
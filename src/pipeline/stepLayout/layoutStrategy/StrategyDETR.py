@@ -1,15 +1,19 @@
 import os
+import time
 import torch
 from dotenv import load_dotenv
 from transformers import DetrConfig
 from PIL import Image
 import numpy as np
-import cv2 as cv
 from transformers import DetrImageProcessor, DetrForObjectDetection
 from .AbstractStrategyLayout import AbstractStrategyLayout
+from .ModelCheckpoint import load_checkpoint
+from ...stepAnnotation.Annotation import LayoutAnnotation
 
 load_dotenv()
 
+_models = {}  # loaded models and processors are kept for the whole process, key: (model path, device)
+
 
 class StrategyDETR(AbstractStrategyLayout):
     def __init__(self, image, device=None, log=False):
@@ -45,41 +49,81 @@ class StrategyDETR(AbstractStrategyLayout):
         }
 
     def load_model(self):
+        key = (self.layout_model_path, self.device)
+        if key not in _models:
+            _models[key] = self.build_model()
+        return _models[key]
+
+    def build_model(self):
+        start = time.perf_counter()
         processor_path = self.layout_model_processor_path
         processor = DetrImageProcessor.from_pretrained(processor_path)
 
-        # Load model configuration with the number of labels (11)
-        config = DetrConfig.from_pretrained("facebook/detr-resnet-50", num_labels=11)
+        # Load model configuration with the number of labels (11), no download:
+        # config.json next to the checkpoint if available, otherwise the DETR defaults (= facebook/detr-resnet-50)
+        # use_pretrained_backbone=False: ResNet50 weights are not fetched, everything comes from the checkpoint
+        config_dir = os.path.dirname(self.layout_model_path)
+        if os.path.exists(os.path.join(config_dir, "config.json")):
+            config = DetrConfig.from_pretrained(config_dir, num_labels=11, use_pretrained_backbone=False)
+        else:
+            config = DetrConfig(num_labels=11, use_pretrained_backbone=False)
 
-        # Initialize DETR model and load trained weights
+        # Initialize DETR model and load trained weights (memory-mapped, tensors are assigned instead of copied)
         model = DetrForObjectDetection(config)
-        model.load_state_dict(torch.load(self.layout_model_path, map_location=self.device))
+        model.load_state_dict(load_checkpoint(self.layout_model_path, self.device), assign=True)
 
         model.to(self.device)  # Move model to GPU or CPU
         model.eval()  # evaluation mode
 
         if self.log:
-            print(f"## Custom DETR model loaded from: {self.layout_model_path}")
+            print(f"## Custom DETR model loaded from: {self.layout_model_path} in {time.perf_counter() - start:.2f} s")
             print(f"## Processor loaded from: {processor_path}")
 
         return model, processor
 
     def execute(self):
         image = self.load_image(self.image)
+        results = self.predict(image)
+
+        if self.log:
+            print("### Results saved to layout_results.json")
+            print(f"###  Detected layout elements: {len(results)}")
 
-        # Preprocess the image using the processor:
-        inputs = self.processor(images=image, return_tensors="pt").to(self.device)
+        # boxes are only drawn if the annotation is rendered (dev mode)
+        return LayoutAnnotation(self.image, results, color=(0, 0, 255), thickness=2, font_scale=0.5), results
+
+    def predict(self, image):
+        # layout detection on a PIL image or an image tensor (C, H, W, values 0..1)
+        return self.predict_batch([image])[0]
+
+    def predict_batch(self, images, batch_size=None):
+        # layout detection on many pages: one forward pass per batch, results per page
+        # images: PIL images or image tensors (C, H, W, values 0..1), not mixed
+        batch_size = batch_size or int(os.getenv("DETR_BATCH_SIZE", 4))
+        results = []
+        for start in range(0, len(images), batch_size):
+            results.extend(self.predict_single_batch(images[start:start + batch_size]))
+        return results
+
+    def predict_single_batch(self, images):
+        is_tensor = torch.is_tensor(images[0])
+        # Preprocess the images using the processor (tensor is already scaled to 0..1):
+        # pages of different size are padded to the largest one, pixel_mask marks the real pixels
+        inputs = self.processor(images=images, do_rescale=not is_tensor, return_tensors="pt").to(self.device)
 
         # Run the model with no gradient computation -> inference modus
         with torch.no_grad():
-            predictions = self.model(**inputs)
+            predictions = self.model(pixel_values=inputs["pixel_values"], pixel_mask=inputs["pixel_mask"])
 
-        # Get original image size in (height, width) format
-        target_sizes = torch.tensor([image.size[::-1]], device=self.device)
+        # Get original image sizes in (height, width) format
+        image_sizes = [tuple(image.shape[-2:]) if is_tensor else image.size[::-1] for image in images]
+        target_sizes = torch.tensor(image_sizes, device=self.device)
 
         # raw  output
-        output = self.processor.post_process_object_detection(predictions, target_sizes=target_sizes)[0]
+        outputs = self.processor.post_process_object_detection(predictions, target_sizes=target_sizes)
+        return [self.to_results(output) for output in outputs]
 
+    def to_results(self, output):
         results = []
 
         # Iterate over all detected boxes
@@ -96,13 +140,7 @@ class StrategyDETR(AbstractStrategyLayout):
                     "label_name": self.label_map.get(label, f"Class {label}"),
                     "score": round(float(score), 4)
                 })
-
-        if self.log:
-            print("### Results saved to layout_results.json")
-            print(f"###  Detected layout elements: {len(results)}")
-
-        image_with_boxes = draw_boxes_on_image(image, results)
-        return image_with_boxes, results
+        return results
 
     def load_image(self, image_input):
         if isinstance(image_input, str):
@@ -111,32 +149,3 @@ class StrategyDETR(AbstractStrategyLayout):
             return Image.fromarray(image_input).convert("RGB")
         else:
             raise ValueError("Invalid image input")
-
-
-def draw_boxes_on_image(image, detections, color=(0, 0, 255), thickness=2):
-    if isinstance(image, Image.Image):
-        image = np.array(image)
-
-    if isinstance(image, torch.Tensor):
-        image = image.permute(1, 2, 0).cpu().numpy()
-        image = (image * 255).astype(np.uint8)
-
-    if isinstance(image, np.ndarray) and image.dtype != np.uint8:
-        image = (image * 255).astype(np.uint8)
-
-    if len(image.shape) == 2:
-        image = cv.cvtColor(image, cv.COLOR_GRAY2BGR)
-
-    output = image.copy()
-
-    for det in detections:
-        box = det["box"]
-        label_name = det.get("label_name", f"Class {det['label']}")
-        score = det["score"]
-
-        x1, y1, x2, y2 = map(int, box)
-        cv.rectangle(output, (x1, y1), (x2, y2), color, thickness)
-        text = f"{label_name}: {score:.2f}"
-        cv.putText(output, text, (x1, y1 - 10), cv.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-
-    return output
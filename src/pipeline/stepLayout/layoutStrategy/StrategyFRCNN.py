@@ -1,21 +1,36 @@
 import os
-import torchvision
+import time
 from dotenv import load_dotenv
-from torchvision.models.detection.faster_rcnn import FastRCNNPredictor
+from torchvision.models.detection.faster_rcnn import FasterRCNN
+from torchvision.models.detection.backbone_utils import resnet_fpn_backbone
+from torchvision.models._utils import overwrite_eps
+from torchvision.ops.misc import FrozenBatchNorm2d
 from torchvision.transforms import functional as F
 from PIL import Image
 import numpy as np
-import cv2 as cv
 import torch
 from .AbstractStrategyLayout import AbstractStrategyLayout
+from .ModelCheckpoint import load_checkpoint
+from ...stepAnnotation.Annotation import LayoutAnnotation
 
 load_dotenv()
 
+_models = {}  # loaded models are kept for the whole process, key: (model path, device, precision)
+PRECISIONS = ("fp32", "int8", "bf16")
+
 
 class StrategyFRCNN(AbstractStrategyLayout):
-    def __init__(self, image, device=None, log=False):
+    def __init__(self, image, device=None, cpu_mode=None, precision=None, threads=None, log=False):
         super().__init__(image, log)
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu") # Choose device: GPU if available
+        # CPU inference mode: downscale before tensor conversion, inference_mode, thread count, reduced precision
+        self.cpu_mode = cpu_mode if cpu_mode is not None else os.getenv("FRCNN_CPU_MODE", "false").lower() == "true"
+        self.precision = precision or os.getenv("FRCNN_PRECISION") or "fp32"  # fp32 | int8 | bf16 (only CPU mode)
+        self.threads = threads or int(os.getenv("FRCNN_THREADS", 0))  # 0: torch default
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"Unknown FRCNN precision: {self.precision}")
+        if not self.cpu_mode or self.device != "cpu":
+            self.precision = "fp32"
         self.layout_model_path = os.path.join(
             os.getenv('FASTERCRNN_LAYOUT'),
             "model_epoch_7.pth"
@@ -36,29 +51,87 @@ class StrategyFRCNN(AbstractStrategyLayout):
         }
 
     def load_model(self):
-        # Load a standard Faster R-CNN model (with a ResNet50 backbone)
-        model = torchvision.models.detection.fasterrcnn_resnet50_fpn(weights="DEFAULT")
-        in_features = model.roi_heads.box_predictor.cls_score.in_features # number of features from the classifier head
-        model.roi_heads.box_predictor = FastRCNNPredictor(in_features, num_classes=12) # Replace original names 12 = 11 + background
-        model.load_state_dict(torch.load(self.layout_model_path, map_location=self.device))# Load trained model
+        key = (self.layout_model_path, self.device, self.precision)
+        if key not in _models:
+            _models[key] = self.build_model()
+        return _models[key]
+
+    def build_model(self):
+        start = time.perf_counter()
+        # Build the Faster R-CNN architecture (ResNet50-FPN backbone) without pretrained weights:
+        # same layers as fasterrcnn_resnet50_fpn(weights="DEFAULT") with a new head, all weights come from the checkpoint
+        backbone = resnet_fpn_backbone(backbone_name="resnet50", weights=None, norm_layer=FrozenBatchNorm2d,
+                                       trainable_layers=3)
+        model = FasterRCNN(backbone, num_classes=12)  # 12 = 11 + background
+        # fasterrcnn_resnet50_fpn sets eps=0 in all FrozenBatchNorm2d layers when loading the COCO weights,
+        # the checkpoint was trained with that network (eps is not part of the state dict)
+        overwrite_eps(model, 0.0)
+        # Load trained model (memory-mapped, tensors are assigned instead of copied)
+        model.load_state_dict(load_checkpoint(self.layout_model_path, self.device), assign=True)
         model.to(self.device)# Move the model to device
         model.eval()# evaluation mode
+        if self.precision == "int8":
+            # dynamic int8 quantization of the fully connected layers (box head and predictor)
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
         if self.log:
-            print(f"## Model loaded from: {self.layout_model_path}")
+            print(f"## Model loaded from: {self.layout_model_path} ({self.precision}) "
+                  f"in {time.perf_counter() - start:.2f} s")
         return model
 
     def execute(self): # layout detection on input image
         image = self.load_image(self.image)        # Load input image
-        # Convert image to tensor format, add batch dimension
-        img_tensor = F.to_tensor(image).unsqueeze(0).to(self.device)
-        # inference without gradients (faster, use less memory)
-        with torch.no_grad():
-            predictions = self.model(img_tensor)[0]
+        scale = 1.0
+        if self.cpu_mode:
+            # the model resizes to ~1333 px anyway -> resize the page before the (large) tensor is created
+            image, scale = self.downscale(image)
+        # Convert image to tensor format
+        img_tensor = F.to_tensor(image)
+        results = self.predict(img_tensor, scale)
+
+        if self.log:
+            print("###  Results saved to layout_results.json")
+            print(f"###  Detected layout elements: {len(results)}")
+
+        # boxes are only drawn if the annotation is rendered (dev mode)
+        return LayoutAnnotation(self.image, results, color=(255, 0, 0), thickness=8, font_scale=2.0), results
+
+    def downscale(self, image):
+        # same target size as the resize in the model transform (shorter side 800, longer side max. 1333)
+        transform = self.model.transform
+        width, height = image.size
+        scale = min(transform.min_size[-1] / min(width, height), transform.max_size / max(width, height))
+        if scale >= 1.0:
+            return image, 1.0
+        size = (round(width * scale), round(height * scale))
+        return image.resize(size, Image.BILINEAR, reducing_gap=3.0), scale
+
+    def predict(self, img_tensor, scale=1.0, set_threads=True):
+        # layout detection on an image tensor (C, H, W, values 0..1), add batch dimension
+        # scale: size of the tensor relative to the page, boxes are returned in page coordinates
+        # FRCNN_THREADS only applies to this inference, the process-wide setting is restored afterwards
+        # set_threads=False: the caller has set the threads (hybrid strategy)
+        set_threads = set_threads and bool(self.threads)
+        previous_threads = torch.get_num_threads()
+        if set_threads:
+            torch.set_num_threads(self.threads)
+        try:
+            if self.cpu_mode:
+                # inference_mode: no autograd tracking at all (faster than no_grad)
+                with torch.inference_mode(), torch.autocast("cpu", dtype=torch.bfloat16,
+                                                            enabled=self.precision == "bf16"):
+                    predictions = self.model(img_tensor.unsqueeze(0).to(self.device))[0]
+            else:
+                # inference without gradients (faster, use less memory)
+                with torch.no_grad():
+                    predictions = self.model(img_tensor.unsqueeze(0).to(self.device))[0]
+        finally:
+            if set_threads:
+                torch.set_num_threads(previous_threads)
 
         # Extract bounding boxes, class labels and scores
-        boxes = predictions['boxes'].cpu().numpy()
+        boxes = predictions['boxes'].float().cpu().numpy() / scale
         labels = predictions['labels'].cpu().numpy()
-        scores = predictions['scores'].cpu().numpy()
+        scores = predictions['scores'].float().cpu().numpy()
 
         # Keep predictions scored >= 0.5
         selected = scores >= 0.5
@@ -75,13 +148,7 @@ class StrategyFRCNN(AbstractStrategyLayout):
                 "score": round(float(score), 4)
             }
             results.append(result)
-
-        if self.log:
-            print("###  Results saved to layout_results.json")
-            print(f"###  Detected layout elements: {len(results)}")
-
-        image_with_boxes = draw_boxes_on_image(image, results)
-        return image_with_boxes, results
+        return results
 
     def load_image(self, image_input):
         if isinstance(image_input, str):
@@ -92,37 +159,3 @@ class StrategyFRCNN(AbstractStrategyLayout):
             return Image.fromarray(image_input).convert("RGB")
         else:
             raise ValueError("Invalid image input")
-
-
-def draw_boxes_on_image(image, detections, color=(255, 0, 0), thickness=8):
-    # If image is PIL format, convert  to Numpy array
-    if isinstance(image, Image.Image):
-        image = np.array(image)
-
-    # If image is PyTorch tensor, convert to NumPy
-    if isinstance(image, torch.Tensor):
-        image = image.permute(1, 2, 0).cpu().numpy()
-        image = (image * 255).astype(np.uint8)
-
-    # If the image is float convert to uint8
-    if isinstance(image, np.ndarray) and image.dtype != np.uint8:
-        image = (image * 255).astype(np.uint8)
-
-    # If image is grayscale, convert to color (BGR)
-    if len(image.shape) == 2:
-        image = cv.cvtColor(image, cv.COLOR_GRAY2BGR)
-
-    output = image.copy()
-
-    for det in detections:# Draw each detection
-        box = det["box"]
-        label_name = det.get("label_name", f"Class {det['label']}")
-        score = det["score"]
-
-        x1, y1, x2, y2 = map(int, box) # Convert box values to integer
-        cv.rectangle(output, (x1, y1), (x2, y2), color, thickness)
-
-        text = f"{label_name}: {score:.2f}"
-        cv.putText(output, text, (x1, y1 - 10), cv.FONT_HERSHEY_SIMPLEX, 2, color, 5)   # text above the box
-
-    return output
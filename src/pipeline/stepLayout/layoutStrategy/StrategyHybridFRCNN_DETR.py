@@ -1,70 +1,146 @@
-import cv2 as cv
+import os
+from concurrent.futures import ThreadPoolExecutor
 import torch
-from PIL import Image, ImageDraw
-import numpy as np
+from dotenv import load_dotenv
+from torchvision.transforms import functional as F
 from .AbstractStrategyLayout import AbstractStrategyLayout
+from ...stepAnnotation.Annotation import LayoutAnnotation
 from .StrategyDETR import StrategyDETR
 from .StrategyFRCNN import StrategyFRCNN
+from ..postprocessor.LayoutPostprocessor import LABEL_THRESHOLDS
+
+load_dotenv()
+
+FUSION_IOU = 0.55  # boxes of the same label with this overlap are fused
+MODEL_WEIGHTS = {"FRCNN": 1.0, "DETR": 1.0}
 
 
 class StrategyHybridFRCNN_DETR(AbstractStrategyLayout):
+    # Both detectors run at the same time on one image tensor, results are fused (weighted box fusion)
     def __init__(self, image, device=None, log=False):
         super().__init__(image, log)
         self.device = device
         self.detr_strategy = StrategyDETR(image=image, device=device, log=log)
         self.frcnn_strategy = StrategyFRCNN(image=image, device=device, log=log)
+        # intra-op threads per detector on CPU, FRCNN (larger input) gets the bigger share by default
+        total_threads = torch.get_num_threads()
+        self.frcnn_threads = int(os.getenv("HYBRID_FRCNN_THREADS", max(total_threads * 2 // 3, 1)))
+        self.detr_threads = int(os.getenv("HYBRID_DETR_THREADS", max(total_threads - self.frcnn_threads, 1)))
 
     def execute(self):
-        _, detr_boxes = self.detr_strategy.execute()
-        _, frcnn_boxes = self.frcnn_strategy.execute()
+        # image is converted once, both models read the same tensor (FRCNN CPU mode: its own smaller tensor)
+        image = self.frcnn_strategy.load_image(self.image)
+        img_tensor = F.to_tensor(image)
+        frcnn_tensor, frcnn_scale = img_tensor, 1.0
+        if self.frcnn_strategy.cpu_mode:
+            # FRCNN CPU mode: downscaled page as in StrategyFRCNN.execute, boxes are scaled back in predict
+            frcnn_image, frcnn_scale = self.frcnn_strategy.downscale(image)
+            if frcnn_scale != 1.0:
+                frcnn_tensor = F.to_tensor(frcnn_image)
+
+        main_threads = torch.get_num_threads()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # thread budgets of the hybrid: FRCNN must not apply FRCNN_THREADS itself
+            frcnn_future = pool.submit(run_with_threads, self.frcnn_strategy.predict, self.frcnn_threads,
+                                       frcnn_tensor, frcnn_scale, set_threads=False)
+            detr_future = pool.submit(run_with_threads, self.detr_strategy.predict, self.detr_threads, img_tensor)
+            frcnn_boxes = frcnn_future.result()
+            detr_boxes = detr_future.result()
+        torch.set_num_threads(main_threads)  # builds without OpenMP share one setting for all threads
 
         # detr or frcnn
         for box in detr_boxes:
-            print(f"DETR: {box}")
             box["source"] = "DETR"
         for box in frcnn_boxes:
-            print(f"FRCNN: {box}")
             box["source"] = "FRCNN"
 
-        all_boxes = detr_boxes + frcnn_boxes
-        image_rgb = cv.cvtColor(self.image, cv.COLOR_BGR2RGB)
-        image_with_boxes = draw_boxes_on_image(image_rgb, all_boxes)
-
-        return np.array(image_with_boxes), all_boxes
-
-
-def draw_boxes_on_image(image, detections, thickness=2):
-    # If image is PIL format, convert  to Numpy array
-    if isinstance(image, Image.Image):
-        image = np.array(image)
-
-    # If image is PyTorch tensor, convert to NumPy
-    if isinstance(image, torch.Tensor):
-        image = image.permute(1, 2, 0).cpu().numpy()
-        image = (image * 255).astype(np.uint8)
-
-    # If the image is float convert to uint8
-    if isinstance(image, np.ndarray) and image.dtype != np.uint8:
-        image = (image * 255).astype(np.uint8)
-
-    # If image is grayscale, convert to color (BGR)
-    if len(image.shape) == 2:
-        image = cv.cvtColor(image, cv.COLOR_GRAY2BGR)
-
-    output = image.copy()
-
-    for det in detections:  # Draw each detection
-        box = det["box"]
-        label_name = det.get("label_name", f"Class {det['label']}")
-        score = det["score"]
-        source = det["source"]
-        color = (0, 0, 255) if source == "FRCNN" else (255, 0, 0)
-
-        x1, y1, x2, y2 = map(int, box)  # Convert box values to integer
-        cv.rectangle(output, (x1, y1), (x2, y2), color, thickness)
-
-        text = f"{label_name}: {score:.2f}, Source: {source}"
-        cv.putText(output, text, (x1, y1 - 10), cv.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)  # text above the box
-
-    return output
-
+        fused_boxes = weighted_box_fusion(frcnn_boxes + detr_boxes, label_ids=self.frcnn_strategy.label_map)
+        if self.log:
+            print(f"###  FRCNN: {len(frcnn_boxes)}, DETR: {len(detr_boxes)}, fused: {len(fused_boxes)} layout elements")
+            lost = check_fusion(frcnn_boxes, fused_boxes)
+            if lost:
+                print(f"[WARNING] {len(lost)} FRCNN boxes above the postprocessor thresholds are missing after fusion")
+
+        # boxes are only drawn if the annotation is rendered (dev mode)
+        annotation = LayoutAnnotation(self.image, fused_boxes, thickness=2, font_scale=0.5,
+                                      source_colors={"FRCNN": (0, 0, 255), "DETR": (255, 0, 0),
+                                                     "FRCNN+DETR": (0, 160, 0)})
+        return annotation, fused_boxes
+
+
+def run_with_threads(predict, threads, *args, **kwargs):
+    # with OpenMP the number of threads is set per calling thread -> each detector keeps its own budget
+    torch.set_num_threads(threads)
+    return predict(*args, **kwargs)
+
+
+def weighted_box_fusion(boxes, label_ids, iou_threshold=FUSION_IOU, model_weights=MODEL_WEIGHTS):
+    # Weighted box fusion (Solovyev et al.): clusters of overlapping boxes with the same label are replaced
+    # by their score-weighted mean box. The score is the best score of the members, so boxes found by only one
+    # model keep their score and the fused output passes the postprocessor thresholds wherever one model does.
+    label_ids = {name: label for label, name in label_ids.items()}  # label name -> label id of FRCNN
+    clusters = []  # [fused box, member boxes]
+    for box in sorted(boxes, key=lambda b: b["score"] * model_weights.get(b["source"], 1.0), reverse=True):
+        best_cluster, best_iou = None, iou_threshold
+        for cluster in clusters:
+            # one box per model and cluster: boxes of the same model are never merged with each other
+            if cluster[0]["label_name"] != box["label_name"] or any(m["source"] == box["source"] for m in cluster[1]):
+                continue
+            overlap = iou(cluster[0]["box"], box["box"])
+            if overlap > best_iou:
+                best_cluster, best_iou = cluster, overlap
+        if best_cluster is None:
+            clusters.append([dict(box), [box]])
+        else:
+            best_cluster[1].append(box)
+            best_cluster[0] = fuse(best_cluster[1], model_weights)
+
+    results = []
+    for fused, members in clusters:
+        sources = sorted({member["source"] for member in members}, reverse=True)  # FRCNN before DETR
+        results.append({
+            "box": [round(float(v), 2) for v in fused["box"]],
+            "label": label_ids.get(fused["label_name"], fused["label"]),
+            "label_name": fused["label_name"],
+            "score": round(float(fused["score"]), 4),
+            "source": "+".join(sources),
+        })
+    results.sort(key=lambda r: r["score"], reverse=True)
+    return results
+
+
+def fuse(members, model_weights):
+    weights = [member["score"] * model_weights.get(member["source"], 1.0) for member in members]
+    total = sum(weights)
+    box = [sum(w * member["box"][i] for w, member in zip(weights, members)) / total for i in range(4)]
+    return {
+        "box": box,
+        "label": members[0]["label"],
+        "label_name": members[0]["label_name"],
+        "score": max(member["score"] for member in members),
+        "source": members[0]["source"],
+    }
+
+
+def check_fusion(frcnn_boxes, fused_boxes, thresholds=LABEL_THRESHOLDS, iou_threshold=FUSION_IOU):
+    # FRCNN boxes kept by the postprocessor without fusion that have no fused box of the same label
+    # (overlap >= iou_threshold) with at least the same score -> the ensemble must not lose them
+    thresholds = dict(thresholds)
+    lost = []
+    for box in frcnn_boxes:
+        if box["label_name"] not in thresholds or box["score"] < thresholds[box["label_name"]]:
+            continue
+        if not any(fused["label_name"] == box["label_name"] and fused["score"] >= round(box["score"], 4)
+                   and iou(fused["box"], box["box"]) >= iou_threshold for fused in fused_boxes):
+            lost.append(box)
+    return lost
+
+
+def iou(box_a, box_b):
+    inter_width = max(0.0, min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]))
+    inter_height = max(0.0, min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]))
+    inter_area = inter_width * inter_height
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    union = area_a + area_b - inter_area
+    return inter_area / union if union > 0 else 0.0
@@ -1,22 +1,24 @@
-import pdfplumber
 from collections import defaultdict, Counter
 from .AbstractStrategyLayout import AbstractStrategyLayout
+from ...pdfBackend.PdfSession import PdfSession
 from ..postprocessor.LayoutPostprocessor import rows_are_similar, create_bounding_box
 
 
 class StrategyPDF(AbstractStrategyLayout):
-    def __init__(self, pdf_path, words=None, log=False):
+    def __init__(self, pdf_path, words=None, pdf_session=None, log=False):
         super().__init__(image=None, log=log)
         self.pdf_path = pdf_path
         self.words = words  # reuse words from earlier step
+        self.pdf_session = pdf_session  # parsed PDF from FiletypeDeterminer
 
     def execute(self):
         if self.words is not None:
             words = self.words
+        elif self.pdf_session is not None:
+            words = self.pdf_session.words(0)
         else:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                page = pdf.pages[0]
-                words = page.extract_words(extra_attrs=["size", "fontname"])
+            with PdfSession(self.pdf_path, log=self.log) as pdf_session:
+                words = pdf_session.words(0)
 
         # group individual OCR words into phrases
         grouped_phrases = group_words(words)
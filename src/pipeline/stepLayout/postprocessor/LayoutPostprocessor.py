@@ -1,32 +1,40 @@
+import os
 import matplotlib.pyplot as plt
 import numpy as np
+from dotenv import load_dotenv
 from sklearn.cluster import DBSCAN
+from src.pipeline.TokenStore import TokenStore
+
+load_dotenv()
+
+
+LABEL_THRESHOLDS = [  # List of labels and score thresholds
+    ("Table", 0.7),
+    ("Caption", 0.5),
+    ("Footnote", 0.5),
+    ("Caption", 0.5),
+    ("Footnote", 0.5),
+    ("Formula", 0.5),
+    ("List-item", 0.5),
+    ("Page-footer", 0.5),
+    ("Page-header", 0.5),
+    # ("Picture", 0.7),
+    ("Section-header", 0.5),
+    ("Text", 0.5),
+    ("Title", 0.5),
+]
 
 
 class LayoutPostprocessor:
-    def __init__(self, text_json: list, log: bool = False):
+    def __init__(self, text_json: list, use_regions: bool = False, log: bool = False):
         self.text_json = text_json
+        self.use_regions = use_regions  # OCR entries carry the index of their layout region (layout-first OCR)
         self.log = log
 
     def run(self, layout_boxes: list):
         print(f"## [Pipeline] [ContextLayout] [{self.__class__.__name__}] started")
-        label_map = [  # List of labels and score thresholds
-            ("Table", 0.7),
-            ("Caption", 0.5),
-            ("Footnote", 0.5),
-            ("Caption", 0.5),
-            ("Footnote", 0.5),
-            ("Formula", 0.5),
-            ("List-item", 0.5),
-            ("Page-footer", 0.5),
-            ("Page-header", 0.5),
-            # ("Picture", 0.7),
-            ("Section-header", 0.5),
-            ("Text", 0.5),
-            ("Title", 0.5),
-        ]
         results = {}
-        for label, filterscore in label_map:
+        for label, filterscore in LABEL_THRESHOLDS:
             label_results = self.process_layout_category(
                 layout_boxes,
                 filter_name=label,
@@ -41,10 +49,16 @@ class LayoutPostprocessor:
                 results[label] = process_tables(results["Table"]) or []
             else:
                 results[label] = process_elements(results[label], label) or []
+            # cells are referenced by their index in text_json
+            for item in results[label]:
+                item["rows"] = [[cell["id"] for cell in row] for row in item["rows"]]
 
         unmatched = self.filter_unmatched_ocr(results)
         results["unmatched"] = unmatched
 
+        if not use_layout_references():
+            results = materialize_layout(results, self.text_json)
+
         if self.log:
             for label in results:
                 print(label)
@@ -53,33 +67,45 @@ class LayoutPostprocessor:
         return results
 
     def filter_unmatched_ocr(self, results):
-        used_in_results = set()
-
+        # bitmap of the OCR tokens used in any layout element -> indices of the others
+        used = np.zeros(len(self.text_json), dtype=bool)
         for label_type, label_items in results.items():
             for item in label_items:  # Iterate over all text rows in layout element
                 for row in item.get("rows", []):
-                    for cell in row:
-                        # Extract text and bounding box from the OCR cell
-                        bbox = tuple(cell.get("bbox"))
-                        text = cell.get("text")
-                        if bbox and text:  # Only add if both text and bbox are there
-                            used_in_results.add((text, bbox))
-
-        unmatched = [
-            ocr for ocr in self.text_json
-            if (ocr["text"], tuple(ocr["bbox"])) not in used_in_results
-        ]
-
-        return unmatched
+                    used[row] = True
+        return np.flatnonzero(~used).tolist()
 
     def process_layout_category(self, layout_boxes, filter_name, filter_score=0.7):
         # Get layout elements filtered by label and the score
         filtered = filter_elements(layout_boxes, filter_name=filter_name, filter_score=filter_score)
+        if self.use_regions:
+            return self.match_ocr_by_region(filtered)
         matches = self.match_ocr_to_layout(filtered)
         return matches
 
+    def match_ocr_by_region(self, layout_boxes: list):
+        # OCR was done per layout region -> the region index of each entry is the match
+        by_region = {}
+        for i, ocr in enumerate(self.text_json):
+            by_region.setdefault(ocr.get("region"), []).append({"id": i, "bbox": ocr["bbox"]})
+
+        matches = {}
+        for i, layout in enumerate(layout_boxes):
+            matches[i] = {
+                "layout_box": layout,
+                "ocr_matches": by_region.get(layout["region"], [])
+            }
+        return matches
+
     def match_ocr_to_layout(self, layout_boxes: list):
         # Match OCR boxes to layout boxes by their overlapping area
+        # matches are cells {"id": index in text_json, "bbox": ...}
+        if isinstance(self.text_json, TokenStore):
+            bboxes = self.text_json.bboxes
+            return {i: {"layout_box": layout,
+                        "ocr_matches": [{"id": int(j), "bbox": bboxes[j].tolist()}
+                                        for j in self.text_json.overlapping(layout["box"])]}
+                    for i, layout in enumerate(layout_boxes)}
         matches = {}
 
         for i, layout in enumerate(layout_boxes):
@@ -87,7 +113,7 @@ class LayoutPostprocessor:
 
             matched_ocr = []
 
-            for ocr in self.text_json:
+            for j, ocr in enumerate(self.text_json):
                 if "bbox" not in ocr:
                     if self.log:
                         print(f"[WARN] OCR-element without box: {ocr}")
@@ -107,7 +133,7 @@ class LayoutPostprocessor:
                 ocr_area = (x2_o - x1_o) * (y2_o - y1_o)
 
                 if ocr_area > 0 and (inter_area / ocr_area) > 0.5:
-                    matched_ocr.append(ocr)
+                    matched_ocr.append({"id": j, "bbox": ocr["bbox"]})
 
             matches[i] = {
                 "layout_box": layout,
@@ -289,6 +315,38 @@ def process_elements(elements, label_name):
     return result_elements
 
 
+###############################################
+########### Token References ##################
+###############################################
+
+# LAYOUT_REFERENCES=false: layout elements contain copies of the OCR cells (as before)
+def use_layout_references():
+    return os.getenv("LAYOUT_REFERENCES", "true").lower() == "true"
+
+
+# Cells are indices into text_json (OCR layout) or dicts (PDF layout, older cached layouts)
+def materialize_cell(cell, text_json):
+    if isinstance(cell, (int, np.integer)):
+        return text_json[cell]
+    return cell
+
+
+def materialize_rows(rows, text_json):
+    return [[materialize_cell(cell, text_json) for cell in row] for row in rows]
+
+
+# Layout JSON with the OCR cells instead of references
+def materialize_layout(layout_json, text_json):
+    materialized = {}
+    for label, items in layout_json.items():
+        if label == "unmatched":
+            materialized[label] = [materialize_cell(cell, text_json) for cell in items]
+        else:
+            materialized[label] = [dict(item, rows=materialize_rows(item.get("rows", []), text_json))
+                                   if isinstance(item.get("rows"), list) else item for item in items]
+    return materialized
+
+
 ###############################################
 ########### OCR Utility Functions #############
 ###############################################
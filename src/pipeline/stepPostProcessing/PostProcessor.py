@@ -1,4 +1,5 @@
 from datetime import datetime
+from src.pipeline.stepLayout.postprocessor.LayoutPostprocessor import materialize_rows
 
 
 class PostProcessor:
@@ -64,9 +65,9 @@ class PostProcessor:
                 "confidence": entry.get("confidence"),
             })
 
-        # Tables
+        # Tables: cells referencing OCR tokens get the corrected text
         for table in self.content_json.get("tables", []):
-            rows = table.get("rows", [])
+            rows = materialize_rows(table.get("rows", []), self.content_json.get("text_corrected", []))
             if not rows:
                 continue
             has_header = table.get("has_header", True)
@@ -3,13 +3,19 @@ from .preprocessStrategy.StrategyPreProcessPipeline import StrategyPreProcessPip
 
 
 class ContextPreprocessor(AbstractContext):
-    def __init__(self, file_type, typed_file, log=False):
+    def __init__(self, file_type, typed_file, keep_ocr_data=False, log=False):
         super().__init__(log)
         self.file_type = file_type
         self.typed_file = typed_file
+        self.keep_ocr_data = keep_ocr_data  # return OCR result of binarization for reuse in text extraction
+
+    def run(self):
+        images = super().run()
+        ocr_data = self._strategy.ocr_data if self._strategy is not None else None
+        return images, ocr_data
 
     def _set_strategy(self):
         if self.file_type == "pdf":
             print("## [Pipeline] [ContextPreprocessor] No preprocessing necessary in textbased PDFs")
             return None
-        return StrategyPreProcessPipeline(image=self.typed_file, log=self.log)
+        return StrategyPreProcessPipeline(image=self.typed_file, log=self.log, keep_ocr_data=self.keep_ocr_data)
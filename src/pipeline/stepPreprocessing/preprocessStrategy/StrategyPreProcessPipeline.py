@@ -8,10 +8,12 @@ from .strategyPreProcessPipelineSteps.StepBinarize import StepBinarize
 
 
 class StrategyPreProcessPipeline:
-    def __init__(self, image, log: bool = False):
+    def __init__(self, image, log: bool = False, keep_ocr_data: bool = False):
         self.strategy = None
         self.image = image
         self.log = log
+        self.keep_ocr_data = keep_ocr_data
+        self.ocr_data = None  # OCR result of the binarized image (only if keep_ocr_data)
 
     def __enter__(self):
         print(f"## [Pipeline] [ContextPreprocessor] [{self.__class__.__name__}] started")
@@ -32,8 +34,9 @@ class StrategyPreProcessPipeline:
             deskewed_image = step_deskew.apply()
         with StepContrast(image=deskewed_image, log=self.log) as step_contrast:
             contrasted_image = step_contrast.apply()
-        with StepBinarize(image=contrasted_image, log=self.log) as step_binarize:
+        with StepBinarize(image=contrasted_image, log=self.log, keep_ocr_data=self.keep_ocr_data) as step_binarize:
             binarized_image = step_binarize.apply()
+            self.ocr_data = step_binarize.best_ocr_data
         image_rgb = cv.cvtColor(binarized_image, cv.COLOR_BGR2RGB)
         # return all images for debugging purpose
         return [grayscaled_image, deshadowed_image, denoised_image, deskewed_image, contrasted_image, binarized_image, image_rgb]
@@ -2,14 +2,24 @@ from .AbstractPreprocessPipelineStep import AbstractPreprocessPipelineStep
 import cv2 as cv
 import numpy as np
 from skimage.filters import threshold_sauvola
-from src.util import get_ocr_score
+from src.util import get_ocr_score, get_ocr_score_from_data
+from src.pipeline.stepTextExtraction.OcrResolution import (get_ocr_scale, rescale_image, get_adaptive_ocr_data,
+                                                           TESSERACT_TEXT_HEIGHT)
 
 
 class StepBinarize(AbstractPreprocessPipelineStep):
     # Binarization,tri different methods and select the one with the best OCR Result (tested with tesseract in util-function).
+    def __init__(self, image, log: bool = False, keep_ocr_data: bool = False):
+        super().__init__(image, log)
+        # keep_ocr_data: score with full OCR data, so the OCR result of the best image can be reused in text extraction
+        self.keep_ocr_data = keep_ocr_data
+        self.best_ocr_data = None
+        self.ocr_scale = 1.0  # all candidates have the same text height -> estimated once
+
     def apply(self):
         # Slight blur to reduce small noise
         gray = cv.GaussianBlur(self.image, (3, 3), 0)
+        self.ocr_scale = get_ocr_scale(gray, TESSERACT_TEXT_HEIGHT)
 
         results = {}
 
@@ -24,11 +34,12 @@ class StepBinarize(AbstractPreprocessPipelineStep):
             best_method = None
             best_score = -1
             best_image = gray
-            for method_name, (score, img) in results.items():
+            for method_name, (score, img, ocr_data) in results.items():
                 if score > best_score:
                     best_score = score
                     best_method = method_name
                     best_image = img
+                    self.best_ocr_data = ocr_data
         else:
             best_method = None
             best_score = 0
@@ -39,6 +50,14 @@ class StepBinarize(AbstractPreprocessPipelineStep):
 
         return best_image
 
+    def score(self, image):
+        # OCR score of a candidate (+ OCR data if it should be kept for text extraction)
+        # OCR at the preferred text height of Tesseract, boxes of the kept data are in page coordinates
+        if self.keep_ocr_data:
+            ocr_data = get_adaptive_ocr_data(image, self.ocr_scale)
+            return get_ocr_score_from_data(ocr_data), ocr_data
+        return get_ocr_score(rescale_image(image, self.ocr_scale)), None
+
     def try_sauvola(self, image, results):
         # Try Sauvola binarization
         try:
@@ -46,11 +65,11 @@ class StepBinarize(AbstractPreprocessPipelineStep):
             thresh = threshold_sauvola(image, window_size=window_size)  # Apply threshold: if pixel > local threshold -> white (255), else black (0)
             binary = (image > thresh).astype(np.uint8) * 255
 
-            score = get_ocr_score(binary)
+            score, ocr_data = self.score(binary)
 
             if self.log:
                 print(f"###  Sauvola - OCR score: {score}")
-            results["Sauvola"] = (score, binary)
+            results["Sauvola"] = (score, binary, ocr_data)
         except Exception as e:
             if self.log:
                 print(f"### [Error] in Sauvola: {e}")
@@ -65,11 +84,11 @@ class StepBinarize(AbstractPreprocessPipelineStep):
                 255,  # Max value (white)
                 cv.THRESH_BINARY + cv.THRESH_OTSU  # Use binary + Otsu method
             )
-            score = get_ocr_score(binary)
+            score, ocr_data = self.score(binary)
 
             if self.log:
                 print(f"### Otsu - OCR score: {score}")
-            results["Otsu"] = (score, binary)
+            results["Otsu"] = (score, binary, ocr_data)
         except Exception as e:
             if self.log:
                 print(f"### [Error] in Otsu: {e}")
@@ -83,11 +102,11 @@ class StepBinarize(AbstractPreprocessPipelineStep):
                 binary = cv.bitwise_or(sauvola_img,
                                        otsu_img)  # Combine both results: highlight text areas detected by either method
 
-                score = get_ocr_score(binary)
+                score, ocr_data = self.score(binary)
 
                 if self.log:
                     print(f"### Hybrid - OCR score: {score}")
-                results["Hybrid"] = (score, binary)
+                results["Hybrid"] = (score, binary, ocr_data)
         except Exception as e:
             if self.log:
                 print(f"### [Error] in Hybrid: {e}")
@@ -110,11 +129,11 @@ class StepBinarize(AbstractPreprocessPipelineStep):
                 lines = cv.bitwise_or(h_lines, v_lines)
                 boosted = cv.bitwise_or(binary, lines)
 
-                score = get_ocr_score(boosted)
+                score, ocr_data = self.score(boosted)
 
                 if self.log:
                     print(f"### Sauvola-Plus - OCR score: {score}")
-                results["Sauvola-Plus"] = (score, boosted)
+                results["Sauvola-Plus"] = (score, boosted, ocr_data)
         except Exception as e:
             if self.log:
                 print(f"### [Error] in Sauvola-Plus: {e}")
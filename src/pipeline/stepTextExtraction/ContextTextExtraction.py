@@ -1,21 +1,45 @@
+import os
+from dotenv import load_dotenv
 from ..AbstractContext import AbstractContext
+from .textExtractionStrategy.StrategyCascade import StrategyCascade
 from .textExtractionStrategy.StrategyPaddle import StrategyPaddle
 from .textExtractionStrategy.StrategyPdf import StrategyPdf
 from .textExtractionStrategy.StrategyTesseract import StrategyTesseract
+from .textExtractionStrategy.StrategyTesseractLayoutFirst import StrategyTesseractLayoutFirst
+
+load_dotenv()
 
 
 class ContextTextExtraction(AbstractContext):
-    def __init__(self, file_type, image, is_mostly_text, pdf_path=None, log=False):
+    def __init__(self, file_type, image, is_mostly_text, pdf_path=None, pdf_session=None, ocr_data=None,
+                 layout_image=None, log=False):
         super().__init__(log)
         self.file_type = file_type
         self.image = image
         self.is_mostly_text = is_mostly_text
         self.pdf_path = pdf_path
+        self.pdf_session = pdf_session
+        self.ocr_data = ocr_data  # Tesseract result from preprocessing (StepBinarize), if available
+        self.layout_image = layout_image  # image for layout detection in layout-first OCR mode
+        self.ocr_mode = os.getenv("OCR_MODE") or "page"  # page | layout_first | cascade
+        self.layout_boxes = None  # layout regions, if the strategy already detected them
+        self.stats = None  # statistics of the strategy (cascade: share of the page re-read with PaddleOCR)
+
+    def run(self):
+        result = super().run()
+        self.layout_boxes = getattr(self._strategy, "layout_boxes", None)
+        self.stats = getattr(self._strategy, "stats", None)
+        return result
 
     def _set_strategy(self):
         if self.file_type == "pdf":
-            return StrategyPdf(pdf_path=self.pdf_path, log=self.log)
+            return StrategyPdf(pdf_path=self.pdf_path, pdf_session=self.pdf_session, log=self.log)
+        elif self.ocr_mode == "cascade":
+            # Tesseract for every image, PaddleOCR only for low-confidence lines
+            return StrategyCascade(image=self.image, ocr_data=self.ocr_data, log=self.log)
         elif self.is_mostly_text:
-            return StrategyTesseract(image=self.image, log=self.log)
+            if self.ocr_mode == "layout_first" and self.layout_image is not None:
+                return StrategyTesseractLayoutFirst(image=self.image, layout_image=self.layout_image, log=self.log)
+            return StrategyTesseract(image=self.image, ocr_data=self.ocr_data, log=self.log)
         else:
             return StrategyPaddle(image=self.image, log=self.log)
@@ -0,0 +1,87 @@
+import os
+import cv2 as cv
+import numpy as np
+from dotenv import load_dotenv
+from src.util import get_ocr_data
+
+load_dotenv()
+
+# OCR resolution policy: the preprocessed page has ~35 MP, much more than the OCR engines need.
+# The text height is estimated from connected components and the page is rescaled to the
+# text height each engine works best with. Boxes are scaled back to page coordinates.
+TESSERACT_TEXT_HEIGHT = 30  # Tesseract is most accurate with ~30 px text height
+PADDLE_TEXT_HEIGHT = 32  # PaddleOCR recognizes text lines resized to 48 px height
+PADDLE_DET_LIMIT_SIDE_LEN = 2560  # only the detector reduces larger pages to this side length, recognition uses the rescaled page
+MIN_SCALE = 0.25
+MAX_SCALE = 2.0
+MIN_SCALE_CHANGE = 0.1  # smaller changes are not worth resizing
+MIN_COMPONENTS = 20  # too few characters for a reliable estimate
+
+
+def is_enabled():
+    return os.getenv("OCR_ADAPTIVE_RESOLUTION", "false").lower() in ("1", "true", "yes")
+
+
+def estimate_text_height(image):
+    # Median height of character-like connected components (dark text on light background)
+    gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY) if len(image.shape) == 3 else image
+    binary = cv.threshold(gray, 0, 255, cv.THRESH_BINARY_INV + cv.THRESH_OTSU)[1]
+    _, _, stats, _ = cv.connectedComponentsWithStats(binary, connectivity=8)
+    widths = stats[1:, cv.CC_STAT_WIDTH]
+    heights = stats[1:, cv.CC_STAT_HEIGHT]
+    areas = stats[1:, cv.CC_STAT_AREA]
+
+    # no noise, punctuation, lines or pictures
+    is_char = ((heights >= 6) & (heights <= gray.shape[0] // 20)
+               & (widths <= 3 * heights) & (areas >= 0.1 * widths * heights))
+    if np.count_nonzero(is_char) < MIN_COMPONENTS:
+        return None
+    return float(np.median(heights[is_char]))
+
+
+def get_ocr_scale(image, target_height):
+    # Scale factor for the image so that text has the target height (1.0: keep image)
+    if not is_enabled():
+        return 1.0
+    text_height = estimate_text_height(image)
+    if text_height is None:
+        return 1.0
+    scale = float(np.clip(target_height / text_height, MIN_SCALE, MAX_SCALE))
+    if abs(scale - 1.0) < MIN_SCALE_CHANGE:
+        return 1.0
+    return scale
+
+
+def rescale_image(image, scale):
+    if scale == 1.0:
+        return image
+    interpolation = cv.INTER_AREA if scale < 1.0 else cv.INTER_CUBIC
+    return cv.resize(image, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def rescale_ocr_data(data, scale):
+    # image_to_data result of the rescaled image -> page coordinates
+    if scale == 1.0:
+        return data
+    data = dict(data)
+    for key in ("left", "top", "width", "height"):
+        data[key] = [int(round(v / scale)) for v in data[key]]
+    return data
+
+
+def rescale_ocr_result(ocr_result, polygons, scale):
+    # OCR entries (and polygons) of the rescaled image -> page coordinates
+    if scale == 1.0:
+        return ocr_result, polygons
+    for entry in ocr_result:
+        entry["bbox"] = [int(round(v / scale)) for v in entry["bbox"]]
+    polygons = [(np.asarray(polygon) / scale).astype(np.int32) for polygon in polygons]
+    return ocr_result, polygons
+
+
+def get_adaptive_ocr_data(image, scale=None):
+    # Tesseract image_to_data at the preferred text height, boxes in page coordinates
+    if scale is None:
+        scale = get_ocr_scale(image, TESSERACT_TEXT_HEIGHT)
+    data = get_ocr_data(rescale_image(image, scale))
+    return rescale_ocr_data(data, scale)
@@ -0,0 +1,133 @@
+import os
+import numpy as np
+from dotenv import load_dotenv
+from src.pipeline.stepTextExtraction.textExtractionStrategy.AbstractStrategyTextExtraction import AbstractStrategyTextExtraction
+from src.pipeline.stepTextExtraction.textExtractionStrategy.StrategyPaddle import get_ocr_engine, parse_paddle_result
+from src.pipeline.stepAnnotation.Annotation import OcrAnnotation
+from src.pipeline.stepTextExtraction.OcrResolution import get_adaptive_ocr_data
+
+load_dotenv()
+
+REGION_PADDING = 8  # pixels around each low-confidence region, the Paddle detector needs some margin
+
+
+class StrategyCascade(AbstractStrategyTextExtraction):
+    # Tesseract on the whole page first, PaddleOCR only for lines Tesseract is unsure about.
+    # The Paddle result replaces the Tesseract words of a region if its confidence is higher.
+    def __init__(self, image, ocr_data=None, threshold=None, log: bool = False):
+        super().__init__(image, log)
+        self.ocr_data = ocr_data  # image_to_data result of this image from StepBinarize
+        self.threshold = threshold if threshold is not None else float(os.getenv("OCR_CASCADE_CONFIDENCE", 60))
+        self.stats = None  # how much of the page went to PaddleOCR
+
+    def execute(self):
+        data = self.ocr_data if self.ocr_data is not None else get_adaptive_ocr_data(self.image)
+        lines = group_lines(data)
+        height, width = self.image.shape[:2]
+
+        low_confidence = [line for line in lines if line_confidence(line) < self.threshold]
+        regions = merge_lines_to_regions(low_confidence, width, height)
+
+        replaced = set()  # ids of Tesseract lines replaced by Paddle
+        paddle_result = []
+        paddle_pixels = 0
+        for region_lines, (x1, y1, x2, y2) in regions:
+            paddle_pixels += (x2 - x1) * (y2 - y1)
+            results = get_ocr_engine().ocr(self.image[y1:y2, x1:x2], det=True, cls=True)
+            if not results or not results[0]:
+                continue
+            entries, _ = parse_paddle_result(results[0], offset=(x1, y1))
+            # Paddle scores are 0..1, Tesseract confidences 0..100
+            paddle_confidence = 100 * np.mean([entry["confidence"] for entry in entries])
+            tesseract_confidence = np.mean([line_confidence(line) for line in region_lines])
+            if paddle_confidence <= tesseract_confidence:
+                continue
+            replaced.update(id(line) for line in region_lines)
+            for entry in entries:
+                paddle_result.extend(split_into_words(entry, engine="paddle"))
+
+        ocr_result = [dict(word, engine="tesseract") for line in lines if id(line) not in replaced
+                      for word in line if word["confidence"] > 0]
+        words_replaced = sum(len(line) for line in lines if id(line) in replaced)
+        ocr_result.extend(paddle_result)
+        ocr_result.sort(key=lambda entry: (entry["bbox"][1], entry["bbox"][0]))
+
+        self.stats = {
+            "lines": len(lines),
+            "low_confidence_lines": len(low_confidence),
+            "regions": len(regions),
+            "paddle_pixel_fraction": round(paddle_pixels / (width * height), 4),
+            "words_replaced": words_replaced,
+            "words_from_paddle": len(paddle_result),
+        }
+        if self.log:
+            print(f"### Cascade OCR: {self.stats}")
+
+        # boxes are only drawn if the annotation is rendered (dev mode)
+        return OcrAnnotation(self.image, ocr_result, label="Tesseract + Paddle"), ocr_result, None
+
+
+def group_lines(data):
+    # Tesseract words grouped by their line (block, paragraph, line number)
+    lines = {}
+    for i, text in enumerate(data['text']):
+        text = text.strip()
+        conf = float(data['conf'][i])
+        if not text or conf < 0:  # conf -1: no word (block, paragraph, line)
+            continue
+        x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(key, []).append({
+            "text": text,
+            "bbox": [x, y, x + w, y + h],
+            "confidence": conf
+        })
+    return list(lines.values())
+
+
+def line_confidence(line):
+    return float(np.mean([word["confidence"] for word in line]))
+
+
+def merge_lines_to_regions(lines, width, height):
+    # Neighbouring low-confidence lines are re-read together -> fewer PaddleOCR calls
+    regions = []
+    for line in sorted(lines, key=lambda l: min(word["bbox"][1] for word in l)):
+        x1 = min(word["bbox"][0] for word in line)
+        y1 = min(word["bbox"][1] for word in line)
+        x2 = max(word["bbox"][2] for word in line)
+        y2 = max(word["bbox"][3] for word in line)
+        if regions:
+            region_lines, (rx1, ry1, rx2, ry2) = regions[-1]
+            line_height = y2 - y1
+            # next line directly below and horizontally overlapping
+            if y1 - ry2 < line_height and x1 < rx2 and x2 > rx1:
+                region_lines.append(line)
+                regions[-1] = (region_lines, (min(rx1, x1), ry1, max(rx2, x2), max(ry2, y2)))
+                continue
+        regions.append(([line], (x1, y1, x2, y2)))
+
+    return [(region_lines, (max(x1 - REGION_PADDING, 0), max(y1 - REGION_PADDING, 0),
+                            min(x2 + REGION_PADDING, width), min(y2 + REGION_PADDING, height)))
+            for region_lines, (x1, y1, x2, y2) in regions]
+
+
+def split_into_words(entry, engine):
+    # PaddleOCR returns text lines -> split into words like Tesseract, box width by number of characters
+    words = entry["text"].split()
+    if not words:
+        return []
+    x1, y1, x2, y2 = entry["bbox"]
+    char_width = (x2 - x1) / max(len(entry["text"]), 1)
+    result = []
+    position = 0
+    for word in words:
+        start = entry["text"].index(word, position)
+        position = start + len(word)
+        result.append({
+            "text": word,
+            "bbox": [int(x1 + start * char_width), y1, int(x1 + position * char_width), y2],
+            "confidence": 100 * entry["confidence"],
+            "engine": engine
+        })
+    return result
@@ -1,50 +1,68 @@
 from paddleocr import PaddleOCR
-import cv2 as cv
 import numpy as np
 
+from src.pipeline.stepAnnotation.Annotation import OcrAnnotation
+from src.pipeline.stepTextExtraction.OcrResolution import (is_enabled, get_ocr_scale, rescale_image, rescale_ocr_result,
+                                                           PADDLE_TEXT_HEIGHT, PADDLE_DET_LIMIT_SIDE_LEN)
 from src.pipeline.stepTextExtraction.textExtractionStrategy.AbstractStrategyTextExtraction import AbstractStrategyTextExtraction
 
 
+_ocr_engine = None  # PaddleOCR models are loaded once per process
+
+
+def get_ocr_engine():
+    global _ocr_engine
+    if _ocr_engine is None:
+        if is_enabled():
+            # image is already rescaled to the preferred text height -> detection should not shrink it to 960 px
+            _ocr_engine = PaddleOCR(use_angle_cls=True, lang='de', det_limit_side_len=PADDLE_DET_LIMIT_SIDE_LEN,
+                                    det_limit_type='max')
+        else:
+            _ocr_engine = PaddleOCR(use_angle_cls=True, lang='de')  # Initialize PaddleOCR: eith angle classification, German language
+    return _ocr_engine
+
+
 class StrategyPaddle(AbstractStrategyTextExtraction):
     def __init__(self, image, log: bool = False):
         super().__init__(image, log)
 
     def execute(self):
-        # Create copy of image for drawing bounding boxes
-        image_copy = self.image.copy()
-        if len(image_copy.shape) == 2:  # convert grayscale to BGR
-            image_copy = cv.cvtColor(image_copy, cv.COLOR_GRAY2BGR)
-
-        # OCR directly on the image (not file path)
-        ocr_engine = PaddleOCR(use_angle_cls=True, lang='de')  # Initialize PaddleOCR: eith angle classification, German language
-        results = ocr_engine.ocr(self.image, det=True, cls=True)
+        # OCR directly on the image (not file path), rescaled to the preferred text height
+        scale = get_ocr_scale(self.image, PADDLE_TEXT_HEIGHT)
+        results = get_ocr_engine().ocr(rescale_image(self.image, scale), det=True, cls=True)
 
         if not results or not results[0]:
             if self.log:
                 print("### PaddleOCR returned no results.")
-            return self.image, []
+            return None, [], None
+
+        ocr_result, polygons = parse_paddle_result(results[0])
+        ocr_result, polygons = rescale_ocr_result(ocr_result, polygons, scale)
 
-        ocr_result = []
+        # Return annotation (drawn only in dev mode), structured OCR results
+        return OcrAnnotation(self.image, ocr_result, label="Paddle", polygons=polygons), ocr_result, None
 
-        for line_id, line in enumerate(results[0]):  # for each detected text block
-            polygon, (text, score) = line
-            polygon = np.array(polygon).astype(np.int32) #converts polygon in numpyArray
 
-            # Convert to rect-bbox: [x_min, y_min, x_max, y_max]
-            x_coords = [pt[0] for pt in polygon]
-            y_coords = [pt[1] for pt in polygon]
-            bbox = [min(x_coords), min(y_coords), max(x_coords), max(y_coords)]
+def parse_paddle_result(lines, offset=(0, 0)):
+    # Convert PaddleOCR lines to OCR entries, offset: position of the OCR image on the page (crops)
+    offset_x, offset_y = offset
+    ocr_result = []
+    polygons = []
 
-            # Append structured data to result list
-            ocr_result.append({
-                "text": text,
-                "bbox": bbox,
-                "confidence": float(score),
-            })
+    for line_id, line in enumerate(lines):  # for each detected text block
+        polygon, (text, score) = line
+        polygon = np.array(polygon).astype(np.int32) + [offset_x, offset_y] #converts polygon in numpyArray
 
-            cv.polylines(image_copy, [polygon], isClosed=True, color=(255, 0, 0), thickness=4)
-            cv.putText(image_copy, text, tuple(polygon[0]), cv.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 100), 2)
-        cv.putText(image_copy, "Paddle", (200, 200), cv.FONT_HERSHEY_SIMPLEX, 3.2, (0, 0, 255), 5, cv.LINE_AA)
+        # Convert to rect-bbox: [x_min, y_min, x_max, y_max]
+        x_coords = [pt[0] for pt in polygon]
+        y_coords = [pt[1] for pt in polygon]
+        bbox = [int(min(x_coords)), int(min(y_coords)), int(max(x_coords)), int(max(y_coords))]
 
-        # Return annotated image, structured OCR results
-        return image_copy, ocr_result, None
+        # Append structured data to result list
+        ocr_result.append({
+            "text": text,
+            "bbox": bbox,
+            "confidence": float(score),
+        })
+        polygons.append(polygon)
+    return ocr_result, polygons
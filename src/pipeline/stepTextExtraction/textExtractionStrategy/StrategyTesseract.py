@@ -1,51 +1,47 @@
 from src.pipeline.stepTextExtraction.textExtractionStrategy.AbstractStrategyTextExtraction import AbstractStrategyTextExtraction
-import pytesseract
-from dotenv import load_dotenv
-from pytesseract import Output
-import cv2 as cv
-import os
-
-load_dotenv()
-pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_CMD")
+from src.pipeline.stepAnnotation.Annotation import OcrAnnotation
+from src.pipeline.stepTextExtraction.OcrResolution import get_adaptive_ocr_data
 
 
 class StrategyTesseract(AbstractStrategyTextExtraction):
-    def __init__(self, image, log: bool = False):
+    def __init__(self, image, ocr_data=None, log: bool = False):
         super().__init__(image, log)
+        self.ocr_data = ocr_data  # image_to_data result of this image from StepBinarize
 
     def execute(self):
-        # Make copy of image for visualization
-        image_copy = self.image.copy()
-        # needs to be 3-channel BGR for drawing
-        if len(image_copy.shape) == 2:  # if grayscale
-            image_copy = cv.cvtColor(image_copy, cv.COLOR_GRAY2BGR)
-
-        lang = 'deu'
-        custom_config = r'--oem 1 --psm 3' #tesseract configuration: --oem 1: LSTM OCR engine, --psm 3: Fully automatic page segmentation, but no OSD. (Default)
-        # Run tesseractOCR
-        data = pytesseract.image_to_data(self.image, lang=lang, config=custom_config, output_type=Output.DICT)
-
-        ocr_result = []
-        num_boxes = len(data['text']) # Number of text boxes
-
-        for i in range(num_boxes): # Loop each box
-            text = data['text'][i].strip()
-            conf = float(data['conf'][i])
-            if text and conf > 0:  # filter empty or invalid results
-                # bounding box coordinates
-                x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                bbox = [x, y, x + w, y + h]  # calculated coorinades
-
-                # collect text, bounding box, confidence
-                ocr_result.append({
-                    "text": text,
-                    "bbox": bbox,
-                    "confidence": conf
-                })
-
-                cv.rectangle(image_copy, (x, y), (x + w, y + h), (255, 0, 0), 4) # Draw bounding box
-                # draw the recognized text
-                cv.putText(image_copy, text, (x, y - 5), cv.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 100), 2)
-        cv.putText(image_copy, "Tesseract", (200, 200), cv.FONT_HERSHEY_SIMPLEX, 3.2, (0, 0, 255), 5, cv.LINE_AA)
-
-        return image_copy, ocr_result, None
+        if self.ocr_data is not None:
+            # Binarization already ran Tesseract (same configuration) on this image -> reuse result
+            if self.log:
+                print("### Reusing OCR result of preprocessing (StepBinarize)")
+            data = self.ocr_data
+        else:
+            # Run tesseractOCR (lang deu, --oem 1 --psm 3) at the preferred text height
+            data = get_adaptive_ocr_data(self.image)
+
+        ocr_result = parse_tesseract_data(data)
+
+        # boxes are only drawn if the annotation is rendered (dev mode)
+        return OcrAnnotation(self.image, ocr_result, label="Tesseract"), ocr_result, None
+
+
+def parse_tesseract_data(data, offset=(0, 0)):
+    # Convert image_to_data result to OCR entries, offset: position of the OCR image on the page (crops)
+    offset_x, offset_y = offset
+    ocr_result = []
+    num_boxes = len(data['text']) # Number of text boxes
+
+    for i in range(num_boxes): # Loop each box
+        text = data['text'][i].strip()
+        conf = float(data['conf'][i])
+        if text and conf > 0:  # filter empty or invalid results
+            # bounding box coordinates
+            x, y, w, h = data['left'][i] + offset_x, data['top'][i] + offset_y, data['width'][i], data['height'][i]
+            bbox = [x, y, x + w, y + h]  # calculated coorinades
+
+            # collect text, bounding box, confidence
+            ocr_result.append({
+                "text": text,
+                "bbox": bbox,
+                "confidence": conf
+            })
+    return ocr_result
@@ -0,0 +1,197 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import cv2 as cv
+import numpy as np
+from dotenv import load_dotenv
+from src.pipeline.stepTextExtraction.textExtractionStrategy.AbstractStrategyTextExtraction import AbstractStrategyTextExtraction
+from src.pipeline.stepTextExtraction.textExtractionStrategy.StrategyTesseract import parse_tesseract_data
+from src.pipeline.stepLayout.layoutStrategy.StrategyFRCNN import StrategyFRCNN
+from src.pipeline.stepAnnotation.Annotation import OcrAnnotation
+from src.util import get_ocr_data
+
+load_dotenv()
+
+# Page segmentation mode per layout label (Table is OCRed cell by cell)
+REGION_PSM = {
+    "Caption": 6,  # --psm 6: single uniform block of text
+    "Footnote": 6,
+    "Formula": 6,
+    "List-item": 6,
+    "Page-footer": 6,
+    "Page-header": 6,
+    "Section-header": 7,  # --psm 7: single text line
+    "Text": 6,
+    "Title": 6,
+    "Picture": 11,  # --psm 11: sparse text (logos, stamps)
+}
+TABLE_CELL_PSM = 6
+TABLE_SPARSE_PSM = 11  # tables without ruling lines
+RESIDUAL_PSM = 11  # text outside of all detected regions
+REGION_PADDING = 4  # pixels around each crop, Tesseract needs some white border
+MIN_RULING_LENGTH = 40  # minimum length of table lines in pixels
+MIN_CELL_SIZE = 12  # smaller cells are only gaps between double lines
+MIN_RESIDUAL_INK = 0.001  # fraction of dark pixels outside the regions that needs another OCR pass
+
+
+class StrategyTesseractLayoutFirst(AbstractStrategyTextExtraction):
+    # Layout detection first, then OCR of each region with a region-specific PSM.
+    # Regions are OCRed in parallel: pytesseract starts one tesseract process per call and the
+    # worker backend sends each call to a free worker process, so threads are enough to use several cores.
+    def __init__(self, image, layout_image, workers=None, log: bool = False):
+        super().__init__(image, log)
+        self.layout_image = layout_image  # typed_file, same size as the preprocessed image
+        self.workers = workers or int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+        self.layout_boxes = None  # detected regions, reused by ContextLayout
+
+    def execute(self):
+        with StrategyFRCNN(image=self.layout_image, log=self.log) as layout_strategy:
+            _, detections = layout_strategy.execute()
+
+        page = to_grayscale(self.image)
+        height, width = page.shape[:2]
+        self.layout_boxes = []
+        jobs = []
+        for region, detection in enumerate(detections):
+            box = clip_box(detection["box"], width, height)
+            self.layout_boxes.append(dict(detection, region=region))
+            if box is None:
+                continue
+            if detection["label_name"] == "Table":
+                jobs.extend(table_jobs(page, box, region))
+            else:
+                jobs.append((page, box, REGION_PSM.get(detection["label_name"], 6), region))
+
+        residual = residual_image(page, [box for _, box, _, _ in jobs])
+        if residual is not None:
+            jobs.append((residual, (0, 0, width, height), RESIDUAL_PSM, None))
+
+        if self.log:
+            print(f"### OCR of {len(jobs)} regions with {self.workers} workers")
+
+        # one OpenMP thread per tesseract process (set by the backend), parallelism comes from the regions
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            region_results = list(pool.map(ocr_region, jobs))
+
+        ocr_result = remove_duplicates([entry for entries in region_results for entry in entries], self.layout_boxes)
+
+        # boxes are only drawn if the annotation is rendered (dev mode)
+        return OcrAnnotation(self.image, ocr_result, label="Tesseract (layout first)"), ocr_result, None
+
+
+def ocr_region(job):
+    image, box, psm, region = job
+    x1, y1, x2, y2 = box
+    crop = image[y1:y2, x1:x2]
+    # white border, text touching the crop edge is often lost
+    crop = cv.copyMakeBorder(crop, REGION_PADDING, REGION_PADDING, REGION_PADDING, REGION_PADDING,
+                             cv.BORDER_CONSTANT, value=255)
+    data = get_ocr_data(crop, psm=psm, parallel=True)
+    entries = parse_tesseract_data(data, offset=(x1 - REGION_PADDING, y1 - REGION_PADDING))
+    for entry in entries:
+        entry["region"] = region  # index in layout_boxes, None for text outside all regions
+    return entries
+
+
+def table_jobs(page, box, region):
+    # Split a table at its ruling lines and OCR each cell, sparse OCR of the whole table without lines
+    x1, y1, x2, y2 = box
+    rows, columns = find_ruling_lines(page[y1:y2, x1:x2])
+    if len(rows) < 3 or len(columns) < 3:
+        return [(page, box, TABLE_SPARSE_PSM, region)]
+
+    jobs = []
+    for top, bottom in zip(rows, rows[1:]):
+        for left, right in zip(columns, columns[1:]):
+            if bottom - top < MIN_CELL_SIZE or right - left < MIN_CELL_SIZE:
+                continue
+            jobs.append((page, (x1 + left, y1 + top, x1 + right, y1 + bottom), TABLE_CELL_PSM, region))
+    return jobs
+
+
+def find_ruling_lines(table):
+    # Positions of horizontal and vertical lines, table borders are always added
+    binary = cv.threshold(table, 0, 255, cv.THRESH_BINARY_INV + cv.THRESH_OTSU)[1]
+    height, width = binary.shape
+    horizontal = cv.morphologyEx(binary, cv.MORPH_OPEN,
+                                 cv.getStructuringElement(cv.MORPH_RECT, (max(MIN_RULING_LENGTH, width // 4), 1)))
+    vertical = cv.morphologyEx(binary, cv.MORPH_OPEN,
+                               cv.getStructuringElement(cv.MORPH_RECT, (1, max(MIN_RULING_LENGTH, height // 4))))
+    rows = line_positions(horizontal.any(axis=1), height)
+    columns = line_positions(vertical.any(axis=0), width)
+    return rows, columns
+
+
+def line_positions(mask, size):
+    # Center of each run of line pixels, merged with the borders of the table
+    positions = [0]
+    line_indices = np.flatnonzero(mask)
+    if line_indices.size:
+        runs = np.split(line_indices, np.flatnonzero(np.diff(line_indices) > 1) + 1)
+        positions.extend(int(run.mean()) for run in runs)
+    positions.append(size)
+    merged = []
+    for position in sorted(positions):
+        if merged and position - merged[-1] < MIN_CELL_SIZE:
+            continue
+        merged.append(position)
+    if merged[-1] != size:
+        merged[-1] = size
+    return merged
+
+
+def residual_image(page, boxes):
+    # Page without the detected regions, None if nothing is left to read
+    residual = page.copy()
+    for x1, y1, x2, y2 in boxes:
+        residual[y1:y2, x1:x2] = 255
+    if np.count_nonzero(residual < 128) / residual.size < MIN_RESIDUAL_INK:
+        return None
+    return residual
+
+
+def remove_duplicates(ocr_result, layout_boxes):
+    # Overlapping regions read the same words twice -> keep the word of the region with the higher score
+    def score(entry):
+        region = entry["region"]
+        return layout_boxes[region]["score"] if region is not None else 0.0
+
+    # words can only be duplicated by regions that overlap each other
+    neighbours = {
+        region: [other for other, other_box in enumerate(layout_boxes)
+                 if other != region and overlap(box["box"], other_box["box"]) > 0]
+        for region, box in enumerate(layout_boxes)
+    }
+    kept_by_region = {}
+    kept = []
+    for entry in sorted(ocr_result, key=score, reverse=True):
+        others = (other for region in neighbours.get(entry["region"], [])
+                  for other in kept_by_region.get(region, []))
+        if not any(overlap(entry["bbox"], other["bbox"]) > 0.5 for other in others):
+            kept_by_region.setdefault(entry["region"], []).append(entry)
+            kept.append(entry)
+    # reading order like full-page OCR: top to bottom, left to right
+    kept.sort(key=lambda entry: (entry["bbox"][1], entry["bbox"][0]))
+    return kept
+
+
+def overlap(bbox, other):
+    # intersection relative to the smaller box
+    inter_width = max(0, min(bbox[2], other[2]) - max(bbox[0], other[0]))
+    inter_height = max(0, min(bbox[3], other[3]) - max(bbox[1], other[1]))
+    area = min((bbox[2] - bbox[0]) * (bbox[3] - bbox[1]), (other[2] - other[0]) * (other[3] - other[1]))
+    return inter_width * inter_height / area if area > 0 else 0.0
+
+
+def clip_box(box, width, height):
+    x1, y1, x2, y2 = (int(round(v)) for v in box)
+    x1, y1 = max(x1, 0), max(y1, 0)
+    x2, y2 = min(x2, width), min(y2, height)
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return None
+    return x1, y1, x2, y2
+
+
+def to_grayscale(image):
+    if len(image.shape) == 3:
+        return cv.cvtColor(image, cv.COLOR_BGR2GRAY)
+    return image
@@ -5,7 +5,9 @@ import numpy as np
 import os
 import pytesseract
 import json
+from collections.abc import Mapping, Sequence
 from dotenv import load_dotenv
+from src.pipeline.ocrBackend.TesseractBackend import get_tesseract_backend
 
 load_dotenv()
 
@@ -83,9 +85,29 @@ def show_image(images, titles=None, cmap="gray"):
 
 # Load Tesseract path from .env file
 pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_CMD")
+TESSERACT_LANG = 'deu'  # OCR in language German
+TESSERACT_OEM = 1  # --oem 1: LSTM OCR engine
+TESSERACT_PSM = 3  # --psm 3: Fully automatic page segmentation, but no OSD. (Default)
+
+
 def get_ocr_score(image):
-    text = pytesseract.image_to_string(image, lang='deu')  # OCR in language German
-    return len(text.strip())  # Remove spaces and count characters
+    # OCR backend is selected in .env (TESSERACT_BACKEND: pytesseract or persistent worker processes)
+    # Same engine configuration and count as get_ocr_score_from_data, so both binarization paths choose alike
+    text = get_tesseract_backend().image_to_string(image, lang=TESSERACT_LANG, oem=TESSERACT_OEM, psm=TESSERACT_PSM)
+    return len(" ".join(text.split()))  # Characters of the words, separated by single spaces
+
+
+def get_ocr_data(image, psm=TESSERACT_PSM, parallel=False):
+    # Structured OCR result (words, boxes, confidences) with the configuration of StrategyTesseract
+    # parallel: called from several threads at once (one OpenMP thread per tesseract process)
+    return get_tesseract_backend(parallel=parallel).image_to_data(image, lang=TESSERACT_LANG, oem=TESSERACT_OEM,
+                                                                  psm=psm)
+
+
+def get_ocr_score_from_data(data):
+    # Same score as get_ocr_score (words joined by single spaces), but from an existing image_to_data result
+    words = [text.strip() for text in data['text'] if text.strip()]
+    return len(" ".join(words))
 
 
 def convert_numpy(obj):
@@ -95,9 +117,39 @@ def convert_numpy(obj):
         return int(obj)
     if isinstance(obj, np.floating):
         return float(obj)
+    if isinstance(obj, Mapping):  # e.g. TokenDict
+        return dict(obj)
+    if isinstance(obj, Sequence):  # e.g. TokenStore
+        return list(obj)
     return str(obj)  # Fallback for others
 
 
+def to_builtin(obj):
+    # JSON types before encoding: arrays in bulk via tolist(), NumPy scalars via item(),
+    # instead of a default callback per value during encoding
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, dict):
+        return {key.item() if isinstance(key, np.generic) else key: to_builtin(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_builtin(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        return obj.tolist() if obj.dtype.kind in "biuf" else [to_builtin(value) for value in obj.tolist()]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Mapping):  # e.g. TokenDict
+        return to_builtin(dict(obj))
+    if isinstance(obj, Sequence):  # e.g. TokenStore
+        return [to_builtin(value) for value in obj]
+    return str(obj)  # Fallback for others
+
+
+def dumps_json(results, indent=None):
+    # compact JSON unless indent is given
+    separators = (",", ": ") if indent else (",", ":")
+    return json.dumps(to_builtin(results), ensure_ascii=False, indent=indent, separators=separators)
+
+
 def save_json(results, save_dir, filename):
     save_direction = os.getenv(save_dir)
     os.makedirs(save_direction, exist_ok=True)
@@ -105,5 +157,6 @@ def save_json(results, save_dir, filename):
     base = os.path.splitext(os.path.basename(filename))[0]
     json_path = os.path.join(save_direction, base + ".json")
 
+    indent = int(os.getenv("JSON_INDENT") or 0) or None  # JSON_INDENT (e.g. 2): readable files
     with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False, default=convert_numpy)
+        f.write(dumps_json(results, indent=indent))